@@ -356,15 +356,16 @@ contract GydRecovery is IGydRecovery, Governable, LiquidityMining {
     }
 
     function checkAndRun() external returns (bool) {
-        // Since _checkAndRun() may change the GYD supply, we need to call checkpoint() to correctly account for the GYD
-        // supply until now (and also the reserve ratio). Motherboard does this itself before it calls
-        // checkAndRun(ReserveState).
-        // SOMEDAY gas optimization: Share reserveState between this function and checkpoint(); it's computed twice rn.
-        gyroConfig.getReserveStewardshipIncentives().checkpoint();
-
         DataTypes.ReserveState memory reserveState = gyroConfig
             .getReserveManager()
             .getReserveState();
+
+        // Since _checkAndRun() may change the GYD supply, we need to call checkpoint() to correctly account for the GYD
+        // supply until now (and also the reserve ratio). Motherboard does this itself before it calls
+        // checkAndRun(ReserveState). checkpoint() doesn't move any reserve balances, so the reserve state is still
+        // valid afterwards and is shared rather than computed again.
+        gyroConfig.getReserveStewardshipIncentives().checkpoint(reserveState);
+
         return _checkAndRun(reserveState);
     }
 
@@ -42,87 +42,59 @@ contract ReserveManager is IReserveManager, Governable {
 
     /// @inheritdoc IReserveManager
     function getReserveState() public view returns (DataTypes.ReserveState memory) {
-        address[] memory vaultAddresses = vaultRegistry.listVaults();
-        if (vaultAddresses.length == 0) {
-            return DataTypes.ReserveState({vaults: new DataTypes.VaultInfo[](0), totalUSDValue: 0});
-        }
-
-        uint256 length = vaultAddresses.length;
-        DataTypes.VaultInfo[] memory vaultsInfo = new DataTypes.VaultInfo[](length);
-
-        for (uint256 i = 0; i < length; i++) {
-            DataTypes.PersistedVaultMetadata memory persistedMetadata;
-            persistedMetadata = vaultRegistry.getVaultMetadata(vaultAddresses[i]);
-
-            IERC20Metadata vault = IERC20Metadata(vaultAddresses[i]);
-            uint256 reserveBalance = vault.balanceOf(reserveAddress);
-
-            IERC20[] memory tokens = IGyroVault(vaultAddresses[i]).getTokens();
-            DataTypes.PricedToken[] memory pricedTokens = new DataTypes.PricedToken[](
-                tokens.length
-            );
-            for (uint256 j = 0; j < tokens.length; j++) {
-                bool isStable = assetRegistry.isAssetStable(address(tokens[j]));
-                DataTypes.Range memory range;
-                if (isStable) {
-                    range = assetRegistry.getAssetRange(address(tokens[j]));
-                }
-                pricedTokens[j] = DataTypes.PricedToken({
-                    tokenAddress: address(tokens[j]),
-                    isStable: isStable,
-                    price: 0,
-                    priceRange: range
-                });
+        DataTypes.VaultInfo[] memory vaultsInfo;
+        {
+            (
+                address[] memory vaultAddresses,
+                DataTypes.PersistedVaultMetadata[] memory vaultsMetadata
+            ) = vaultRegistry.listVaultsWithMetadata();
+            if (vaultAddresses.length == 0) {
+                return
+                    DataTypes.ReserveState({
+                        vaults: new DataTypes.VaultInfo[](0),
+                        totalUSDValue: 0
+                    });
             }
-
-            vaultsInfo[i] = DataTypes.VaultInfo({
-                vault: vaultAddresses[i],
-                decimals: IERC20Metadata(vaultAddresses[i]).decimals(),
-                underlying: IGyroVault(vaultAddresses[i]).underlying(),
-                persistedMetadata: persistedMetadata,
-                reserveBalance: reserveBalance,
-                price: 0,
-                currentWeight: 0,
-                targetWeight: 0,
-                pricedTokens: pricedTokens
-            });
+            vaultsInfo = _getVaultsInfo(vaultAddresses, vaultsMetadata);
         }
+        uint256 length = vaultsInfo.length;
 
         vaultsInfo = gyroConfig.getRootPriceOracle().fetchPricesUSD(vaultsInfo);
 
         uint256 reserveUSDValue = 0;
+        uint256 returnsSum = 0;
         uint256[] memory usdValues = new uint256[](length);
+        uint256[] memory weightedReturns = new uint256[](length);
 
         for (uint256 i = 0; i < length; i++) {
             DataTypes.VaultInfo memory vaultInfo = vaultsInfo[i];
-            uint256 scaledReserveBalance = vaultInfo.reserveBalance.scaleFrom(vaultInfo.decimals);
-            uint256 usdValue = vaultsInfo[i].price.mulDown(scaledReserveBalance);
-            usdValues[i] = usdValue;
-            reserveUSDValue += usdValue;
+            usdValues[i] = vaultInfo.price.mulDown(
+                vaultInfo.reserveBalance.scaleFrom(vaultInfo.decimals)
+            );
+            reserveUSDValue += usdValues[i];
+
+            uint256 scheduledWeight = vaultInfo.persistedMetadata.scheduleWeight();
+            // Only used if the reserve is empty, overwritten below otherwise
+            vaultInfo.currentWeight = scheduledWeight;
+
+            weightedReturns[i] = vaultInfo
+                .price
+                .divDown(vaultInfo.persistedMetadata.priceAtCalibration)
+                .mulDown(scheduledWeight);
+            returnsSum += weightedReturns[i];
         }
+
+        uint256 totaltargetWeight = 0;
         for (uint256 i = 0; i < length; i++) {
             // Only zero at initialization
             // (or in a theoretical corner case when literally all GYD have been redeemed at collateralization ==
             // exactly 1)
-            vaultsInfo[i].currentWeight = reserveUSDValue == 0
-                ? vaultsInfo[i].persistedMetadata.scheduleWeight()
-                : usdValues[i].divDown(reserveUSDValue);
-        }
-
-        uint256 returnsSum = 0;
-        uint256[] memory weightedReturns = new uint256[](length);
-        for (uint256 i = 0; i < length; i++) {
-            uint256 initialPrice = vaultsInfo[i].persistedMetadata.priceAtCalibration;
-            weightedReturns[i] = vaultsInfo[i].price.divDown(initialPrice).mulDown(
-                vaultsInfo[i].persistedMetadata.scheduleWeight()
-            );
-            returnsSum += weightedReturns[i];
-        }
+            if (reserveUSDValue > 0) {
+                vaultsInfo[i].currentWeight = usdValues[i].divDown(reserveUSDValue);
+            }
 
-        // only 0 at initialization
-        if (returnsSum > 0) {
-            uint256 totaltargetWeight = 0;
-            for (uint256 i = 0; i < length; i++) {
+            // only 0 at initialization
+            if (returnsSum > 0) {
                 uint256 targetWeight = weightedReturns[i].divUp(returnsSum);
                 if (totaltargetWeight + targetWeight > FixedPoint.ONE) {
                     targetWeight = FixedPoint.ONE - totaltargetWeight;
@@ -135,6 +107,79 @@ contract ReserveManager is IReserveManager, Governable {
         return DataTypes.ReserveState({vaults: vaultsInfo, totalUSDValue: reserveUSDValue});
     }
 
+    /// @dev Vault infos without prices and weights. The stability and price ranges of the tokens
+    /// of all vaults are fetched from the asset registry in a single call.
+    function _getVaultsInfo(
+        address[] memory vaultAddresses,
+        DataTypes.PersistedVaultMetadata[] memory vaultsMetadata
+    ) internal view returns (DataTypes.VaultInfo[] memory vaultsInfo) {
+        uint256 length = vaultAddresses.length;
+        vaultsInfo = new DataTypes.VaultInfo[](length);
+
+        IERC20[][] memory vaultTokens = new IERC20[][](length);
+        uint256 tokensCount = 0;
+        for (uint256 i = 0; i < length; i++) {
+            vaultTokens[i] = IGyroVault(vaultAddresses[i]).getTokens();
+            tokensCount += vaultTokens[i].length;
+        }
+
+        address[] memory allTokens = new address[](tokensCount);
+        uint256 k = 0;
+        for (uint256 i = 0; i < length; i++) {
+            for (uint256 j = 0; j < vaultTokens[i].length; j++) {
+                allTokens[k++] = address(vaultTokens[i][j]);
+            }
+        }
+        (bool[] memory isStable, DataTypes.Range[] memory ranges) = assetRegistry
+            .getAssetsStabilityAndRanges(allTokens);
+
+        k = 0;
+        for (uint256 i = 0; i < length; i++) {
+            vaultsInfo[i] = _getVaultInfo(
+                vaultAddresses[i],
+                vaultsMetadata[i],
+                _getPricedTokens(vaultTokens[i], isStable, ranges, k)
+            );
+            k += vaultTokens[i].length;
+        }
+    }
+
+    function _getPricedTokens(
+        IERC20[] memory tokens,
+        bool[] memory isStable,
+        DataTypes.Range[] memory ranges,
+        uint256 offset
+    ) internal pure returns (DataTypes.PricedToken[] memory pricedTokens) {
+        pricedTokens = new DataTypes.PricedToken[](tokens.length);
+        for (uint256 j = 0; j < tokens.length; j++) {
+            pricedTokens[j] = DataTypes.PricedToken({
+                tokenAddress: address(tokens[j]),
+                isStable: isStable[offset + j],
+                price: 0,
+                priceRange: ranges[offset + j]
+            });
+        }
+    }
+
+    function _getVaultInfo(
+        address vaultAddress,
+        DataTypes.PersistedVaultMetadata memory persistedMetadata,
+        DataTypes.PricedToken[] memory pricedTokens
+    ) internal view returns (DataTypes.VaultInfo memory) {
+        return
+            DataTypes.VaultInfo({
+                vault: vaultAddress,
+                decimals: IERC20Metadata(vaultAddress).decimals(),
+                underlying: IGyroVault(vaultAddress).underlying(),
+                persistedMetadata: persistedMetadata,
+                reserveBalance: IERC20Metadata(vaultAddress).balanceOf(reserveAddress),
+                price: 0,
+                currentWeight: 0,
+                targetWeight: 0,
+                pricedTokens: pricedTokens
+            });
+    }
+
     function setVaults(DataTypes.VaultConfiguration[] calldata vaults) external governanceOnly {
         _ensureValuableVaultsNotRemoved(vaults);
         vaultRegistry.setVaults(vaults);
@@ -151,7 +151,11 @@ contract ReserveStewardshipIncentives is IReserveStewardshipIncentives, Governab
     }
 
     function checkpoint(DataTypes.ReserveState memory reserveState) external {
-        require(msg.sender == address(gyroConfig.getMotherboard()), "not authorized");
+        require(
+            msg.sender == address(gyroConfig.getMotherboard()) ||
+                msg.sender == address(gyroConfig.getGydRecovery()),
+            "not authorized"
+        );
         return _checkpoint(reserveState);
     }
 
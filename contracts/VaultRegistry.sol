@@ -43,6 +43,23 @@ contract VaultRegistry is IVaultRegistry, GovernableUpgradeable {
         return vaultAddresses.values();
     }
 
+    /// @inheritdoc IVaultRegistry
+    function listVaultsWithMetadata()
+        external
+        view
+        override
+        returns (address[] memory, DataTypes.PersistedVaultMetadata[] memory)
+    {
+        address[] memory vaults = vaultAddresses.values();
+        DataTypes.PersistedVaultMetadata[] memory metadata = new DataTypes.PersistedVaultMetadata[](
+            vaults.length
+        );
+        for (uint256 i; i < vaults.length; i++) {
+            metadata[i] = vaultsMetadata[vaults[i]];
+        }
+        return (vaults, metadata);
+    }
+
     /// @inheritdoc IVaultRegistry
     function getVaultMetadata(address vault)
         external
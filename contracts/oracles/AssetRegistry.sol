@@ -32,6 +32,9 @@ contract AssetRegistry is IAssetRegistry, GovernableUpgradeable {
     EnumerableSet.AddressSet internal assetAddresses;
     EnumerableSet.AddressSet internal stableAssetAddresses;
 
+    /// @inheritdoc IAssetRegistry
+    uint256 public assetAddressesVersion;
+
     constructor(IGyroConfig _gyroConfig) {
         gyroConfig = _gyroConfig;
     }
@@ -58,9 +61,24 @@ contract AssetRegistry is IAssetRegistry, GovernableUpgradeable {
 
     /// @inheritdoc IAssetRegistry
     function getAssetRange(address asset) external view override returns (DataTypes.Range memory) {
-        DataTypes.Range memory range = assetRanges[asset];
-        require(range.ceiling > 0, Errors.ASSET_NOT_SUPPORTED);
-        return range;
+        return _getAssetRange(asset);
+    }
+
+    /// @inheritdoc IAssetRegistry
+    function getAssetsStabilityAndRanges(address[] calldata assets_)
+        external
+        view
+        override
+        returns (bool[] memory isStable, DataTypes.Range[] memory ranges)
+    {
+        isStable = new bool[](assets_.length);
+        ranges = new DataTypes.Range[](assets_.length);
+        for (uint256 i; i < assets_.length; i++) {
+            isStable[i] = stableAssetAddresses.contains(assets_[i]);
+            if (isStable[i]) {
+                ranges[i] = _getAssetRange(assets_[i]);
+            }
+        }
     }
 
     /// @inheritdoc IAssetRegistry
@@ -99,6 +117,7 @@ contract AssetRegistry is IAssetRegistry, GovernableUpgradeable {
 
         assetNames.add(bytes32(bytes(assetName)));
         assetAddresses.add(assetAddress);
+        assetAddressesVersion++;
 
         emit AssetAddressUpdated(assetName, previousAddress, assetAddress);
     }
@@ -133,5 +152,12 @@ contract AssetRegistry is IAssetRegistry, GovernableUpgradeable {
         assetNames.remove(bytes32(bytes(assetName)));
         assetAddresses.remove(assetAddress);
         stableAssetAddresses.remove(assetAddress);
+        assetAddressesVersion++;
+    }
+
+    function _getAssetRange(address asset) internal view returns (DataTypes.Range memory) {
+        DataTypes.Range memory range = assetRanges[asset];
+        require(range.ceiling > 0, Errors.ASSET_NOT_SUPPORTED);
+        return range;
     }
 }
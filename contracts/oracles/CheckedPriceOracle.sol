@@ -2,7 +2,6 @@
 // for information on licensing please see the README in the GitHub repository <https://github.com/gyrostable/core-protocol>.
 pragma solidity ^0.8.4;
 
-import "@openzeppelin/contracts/utils/math/Math.sol";
 import "@openzeppelin/contracts/utils/math/SafeCast.sol";
 import "@openzeppelin/contracts/utils/structs/EnumerableSet.sol";
 
@@ -15,6 +14,7 @@ import "../auth/Governable.sol";
 
 import "../../libraries/Errors.sol";
 import "../../libraries/FixedPoint.sol";
+import "../../libraries/OrderStatistics.sol";
 
 contract CheckedPriceOracle is IUSDPriceOracle, IUSDBatchPriceOracle, Governable {
     using EnumerableSet for EnumerableSet.AddressSet;
@@ -49,6 +49,12 @@ contract CheckedPriceOracle is IUSDPriceOracle, IUSDBatchPriceOracle, Governable
     /// @dev Assets in this list are not required to have a relative price
     EnumerableSet.AddressSet internal assetsWithIgnorableRelativePriceCheck;
 
+    /// @dev Asset in `assetsForRelativePriceCheck` that a token is checked against, so that the
+    /// relative oracle is called once for the token rather than for every asset until a supported
+    /// pair is found. Ignored if the asset is not in `assetsForRelativePriceCheck` anymore or if
+    /// the relative price can't be fetched.
+    mapping(address => address) internal preferredAssetsForRelativePriceCheck;
+
     event USDOracleUpdated(address indexed oracle);
     event RelativeOracleUpdated(address indexed oracle);
 
@@ -64,6 +70,8 @@ contract CheckedPriceOracle is IUSDPriceOracle, IUSDBatchPriceOracle, Governable
     event AssetsWithIgnorableRelativePriceCheckAdded(address assetToAdd);
     event AssetsWithIgnorableRelativePriceCheckRemoved(address assetToRemove);
 
+    event PreferredAssetForRelativePriceCheckSet(address indexed asset, address assetForCheck);
+
     /// _usdOracle is for Chainlink
     constructor(
         address _governor,
@@ -152,56 +160,73 @@ contract CheckedPriceOracle is IUSDPriceOracle, IUSDBatchPriceOracle, Governable
         emit AssetsWithIgnorableRelativePriceCheckRemoved(assetToRemove);
     }
 
+    /// @notice Sets the asset that `asset` is checked against in the relative price check
+    /// `assetForCheck` must be in the assets for relative price check; the zero address unsets it
+    function setPreferredAssetForRelativePriceCheck(address asset, address assetForCheck)
+        external
+        governanceOnly
+    {
+        if (assetForCheck != address(0)) {
+            require(asset != assetForCheck, Errors.INVALID_ARGUMENT);
+            require(
+                assetsForRelativePriceCheck.contains(assetForCheck) &&
+                    relativeOracle.isPairSupported(asset, assetForCheck),
+                Errors.ASSET_NOT_SUPPORTED
+            );
+        }
+        preferredAssetsForRelativePriceCheck[asset] = assetForCheck;
+        emit PreferredAssetForRelativePriceCheckSet(asset, assetForCheck);
+    }
+
+    function getPreferredAssetForRelativePriceCheck(address asset)
+        external
+        view
+        returns (address)
+    {
+        return preferredAssetsForRelativePriceCheck[asset];
+    }
+
     function batchRelativePriceCheck(address[] memory tokenAddresses, uint256[] memory prices)
         internal
         view
         returns (uint256[] memory)
     {
         uint256[] memory priceLevelTwaps = new uint256[](tokenAddresses.length);
+        (address[] memory sortedAddresses, uint256[] memory sortedPrices) = _sortByAddress(
+            tokenAddresses,
+            prices
+        );
 
         uint256 k;
         for (uint256 i = 0; i < tokenAddresses.length; i++) {
-            bool couldCheck = false;
-
-            for (uint256 j = 0; j < assetsForRelativePriceCheck.length(); j++) {
-                address assetForCheck = assetsForRelativePriceCheck.at(j);
-                if (
-                    tokenAddresses[i] == assetForCheck ||
-                    !relativeOracle.isPairSupported(tokenAddresses[i], assetForCheck)
-                ) {
-                    continue;
-                }
-
-                uint256 relativePrice = relativeOracle.getRelativePrice(
-                    tokenAddresses[i],
-                    assetForCheck
+            (bool couldCheck, address assetForCheck, uint256 relativePrice) = _getRelativePrice(
+                tokenAddresses[i]
+            );
+
+            if (!couldCheck) {
+                require(
+                    assetsWithIgnorableRelativePriceCheck.contains(tokenAddresses[i]),
+                    Errors.ASSET_NOT_SUPPORTED
                 );
+                continue;
+            }
 
-                if (
-                    tokenAddresses[i] == wethAddress &&
-                    quoteAssetsForPriceLevelTWAPS.contains(assetForCheck)
-                ) {
-                    priceLevelTwaps[k] = relativePrice;
-                    k++;
-                } else if (
-                    assetForCheck == wethAddress &&
-                    quoteAssetsForPriceLevelTWAPS.contains(tokenAddresses[i])
-                ) {
-                    priceLevelTwaps[k] = FixedPoint.ONE.divDown(relativePrice);
-                    k++;
-                }
-
-                uint256 assetForCheckPrice = _findPrice(assetForCheck, tokenAddresses, prices);
-                _ensureRelativePriceConsistency(prices[i], assetForCheckPrice, relativePrice);
-
-                couldCheck = true;
-                break;
+            if (
+                tokenAddresses[i] == wethAddress &&
+                quoteAssetsForPriceLevelTWAPS.contains(assetForCheck)
+            ) {
+                priceLevelTwaps[k] = relativePrice;
+                k++;
+            } else if (
+                assetForCheck == wethAddress &&
+                quoteAssetsForPriceLevelTWAPS.contains(tokenAddresses[i])
+            ) {
+                priceLevelTwaps[k] = FixedPoint.ONE.divDown(relativePrice);
+                k++;
             }
 
-            require(
-                couldCheck || assetsWithIgnorableRelativePriceCheck.contains(tokenAddresses[i]),
-                Errors.ASSET_NOT_SUPPORTED
-            );
+            uint256 assetForCheckPrice = _findPrice(assetForCheck, sortedAddresses, sortedPrices);
+            _ensureRelativePriceConsistency(prices[i], assetForCheckPrice, relativePrice);
         }
 
         uint256[] memory foundTwaps = new uint256[](k);
@@ -304,69 +329,85 @@ contract CheckedPriceOracle is IUSDPriceOracle, IUSDBatchPriceOracle, Governable
 
     function _computeMinOrSecondMin(uint256[] memory twapPrices) internal pure returns (uint256) {
         // min if there are two, or the 2nd min if more than two
-        if (twapPrices.length == 1) return twapPrices[0];
-        (uint256 min, uint256 secondMin) = twapPrices[0] < twapPrices[1]
-            ? (twapPrices[0], twapPrices[1])
-            : (twapPrices[1], twapPrices[0]);
-        if (twapPrices.length == 2) return min;
-
-        for (uint256 i = 2; i < twapPrices.length; i++) {
-            if (twapPrices[i] < min) {
-                secondMin = min;
-                min = twapPrices[i];
-            } else if (twapPrices[i] < secondMin) {
-                secondMin = twapPrices[i];
-            }
-        }
-        return secondMin;
+        return OrderStatistics.minOrSecondMin(twapPrices);
     }
 
-    function _findPrice(
-        address target,
-        address[] memory tokenAddresses,
-        uint256[] memory prices
-    ) internal view returns (uint256) {
-        for (uint256 i = 0; i < tokenAddresses.length; i++) {
-            if (tokenAddresses[i] == target) {
-                return prices[i];
+    /// @dev Relative price of `token` against the asset it is checked against: the preferred
+    /// asset if set, otherwise the first asset for relative price check that the relative oracle
+    /// supports.
+    function _getRelativePrice(address token)
+        internal
+        view
+        returns (
+            bool found,
+            address assetForCheck,
+            uint256 relativePrice
+        )
+    {
+        assetForCheck = preferredAssetsForRelativePriceCheck[token];
+        if (assetForCheck != address(0) && assetsForRelativePriceCheck.contains(assetForCheck)) {
+            try relativeOracle.getRelativePrice(token, assetForCheck) returns (uint256 price) {
+                return (true, assetForCheck, price);
+            } catch {}
+        }
+
+        for (uint256 j = 0; j < assetsForRelativePriceCheck.length(); j++) {
+            assetForCheck = assetsForRelativePriceCheck.at(j);
+            if (token == assetForCheck || !relativeOracle.isPairSupported(token, assetForCheck)) {
+                continue;
             }
+            return (true, assetForCheck, relativeOracle.getRelativePrice(token, assetForCheck));
         }
-        return usdOracle.getPriceUSD(target);
+        return (false, address(0), 0);
     }
 
-    function _sort(uint256[] memory data) internal view returns (uint256[] memory) {
-        _quickSort(data, int256(0), int256(data.length - 1));
-        return data;
+    /// @dev Copies of `tokenAddresses` and `prices`, sorted by address, for `_findPrice`.
+    /// Insertion sort, as there are only a few tokens.
+    function _sortByAddress(address[] memory tokenAddresses, uint256[] memory prices)
+        internal
+        pure
+        returns (address[] memory sortedAddresses, uint256[] memory sortedPrices)
+    {
+        uint256 length = tokenAddresses.length;
+        sortedAddresses = new address[](length);
+        sortedPrices = new uint256[](length);
+        for (uint256 i = 0; i < length; i++) {
+            address tokenAddress = tokenAddresses[i];
+            uint256 j = i;
+            for (; j > 0 && sortedAddresses[j - 1] > tokenAddress; j--) {
+                sortedAddresses[j] = sortedAddresses[j - 1];
+                sortedPrices[j] = sortedPrices[j - 1];
+            }
+            sortedAddresses[j] = tokenAddress;
+            sortedPrices[j] = prices[i];
+        }
     }
 
-    function _quickSort(
-        uint256[] memory arr,
-        int256 left,
-        int256 right
-    ) internal view {
-        int256 i = left;
-        int256 j = right;
-        if (i == j) return;
-        uint256 pivot = arr[uint256(left + (right - left) / 2)];
-        while (i <= j) {
-            while (arr[uint256(i)] < pivot) i++;
-            while (pivot < arr[uint256(j)]) j--;
-            if (i <= j) {
-                (arr[uint256(i)], arr[uint256(j)]) = (arr[uint256(j)], arr[uint256(i)]);
-                i++;
-                j--;
+    /// @dev Binary search in the output of `_sortByAddress`.
+    /// Falls back to the USD oracle if `target` is not there.
+    function _findPrice(
+        address target,
+        address[] memory sortedAddresses,
+        uint256[] memory sortedPrices
+    ) internal view returns (uint256) {
+        uint256 low = 0;
+        uint256 high = sortedAddresses.length;
+        while (low < high) {
+            uint256 mid = (low + high) / 2;
+            if (sortedAddresses[mid] < target) {
+                low = mid + 1;
+            } else {
+                high = mid;
             }
         }
-        if (left < j) _quickSort(arr, left, j);
-        if (i < right) _quickSort(arr, i, right);
+        if (low < sortedAddresses.length && sortedAddresses[low] == target) {
+            return sortedPrices[low];
+        }
+        return usdOracle.getPriceUSD(target);
     }
 
-    function _median(uint256[] memory array) internal view returns (uint256) {
-        _sort(array);
-        return
-            array.length % 2 == 0
-                ? Math.average(array[array.length / 2 - 1], array[array.length / 2])
-                : array[array.length / 2];
+    function _median(uint256[] memory array) internal pure returns (uint256) {
+        return OrderStatistics.median(array);
     }
 
     function getETHPrices() public view returns (uint256[] memory ethPrices) {
@@ -17,6 +17,12 @@ contract TrustedSignerPriceOracle is IUSDPriceOracle {
     /// @notice we throw an error if the price is older than `MAX_LAG` seconds
     uint256 public constant MAX_LAG = 3600;
 
+    /// @notice `kind` of the messages posted with `postBatchPrices`
+    bytes32 public constant BATCH_PRICES_KIND = "batch-prices";
+
+    /// @dev hash of the `kind` of the messages posted with `postPrice` and `postPrices`
+    bytes32 internal constant PRICES_KIND_HASH = keccak256("prices");
+
     /// @notice this event is emitted when the price of `asset` is updated
     event PriceUpdated(address indexed asset, uint256 price, uint256 timestamp);
 
@@ -25,6 +31,19 @@ contract TrustedSignerPriceOracle is IUSDPriceOracle {
         bytes signature;
     }
 
+    /// @notice `assetId` is the asset name as stored by the asset registry, i.e. `bytes32(bytes(assetName))`
+    struct BatchPrice {
+        bytes32 assetId;
+        uint64 timestamp;
+        uint128 price;
+    }
+
+    struct CachedAssetAddress {
+        address assetAddress;
+        // `assetRegistry.assetAddressesVersion()` when the address was cached
+        uint96 registryVersion;
+    }
+
     struct PriceData {
         uint64 timestamp;
         uint128 price;
@@ -45,6 +64,10 @@ contract TrustedSignerPriceOracle is IUSDPriceOracle {
     /// @notice if this is `true`, the oracle will revert if the price is stale
     bool public preventStalePrice;
 
+    /// @dev asset id to asset address, cached from the asset registry
+    /// Entries are only used while the registry version is unchanged
+    mapping(bytes32 => CachedAssetAddress) internal assetAddresses;
+
     constructor(
         address _assetRegistry,
         address _priceSigner,
@@ -85,12 +108,40 @@ contract TrustedSignerPriceOracle is IUSDPriceOracle {
         _postPrice(message, signature);
     }
 
+    /// @notice Updates several prices with a single message signed by the trusted signer
+    /// The message should have the following ABI-encoded format: (bytes32 kind, BatchPrice[] prices)
+    /// where `kind` is `BATCH_PRICES_KIND`
+    /// Asset addresses are cached and looked up again whenever an asset address changes in the
+    /// registry, so that prices are always posted to the same addresses as with `postPrice`
+    function postBatchPrices(bytes memory message, bytes memory signature) external {
+        address signingAddress = verifyMessage(message, signature);
+        require(signingAddress == trustedPriceSigner, Errors.INVALID_MESSAGE);
+
+        BatchPrice[] memory batchPrices = decodeBatchMessage(message);
+        uint256 registryVersion = assetRegistry.assetAddressesVersion();
+        for (uint256 i = 0; i < batchPrices.length; i++) {
+            BatchPrice memory batchPrice = batchPrices[i];
+            _updatePrice(
+                _getAssetAddress(batchPrice.assetId, registryVersion),
+                batchPrice.timestamp,
+                batchPrice.price
+            );
+        }
+    }
+
     function _postPrice(bytes memory message, bytes memory signature) internal {
         address signingAddress = verifyMessage(message, signature);
         require(signingAddress == trustedPriceSigner, Errors.INVALID_MESSAGE);
 
         (uint256 timestamp, string memory assetName, uint256 price) = decodeMessage(message);
-        address assetAddress = assetRegistry.getAssetAddress(assetName);
+        _updatePrice(assetRegistry.getAssetAddress(assetName), timestamp, price);
+    }
+
+    function _updatePrice(
+        address assetAddress,
+        uint256 timestamp,
+        uint256 price
+    ) internal {
         PriceData storage priceData = prices[assetAddress];
         require(
             timestamp > priceData.timestamp && timestamp + MAX_LAG >= block.timestamp,
@@ -105,6 +156,30 @@ contract TrustedSignerPriceOracle is IUSDPriceOracle {
         emit PriceUpdated(assetAddress, scaledPrice, timestamp);
     }
 
+    function _getAssetAddress(bytes32 assetId, uint256 registryVersion)
+        internal
+        returns (address)
+    {
+        CachedAssetAddress memory cached = assetAddresses[assetId];
+        if (cached.assetAddress != address(0) && cached.registryVersion == registryVersion) {
+            return cached.assetAddress;
+        }
+        address assetAddress = _fetchAssetAddress(assetId);
+        assetAddresses[assetId] = CachedAssetAddress(assetAddress, uint96(registryVersion));
+        return assetAddress;
+    }
+
+    /// @dev reverts with `ASSET_NOT_SUPPORTED` if `assetId` is not registered
+    function _fetchAssetAddress(bytes32 assetId) internal view returns (address) {
+        uint256 length = 0;
+        while (length < 32 && assetId[length] != 0) length++;
+        bytes memory assetName = new bytes(length);
+        for (uint256 i = 0; i < length; i++) {
+            assetName[i] = assetId[i];
+        }
+        return assetRegistry.getAssetAddress(string(assetName));
+    }
+
     function decodeMessage(bytes memory message)
         internal
         pure
@@ -118,13 +193,19 @@ contract TrustedSignerPriceOracle is IUSDPriceOracle {
             message,
             (string, uint256, string, uint256)
         );
-        require(
-            keccak256(abi.encodePacked(kind)) == keccak256(abi.encodePacked("prices")),
-            Errors.INVALID_MESSAGE
-        );
+        require(keccak256(bytes(kind)) == PRICES_KIND_HASH, Errors.INVALID_MESSAGE);
         return (timestamp, key, value);
     }
 
+    function decodeBatchMessage(bytes memory message) internal pure returns (BatchPrice[] memory) {
+        (bytes32 kind, BatchPrice[] memory batchPrices) = abi.decode(
+            message,
+            (bytes32, BatchPrice[])
+        );
+        require(kind == BATCH_PRICES_KIND, Errors.INVALID_MESSAGE);
+        return batchPrices;
+    }
+
     function verifyMessage(bytes memory message, bytes memory signature)
         internal
         pure
@@ -33,4 +33,16 @@ contract TestingCheckedPriceOracle is CheckedPriceOracle {
     function median(uint256[] memory array) external view returns (uint256) {
         return _median(array);
     }
+
+    function findPrice(
+        address target,
+        address[] memory tokenAddresses,
+        uint256[] memory prices
+    ) external view returns (uint256) {
+        (address[] memory sortedAddresses, uint256[] memory sortedPrices) = _sortByAddress(
+            tokenAddresses,
+            prices
+        );
+        return _findPrice(target, sortedAddresses, sortedPrices);
+    }
 }
@@ -0,0 +1,59 @@
+// SPDX-License-Identifier: LicenseRef-Gyro-1.0
+// for information on licensing please see the README in the GitHub repository <https://github.com/gyrostable/core-protocol>.
+pragma solidity ^0.8.4;
+
+import "@openzeppelin/contracts/utils/math/Math.sol";
+
+import "../../../libraries/OrderStatistics.sol";
+
+contract OrderStatisticsProfiler {
+    // NOTE: needs to not be pure to be able to get transaction information from the frontend
+    function profileMedian(uint256[][] memory data) external returns (uint256 median) {
+        for (uint256 i = 0; i < data.length; i++) {
+            median = OrderStatistics.median(data[i]);
+        }
+    }
+
+    /// @dev The previous median of CheckedPriceOracle, sorting the whole array, for comparison
+    function profileSortMedian(uint256[][] memory data) external returns (uint256 median) {
+        for (uint256 i = 0; i < data.length; i++) {
+            median = _sortMedian(data[i]);
+        }
+    }
+
+    function profileMinOrSecondMin(uint256[][] memory data) external returns (uint256 result) {
+        for (uint256 i = 0; i < data.length; i++) {
+            result = OrderStatistics.minOrSecondMin(data[i]);
+        }
+    }
+
+    function _sortMedian(uint256[] memory array) internal pure returns (uint256) {
+        _quickSort(array, int256(0), int256(array.length - 1));
+        return
+            array.length % 2 == 0
+                ? Math.average(array[array.length / 2 - 1], array[array.length / 2])
+                : array[array.length / 2];
+    }
+
+    function _quickSort(
+        uint256[] memory arr,
+        int256 left,
+        int256 right
+    ) internal pure {
+        int256 i = left;
+        int256 j = right;
+        if (i == j) return;
+        uint256 pivot = arr[uint256(left + (right - left) / 2)];
+        while (i <= j) {
+            while (arr[uint256(i)] < pivot) i++;
+            while (pivot < arr[uint256(j)]) j--;
+            if (i <= j) {
+                (arr[uint256(i)], arr[uint256(j)]) = (arr[uint256(j)], arr[uint256(i)]);
+                i++;
+                j--;
+            }
+        }
+        if (left < j) _quickSort(arr, left, j);
+        if (i < right) _quickSort(arr, i, right);
+    }
+}
@@ -21,4 +21,8 @@ contract TrustedSignerPriceOracleProfiler is TrustedSignerPriceOracle {
             this.postPrice(signedPrice.message, signedPrice.signature);
         }
     }
+
+    function profilePostBatchPrices(bytes calldata message, bytes calldata signature) external {
+        this.postBatchPrices(message, signature);
+    }
 }
@@ -26,6 +26,10 @@ interface IAssetRegistry {
     /// e.g. "DAI" -> 0x6B175474E89094C44Da98b954EedeAC495271d0F
     function getAssetAddress(string calldata assetName) external view returns (address);
 
+    /// @notice Incremented whenever an asset address is set or removed
+    /// Consumers caching asset addresses can compare it to detect stale entries
+    function assetAddressesVersion() external view returns (uint256);
+
     /// @notice Returns a list of names for the registered assets
     /// The asset are encoded as bytes32 (big endian) rather than string
     function getRegisteredAssetNames() external view returns (bytes32[] memory);
@@ -48,6 +52,13 @@ interface IAssetRegistry {
     /// @return true if the asset name is stable
     function isAssetStable(address assetAddress) external view returns (bool);
 
+    /// @notice Batched version of `isAssetStable` and `getAssetRange`
+    /// The range is only set (and required to be set) for stable assets
+    function getAssetsStabilityAndRanges(address[] calldata assetAddresses)
+        external
+        view
+        returns (bool[] memory isStable, DataTypes.Range[] memory ranges);
+
     /// @notice Adds a stable asset to the registry
     /// The asset must already be registered in the registry
     function addStableAsset(address assetAddress) external;
@@ -27,7 +27,8 @@ interface IReserveStewardshipIncentives {
     /// @notice Update the internally tracked variables. Called internally but can also be called by anyone.
     function checkpoint() external;
 
-    /// @notice Variant of `checkpoint()` where the reserve state is passed in; only callable by Motherboard.
+    /// @notice Variant of `checkpoint()` where the reserve state is passed in; only callable by Motherboard and
+    /// GydRecovery.
     function checkpoint(DataTypes.ReserveState memory reserveState) external;
 
     /// @notice Whether there is an active initiative.
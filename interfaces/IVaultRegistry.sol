@@ -19,6 +19,13 @@ interface IVaultRegistry {
     /// @notice Get the list of all vaults
     function listVaults() external view returns (address[] memory);
 
+    /// @notice Get the list of all vaults together with their metadata
+    /// Vaults are in the same order as in `listVaults`
+    function listVaultsWithMetadata()
+        external
+        view
+        returns (address[] memory, DataTypes.PersistedVaultMetadata[] memory);
+
     /// @notice Registers a new vault
     function setVaults(DataTypes.VaultConfiguration[] memory vaults) external;
 
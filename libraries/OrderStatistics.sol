@@ -0,0 +1,72 @@
+// SPDX-License-Identifier: LicenseRef-Gyro-1.0
+// for information on licensing please see the README in the GitHub repository <https://github.com/gyrostable/core-protocol>.
+pragma solidity ^0.8.4;
+
+import "@openzeppelin/contracts/utils/math/Math.sol";
+
+import "./Errors.sol";
+
+/// @notice Order statistics (k-th smallest element, median) of small in-memory arrays without sorting them
+library OrderStatistics {
+    /// @dev Returns the `k`-th smallest element (0-indexed) of `data`, reordering `data` in-place so that all elements
+    /// before index `k` are smaller or equal and all elements after it are larger or equal.
+    /// Iterative quickselect (Wirth's variant: Hoare partitioning around the element currently at index `k`)
+    function select(uint256[] memory data, uint256 k) internal pure returns (uint256) {
+        require(k < data.length, Errors.INVALID_ARGUMENT);
+        int256 target = int256(k);
+        int256 left = 0;
+        int256 right = int256(data.length) - 1;
+        while (left < right) {
+            uint256 pivot = data[k];
+            int256 i = left;
+            int256 j = right;
+            while (i <= j) {
+                while (data[uint256(i)] < pivot) i++;
+                while (pivot < data[uint256(j)]) j--;
+                if (i <= j) {
+                    (data[uint256(i)], data[uint256(j)]) = (data[uint256(j)], data[uint256(i)]);
+                    i++;
+                    j--;
+                }
+            }
+            if (j < target) left = i;
+            if (target < i) right = j;
+        }
+        return data[k];
+    }
+
+    /// @dev Median of `data`, the average of the two middle elements if the length is even.
+    /// Reorders `data` in-place.
+    function median(uint256[] memory data) internal pure returns (uint256) {
+        uint256 length = data.length;
+        uint256 upper = select(data, length / 2);
+        if (length % 2 == 1) return upper;
+
+        // After `select`, the lower middle element is the largest element of the lower half
+        uint256 lower = data[0];
+        for (uint256 i = 1; i < length / 2; i++) {
+            if (data[i] > lower) lower = data[i];
+        }
+        return Math.average(lower, upper);
+    }
+
+    /// @dev The minimum if there are one or two elements, the second smallest element otherwise.
+    function minOrSecondMin(uint256[] memory data) internal pure returns (uint256) {
+        require(data.length > 0, Errors.INVALID_ARGUMENT);
+        if (data.length == 1) return data[0];
+        (uint256 min, uint256 secondMin) = data[0] < data[1]
+            ? (data[0], data[1])
+            : (data[1], data[0]);
+        if (data.length == 2) return min;
+
+        for (uint256 i = 2; i < data.length; i++) {
+            if (data[i] < min) {
+                secondMin = min;
+                min = data[i];
+            } else if (data[i] < secondMin) {
+                secondMin = data[i];
+            }
+        }
+        return secondMin;
+    }
+}
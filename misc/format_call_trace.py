@@ -1,14 +1,16 @@
 import argparse
+from collections import defaultdict
 from dataclasses import dataclass
 import gzip
 import json
-from functools import cached_property
 from glob import glob
 from os import path
-from typing import Dict, List, Optional
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, TextIO, Tuple
 
 from web3 import Web3
 
+from trace_index import cached_index
 
 ROOT_DIR = path.dirname(path.dirname(__file__))
 
@@ -18,12 +20,33 @@ TRACE_URLS = {
     1: "https://etherscan.io/vmtrace",
 }
 
+DEFAULT_TOP = 20
+
 parser = argparse.ArgumentParser(prog="format-call-trace.py")
-parser.add_argument("trace_or_txid", help="Path to the trace file or transaction id")
+parser.add_argument(
+    "trace_or_txid",
+    nargs="+",
+    help="Path to the trace file or transaction id. With --analyze, any number of trace files or directories",
+)
 parser.add_argument("-s", "--save-trace", help="Save trace to file when it is fetched")
 parser.add_argument(
     "-n", "--network", help="Network ID", type=int, default=DEFAULT_NETWORK_ID
 )
+parser.add_argument(
+    "-l", "--max-level", type=int, help="Only print calls down to this depth"
+)
+parser.add_argument(
+    "-a",
+    "--analyze",
+    action="store_true",
+    help="Aggregate gas per contract and function over saved trace files instead of printing the trace",
+)
+parser.add_argument(
+    "-t", "--top", type=int, default=DEFAULT_TOP, help="Rows per table in --analyze"
+)
+parser.add_argument(
+    "-f", "--folded", help="With --analyze, write folded stacks (flamegraph) here"
+)
 
 
 @dataclass
@@ -32,30 +55,38 @@ class Metadata:
     known_contracts: Dict[str, str]
 
 
-def load_4bytes():
-    files = [
-        "build/4byte_signatures.json",
-        "misc/vaults_4byte.json",
-        "misc/vaults_4byte.json",
-    ]
+SELECTOR_FILES = [
+    "build/4byte_signatures.json",
+    "misc/vaults_4byte.json",
+]
+
+
+def _read_4bytes():
     selectors = {}
-    for filename in files:
+    for filename in SELECTOR_FILES:
         open_f = gzip.open if filename.endswith(".gz") else open
         with open_f(path.join(ROOT_DIR, filename)) as f:
             selectors.update(json.load(f))
     return selectors
 
 
-def load_known_contracts(network_id):
+def load_4bytes():
+    sources = [path.join(ROOT_DIR, filename) for filename in SELECTOR_FILES]
+    return cached_index("selectors", sources, _read_4bytes)
+
+
+def _deployments_dir(network_id):
+    return path.join(ROOT_DIR, f"build/deployments/{network_id}")
+
+
+def _read_known_contracts(network_id):
     with open(path.join(ROOT_DIR, "misc/known_contracts.json")) as f:
         known_contracts = {
             str(Web3.toChecksumAddress(a)): n
             for a, n in json.load(f)[str(network_id)].items()
         }
 
-    for deployment in glob(
-        path.join(ROOT_DIR, f"build/deployments/{network_id}/*.json")
-    ):
+    for deployment in glob(path.join(_deployments_dir(network_id), "*.json")):
         with open(deployment) as f:
             deployment = json.load(f)
             key = Web3.toChecksumAddress(deployment["deployment"]["address"])
@@ -63,52 +94,83 @@ def load_known_contracts(network_id):
     return known_contracts
 
 
+def load_known_contracts(network_id):
+    deployments_dir = _deployments_dir(network_id)
+    sources = [
+        path.join(ROOT_DIR, "misc/known_contracts.json"),
+        *glob(path.join(deployments_dir, "*.json")),
+    ]
+    return cached_index(
+        f"known_contracts_{network_id}",
+        sources,
+        lambda: _read_known_contracts(network_id),
+    )
+
+
 class Call:
+    """View over one call of a callTracer trace.
+
+    Subcalls are created on access and not kept, so that only the calls being visited are in memory besides the
+    trace itself, and nothing recurses over the depth of the trace.
+    """
+
+    __slots__ = ("trace", "parent", "_to")
+
     metadata: Metadata
 
     def __init__(self, trace, parent=None):
         self.trace = trace
-        self.calls = [Call(call, self) for call in trace.get("calls", [])]
         self.parent = parent
+        self._to = None
+
+    @property
+    def calls(self) -> List["Call"]:
+        return list(self.iter_calls())
+
+    def iter_calls(self) -> Iterator["Call"]:
+        return (Call(call, self) for call in self.trace.get("calls", ()))
 
-    @cached_property
+    @property
     def input(self):
         return self.trace["input"]
 
-    @cached_property
+    @property
     def error(self):
         return self.trace.get("error")
 
-    @cached_property
+    @property
     def selector(self):
         return self.input[2:10]
 
-    @cached_property
+    @property
     def function_signature(self):
         return self.metadata.selectors.get(self.selector, self.selector)
 
-    @cached_property
+    @property
     def function_name(self):
         return self.function_signature.split("(")[0]
 
-    @cached_property
+    @property
     def to(self):
-        return Web3.toChecksumAddress(self.trace["to"])
+        if self._to is None:
+            self._to = Web3.toChecksumAddress(self.trace["to"])
+        return self._to
 
-    @cached_property
+    @property
     def type(self):
         return self.trace["type"]
 
-    @cached_property
+    @property
     def is_proxy(self):
+        calls = self.trace.get("calls", ())
         return (
             self.to in self.metadata.known_contracts
-            and len(self.calls) == 1
-            and self.calls[0].type == "DELEGATECALL"
-            and self.calls[0].input == self.input
+            and len(calls) == 1
+            and calls[0]["type"] == "DELEGATECALL"
+            and calls[0]["input"] == self.input
         )
 
-    @cached_property
+    @property
     def formatted_to(self):
         name = self.metadata.known_contracts.get(self.to)
         if not name:
@@ -119,49 +181,68 @@ class Call:
             return f"{name}Proxy"
         return name
 
-    @cached_property
+    @property
     def gas_used(self):
         return int(self.trace["gasUsed"], 16)
 
-    @cached_property
+    @property
+    def self_gas(self):
+        """Gas used by this call excluding its subcalls."""
+        return self.gas_used - sum(
+            int(call["gasUsed"], 16) for call in self.trace.get("calls", ())
+        )
+
+    @property
+    def name(self):
+        return f"{self.formatted_to}.{self.function_name}"
+
+    @property
     def summary(self):
-        summary = f"{self.formatted_to}.{self.function_name} ({self.gas_used:,})"
+        summary = f"{self.name} ({self.gas_used:,})"
         if self.error:
             summary += f" ✗: {self.error}"
         return summary
 
-    def format(self, maxlvl=None):
-        return self._format([], maxlvl=maxlvl)
-
-    def _format(
-        self,
-        prefixes: List[bool],
-        is_last: bool = False,
-        maxlvl=None,
-        lvl=1,
-    ):
-        format_prefix = lambda x: "│   " if x else "    "
-        prefix = "".join(map(format_prefix, prefixes[:-1]))
-        pipe = "└" if is_last else "│"
-        prefix += f"{pipe}─({self.type})─"
-        line = f"{prefix} {self.summary}\n"
-        if maxlvl is None or lvl < maxlvl:
-            line += "".join(
-                child._format(
-                    prefixes + [i < len(self.calls) - 1],
-                    i == len(self.calls) - 1,
-                    maxlvl,
-                    lvl + 1,
-                )
-                for i, child in enumerate(self.calls)
+    def format(self, maxlvl=None) -> str:
+        return "".join(self.iter_lines(maxlvl))
+
+    def write(self, out: TextIO = sys.stdout, maxlvl=None):
+        for line in self.iter_lines(maxlvl):
+            out.write(line)
+
+    def iter_lines(self, maxlvl=None) -> Iterator[str]:
+        """Lines of the formatted tree, down to `maxlvl` levels (this call is level 1).
+        Subcalls below `maxlvl` are never created."""
+        # (call, indentation, is last child, level)
+        pending = [(self, "", False, 1)]
+        while pending:
+            call, indent, is_last, lvl = pending.pop()
+            pipe = "└" if is_last else "│"
+            yield f"{indent}{pipe}─({call.type})─ {call.summary}\n"
+            if maxlvl is not None and lvl >= maxlvl:
+                continue
+            children = call.calls
+            if lvl > 1:
+                indent += "    " if is_last else "│   "
+            pending.extend(
+                (child, indent, i == len(children) - 1, lvl + 1)
+                for i, child in reversed(list(enumerate(children)))
             )
-        return line
+
+
+def _load_trace_file(filename: str):
+    open_f = gzip.open if filename.endswith(".gz") else open
+    with open_f(filename) as f:
+        trace = json.load(f)
+    # raw debug_traceTransaction responses
+    if "result" in trace and "calls" not in trace:
+        trace = trace["result"]
+    return trace
 
 
 def get_trace(trace_or_txid: str, network_id: int, save_trace: Optional[str] = None):
     if path.exists(trace_or_txid):
-        with open(trace_or_txid) as f:
-            return json.load(f)
+        return _load_trace_file(trace_or_txid)
     elif trace_or_txid.startswith("0x") and len(trace_or_txid) == 66:
         from bs4 import BeautifulSoup
         import requests
@@ -180,12 +261,101 @@ def get_trace(trace_or_txid: str, network_id: int, save_trace: Optional[str] = N
         raise ValueError("invalid trace or txid")
 
 
+def iter_calls(root: Call) -> Iterator[Tuple[Tuple[str, ...], Call]]:
+    """All calls in the tree in call order, with the names of the calls on the stack up to and including each."""
+    pending = [((root.name,), root)]
+    while pending:
+        stack, call = pending.pop()
+        yield stack, call
+        pending.extend((stack + (c.name,), c) for c in reversed(call.calls))
+
+
+@dataclass
+class GasStats:
+    calls: int = 0
+    # number of traces in which the function is called
+    transactions: int = 0
+    self_gas: int = 0
+    # NB: recursive calls are counted once per call
+    inclusive_gas: int = 0
+
+
+def aggregate_gas(roots: Iterable[Call]) -> Dict[str, GasStats]:
+    """Gas per contract and function ("Contract.function") over all calls in the given traces."""
+    stats: Dict[str, GasStats] = defaultdict(GasStats)
+    for root in roots:
+        seen = set()
+        for _, call in iter_calls(root):
+            function_stats = stats[call.name]
+            function_stats.calls += 1
+            function_stats.self_gas += call.self_gas
+            function_stats.inclusive_gas += call.gas_used
+            if call.name not in seen:
+                seen.add(call.name)
+                function_stats.transactions += 1
+    return dict(stats)
+
+
+def folded_stacks(roots: Iterable[Call]) -> List[str]:
+    """Folded stacks ("caller;callee gas" per line, as read by flamegraph.pl and speedscope) weighted by self gas."""
+    weights: Dict[Tuple[str, ...], int] = defaultdict(int)
+    for root in roots:
+        for stack, call in iter_calls(root):
+            weights[stack] += max(call.self_gas, 0)
+    return [f"{';'.join(stack)} {weight}" for stack, weight in weights.items()]
+
+
+def format_top(stats: Dict[str, GasStats], key: str, top: int) -> str:
+    rows = sorted(stats.items(), key=lambda item: getattr(item[1], key), reverse=True)
+    rows = rows[:top]
+    width = max([len("function")] + [len(name) for name, _ in rows])
+    lines = [
+        f"{'function':<{width}} {'calls':>8} {'txs':>6} {'self gas':>14} {'inclusive gas':>14} {'self/call':>10}"
+    ]
+    for name, s in rows:
+        lines.append(
+            f"{name:<{width}} {s.calls:>8,} {s.transactions:>6,} {s.self_gas:>14,} "
+            f"{s.inclusive_gas:>14,} {s.self_gas // s.calls:>10,}"
+        )
+    return "\n".join(lines)
+
+
+def list_trace_files(paths: Iterable[str]) -> List[str]:
+    files = []
+    for p in paths:
+        if path.isdir(p):
+            files.extend(
+                sorted(glob(path.join(p, "*.json")) + glob(path.join(p, "*.json.gz")))
+            )
+        else:
+            files.append(p)
+    return files
+
+
+def analyze(args):
+    files = list_trace_files(args.trace_or_txid)
+    roots = [Call(_load_trace_file(f)) for f in files]
+    stats = aggregate_gas(roots)
+    print(f"{len(files)} traces\n")
+    print(f"top {args.top} by self gas")
+    print(format_top(stats, "self_gas", args.top))
+    print(f"\ntop {args.top} by inclusive gas")
+    print(format_top(stats, "inclusive_gas", args.top))
+    if args.folded:
+        with open(args.folded, "w") as f:
+            f.writelines(line + "\n" for line in folded_stacks(roots))
+
+
 def main():
     args = parser.parse_args()
-    trace = get_trace(args.trace_or_txid, args.network, save_trace=args.save_trace)
     Call.metadata = Metadata(load_4bytes(), load_known_contracts(args.network))
-    call = Call(trace)
-    print(call.format())
+    if args.analyze:
+        analyze(args)
+        return
+    if len(args.trace_or_txid) > 1:
+        parser.error("only one trace or transaction id can be formatted")
+    trace = get_trace(args.trace_or_txid[0], args.network, save_trace=args.save_trace)
+    Call(trace).write(maxlvl=args.max_level)
 
 
 if __name__ == "__main__":
@@ -6,6 +6,8 @@ import argparse
 
 import web3
 
+from trace_index import cached_index
+
 BUILD_PATH = path.join(path.dirname(path.dirname(__file__)), "build")
 CONTRACTS_PATH = path.join(BUILD_PATH, "contracts")
 DEFAULT_OUTPUT = path.join(BUILD_PATH, "4byte_signatures.json")
@@ -60,8 +62,13 @@ def generate_all_signatures(files, include_contract_name=False):
 
 def run_generation(output, include_contract_name):
     files = glob.glob(path.join(CONTRACTS_PATH, "**", "*.json"), recursive=True)
-    signatures = generate_all_signatures(
-        files, include_contract_name=include_contract_name
+    index_name = "abi_signatures_named" if include_contract_name else "abi_signatures"
+    signatures = cached_index(
+        index_name,
+        files,
+        lambda: generate_all_signatures(
+            files, include_contract_name=include_contract_name
+        ),
     )
     with open(output, "w") as f:
         json.dump(signatures, f, indent=2)
@@ -0,0 +1,54 @@
+"""On-disk cache of the lookup tables used by the trace tooling (selectors, known contracts).
+
+An index is a pickled value stored together with the modification times and sizes of the files it was built from.
+It is rebuilt whenever one of these files changes, is added or is removed.
+"""
+
+import os
+import pickle
+from os import path
+from typing import Callable, Iterable, List, Optional, Tuple, TypeVar
+
+ROOT_DIR = path.dirname(path.dirname(path.abspath(__file__)))
+INDEX_DIR = path.join(ROOT_DIR, ".cache", "trace_index")
+
+# Bump when the format of any index changes
+INDEX_VERSION = 1
+
+T = TypeVar("T")
+
+SourceKey = List[Tuple[str, Optional[int], Optional[int]]]
+
+
+def source_key(sources: Iterable[str]) -> SourceKey:
+    """Identifies the state of `sources`. Directories should be included when the set of files in them matters."""
+    key = []
+    for source in sorted(set(sources)):
+        try:
+            stat = os.stat(source)
+            key.append((source, stat.st_mtime_ns, stat.st_size))
+        except FileNotFoundError:
+            key.append((source, None, None))
+    return key
+
+
+def cached_index(name: str, sources: Iterable[str], build: Callable[[], T]) -> T:
+    """Returns the index `name`, calling `build` only if `sources` changed since it was last built."""
+    key = source_key(sources)
+    index_path = path.join(INDEX_DIR, f"{name}.pickle")
+    try:
+        with open(index_path, "rb") as f:
+            version, cached_key, value = pickle.load(f)
+        if version == INDEX_VERSION and cached_key == key:
+            return value
+    except (OSError, pickle.UnpicklingError, EOFError, ValueError):
+        pass
+
+    value = build()
+    os.makedirs(INDEX_DIR, exist_ok=True)
+    # write and rename so that concurrent readers never see a partial index
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        pickle.dump((INDEX_VERSION, key, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+    os.replace(tmp_path, index_path)
+    return value
@@ -6,6 +6,7 @@ from scripts.utils import (
     deploy_proxy,
     get_deployer,
     make_tx_params,
+    upgrade_proxy,
     with_deployed,
     with_gas_usage,
 )
@@ -172,6 +173,12 @@ def proxy(governance_proxy, asset_registry):
     )
 
 
+@with_gas_usage
+def upgrade():
+    # with_deployed(AssetRegistry) resolves to the registry in use, we want the latest implementation
+    upgrade_proxy(AssetRegistry[-1], config_key=config_keys.ASSET_REGISTRY_ADDRESS)
+
+
 @with_gas_usage
 @as_singleton(AssetRegistry)
 @with_deployed(GyroConfig)
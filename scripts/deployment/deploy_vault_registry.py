@@ -3,6 +3,7 @@ from scripts.utils import (
     deploy_proxy,
     get_deployer,
     make_tx_params,
+    upgrade_proxy,
     with_deployed,
     with_gas_usage,
     as_singleton,
@@ -21,6 +22,12 @@ def proxy(governance_proxy, vault_registry):
     )
 
 
+@with_gas_usage
+@with_deployed(VaultRegistry)
+def upgrade(vault_registry):
+    upgrade_proxy(vault_registry, config_key=config_keys.VAULT_REGISTRY_ADDRESS)
+
+
 @with_gas_usage
 @with_deployed(GyroConfig)
 @as_singleton(VaultRegistry)
@@ -0,0 +1,52 @@
+"""Deployment helpers shared by the profiling scripts, with the same setup as the test fixtures in
+`tests/fixtures/deployments.py`."""
+
+from typing import Iterable, Tuple
+
+from brownie import (  # type: ignore
+    AssetRegistry,
+    FreezableTransparentUpgradeableProxy,
+    GyroConfig,
+    ProxyAdmin,
+)
+
+from tests.support import config_keys, constants
+
+
+def deploy_with_proxy(admin, proxy_admin, Contract, initialize, *args):
+    contract = admin.deploy(Contract, *args)
+    proxy = admin.deploy(
+        FreezableTransparentUpgradeableProxy,
+        contract,
+        proxy_admin,
+        initialize(contract),
+    )
+    FreezableTransparentUpgradeableProxy.remove(proxy)
+    return Contract.at(proxy, owner=admin)
+
+
+def deploy_asset_registry(admin, assets: Iterable[Tuple[str, str]]):
+    """`AssetRegistry` behind a proxy and initialized with `admin` as governor, like the `asset_registry` fixture,
+    with the (name, address) pairs in `assets` registered."""
+    proxy_admin = admin.deploy(ProxyAdmin)
+    gyro_config = deploy_with_proxy(
+        admin, proxy_admin, GyroConfig, lambda c: c.initialize.encode_input(admin)
+    )
+    gyro_config.setUint(
+        config_keys.STABLECOIN_MAX_DEVIATION,
+        constants.STABLECOIN_MAX_DEVIATION,
+        {"from": admin},
+    )
+    asset_registry = deploy_with_proxy(
+        admin,
+        proxy_admin,
+        AssetRegistry,
+        lambda c: c.initialize.encode_input(admin),
+        gyro_config,
+    )
+    gyro_config.setAddress(
+        config_keys.ASSET_REGISTRY_ADDRESS, asset_registry, {"from": admin}
+    )
+    for name, address in assets:
+        asset_registry.setAssetAddress(name, address, {"from": admin})
+    return asset_registry
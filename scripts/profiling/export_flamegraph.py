@@ -0,0 +1,30 @@
+"""Exports the gas of the calls in a transaction as a flamegraph in folded-stack format.
+
+    brownie run scripts/profiling/export_flamegraph.py main <tx_hash> [output] --network <network>
+
+The output can be opened in speedscope (https://www.speedscope.app) or rendered with
+`flamegraph.pl --countname gas output.folded > output.svg`. Calls into contracts that brownie doesn't know are named
+from the ABIs of the project's contracts and interfaces where possible.
+"""
+
+from brownie import chain, project
+
+from scripts.profiling.profiling_utils import make_name_resolver, write_folded_stacks
+
+
+def project_selectors():
+    """4-byte selectors of all functions in the ABIs of the loaded project's contracts and interfaces."""
+    selectors = {}
+    for loaded_project in project.get_loaded_projects():
+        for container in loaded_project:
+            selectors.update(container.selectors)
+        for interface in loaded_project.interface.__dict__.values():
+            selectors.update(getattr(interface, "selectors", {}))
+    return selectors
+
+
+def main(tx_hash: str, output: str = ""):
+    tx = chain.get_transaction(tx_hash)
+    output = output or f"{tx_hash}.folded"
+    write_folded_stacks(tx, output, make_name_resolver(selectors=project_selectors()))
+    print(f"flamegraph written to {output}")
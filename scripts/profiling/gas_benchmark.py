@@ -0,0 +1,142 @@
+"""Machine-readable gas benchmark results and comparison against a stored baseline.
+
+Results are nested dicts `{benchmark: {case: {function: summary}}}` where `summary` is the output of `summarize()`.
+"""
+
+import json
+from typing import Dict, List, NamedTuple, Optional, Sequence
+
+import numpy as np
+
+from scripts.profiling.profiling_utils import CallStats
+
+# Keys of a summary, in the order in which they are written. "gas" is the value that `CallStats` reports as
+# `*_internal_gas`, the same as what `CallStats.format_with_values()` prints.
+SUMMARY_KEYS = [
+    "count",
+    "mean_gas",
+    "median_gas",
+    "p95_gas",
+    "std_gas",
+    "min_gas",
+    "max_gas",
+]
+
+DEFAULT_METRIC = "mean_gas"
+DEFAULT_THRESHOLD = 0.01
+
+BenchmarkResults = Dict[str, Dict[str, Dict[str, Dict[str, float]]]]
+
+
+class GasChange(NamedTuple):
+    benchmark: str
+    case: str
+    function: str
+    baseline: float
+    current: float
+
+    @property
+    def relative_change(self) -> float:
+        if self.baseline == 0:
+            return 0.0 if self.current == 0 else float("inf")
+        return (self.current - self.baseline) / abs(self.baseline)
+
+    def __str__(self) -> str:
+        return (
+            f"{self.benchmark} [{self.case}] {self.function}: "
+            f"{self.baseline} -> {self.current} ({self.relative_change:+.2%})"
+        )
+
+
+def summarize(stats: CallStats) -> Dict[str, float]:
+    return {
+        "count": stats.count,
+        "mean_gas": round(stats.mean_internal_gas, 3),
+        "median_gas": round(stats.median_internal_gas, 3),
+        "p95_gas": round(stats.p95_internal_gas, 3),
+        "std_gas": round(stats.std_internal_gas, 3),
+        "min_gas": stats.min_internal_gas,
+        "max_gas": stats.max_internal_gas,
+    }
+
+
+def save_results(results: BenchmarkResults, path: str):
+    with open(path, "w") as f:
+        json.dump(results, f, indent=2, sort_keys=True)
+        f.write("\n")
+
+
+def load_results(path: str) -> BenchmarkResults:
+    with open(path) as f:
+        return json.load(f)
+
+
+def compare_results(
+    results: BenchmarkResults,
+    baseline: BenchmarkResults,
+    metric: str = DEFAULT_METRIC,
+) -> List[GasChange]:
+    """Changes of `metric` for all (benchmark, case, function) present in both `results` and `baseline`."""
+    changes = []
+    for benchmark, cases in results.items():
+        for case, functions in cases.items():
+            for function, summary in functions.items():
+                baseline_summary = (
+                    baseline.get(benchmark, {}).get(case, {}).get(function)
+                )
+                if baseline_summary is None or metric not in baseline_summary:
+                    continue
+                changes.append(
+                    GasChange(
+                        benchmark,
+                        case,
+                        function,
+                        baseline_summary[metric],
+                        summary[metric],
+                    )
+                )
+    return changes
+
+
+def find_regressions(
+    changes: List[GasChange], threshold: float = DEFAULT_THRESHOLD
+) -> List[GasChange]:
+    """Changes where gas increased by more than `threshold` (relative, e.g. 0.01 for 1%)."""
+    return [c for c in changes if c.relative_change > threshold]
+
+
+def format_changes(changes: List[GasChange], threshold: Optional[float] = None) -> str:
+    """One line per change, only changes larger than `threshold` in absolute value if given."""
+    if threshold is not None:
+        changes = [c for c in changes if abs(c.relative_change) > threshold]
+    return "\n".join(str(c) for c in changes)
+
+
+class ScalingFit(NamedTuple):
+    """Least-squares fit `gas ≈ constant + linear * n + quadratic * n^2`."""
+
+    constant: float
+    linear: float
+    quadratic: float
+
+    def __call__(self, n: float) -> float:
+        return self.constant + self.linear * n + self.quadratic * n**2
+
+    def superlinear_share(self, n: float) -> float:
+        """Share of the fitted gas at `n` that comes from the quadratic term."""
+        value = self(n)
+        return 0.0 if value == 0 else self.quadratic * n**2 / value
+
+    def __str__(self) -> str:
+        return f"{self.constant:.0f} + {self.linear:.1f} n + {self.quadratic:.2f} n^2"
+
+
+def fit_scaling(ns: Sequence[float], gas: Sequence[float]) -> ScalingFit:
+    """Fits gas as a function of a size parameter `n` (e.g., the number of vaults). Needs at least three distinct
+    values of `n`; with fewer, the quadratic (and, if needed, the linear) coefficient is zero.
+    """
+    degree = min(2, len(set(ns)) - 1)
+    if degree < 0:
+        raise ValueError("no data to fit")
+    coefficients = np.polyfit(ns, gas, degree)[::-1].tolist()
+    return ScalingFit(*(coefficients + [0.0] * (3 - len(coefficients))))
@@ -0,0 +1,49 @@
+import random
+import time
+
+from tests.support.quantized_decimal import QuantizedDecimal
+from tests.support.quantized_int import QuantizedInt
+
+N_SAMPLES = 2_000
+N_REPEATS = 5
+
+
+def _samples():
+    rng = random.Random(0)
+    return [
+        f"{rng.uniform(0, 10 ** rng.randint(-6, 9)):.18f}" for _ in range(N_SAMPLES)
+    ]
+
+
+def _time(f, values):
+    best = float("inf")
+    for _ in range(N_REPEATS):
+        start = time.perf_counter()
+        results = [f(x) for x in values]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    samples = _samples()
+    for cls in [QuantizedDecimal, QuantizedInt]:
+        values = [cls(x) for x in samples]
+        # cbrt results are expected to differ: D(1 / 3) is 0.333333333333333333, not 1/3.
+        half, third = cls("0.5"), cls(1 / 3)
+        cases = [
+            ("sqrt", lambda x: x**half, lambda x: x.sqrt()),
+            ("cbrt", lambda x: x**third, lambda x: x.cbrt()),
+        ]
+        for name, old, new in cases:
+            t_old, r_old = _time(old, values)
+            t_new, r_new = _time(new, values)
+            n_diff = sum(a != b for a, b in zip(r_old, r_new))
+            print(
+                f"{cls.__name__}.{name}: power {t_old * 1e6 / N_SAMPLES:.1f}us, "
+                f"root {t_new * 1e6 / N_SAMPLES:.1f}us ({t_old / t_new:.1f}x), "
+                f"{n_diff}/{N_SAMPLES} results differ"
+            )
+
+
+if __name__ == "__main__":
+    main()
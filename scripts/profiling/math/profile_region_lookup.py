@@ -0,0 +1,48 @@
+import random
+import time
+
+from tests.support.pamm import D, Pamm, Params
+
+N_SAMPLES = 10_000
+N_REPEATS = 5
+
+
+def _samples():
+    rng = random.Random(0)
+    return [
+        (D(str(round(rng.uniform(0.3, 1), 6))), D(str(round(rng.uniform(0, 1), 6))))
+        for _ in range(N_SAMPLES)
+    ]
+
+
+def _time(f, samples):
+    best = float("inf")
+    for _ in range(N_REPEATS):
+        start = time.perf_counter()
+        results = [
+            f(scaled_reserve, scaled_redemption)
+            for scaled_reserve, scaled_redemption in samples
+        ]
+        best = min(best, time.perf_counter() - start)
+    return best, results
+
+
+def main():
+    samples = _samples()
+    for alpha_bar in ["0.3", "0.6", "1"]:
+        params = Params(D(alpha_bar), D("0.3"), D("0.6"))
+        pamm = Pamm(params)
+
+        t_checks, expected = _time(pamm._compute_normalized_case_by_checks, samples)
+        t_index, results = _time(params.region_index.lookup, samples)
+        assert results == expected, "region index disagrees with the chain of checks"
+
+        print(
+            f"alpha_bar={alpha_bar}: checks {t_checks * 1e6 / N_SAMPLES:.1f}us, "
+            + f"index {t_index * 1e6 / N_SAMPLES:.1f}us per lookup, "
+            + f"speedup {t_checks / t_index:.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,414 @@
+"""Gas of `Motherboard.mint` / `redeem` and their sub-calls as the reserve grows, on the local dev chain.
+
+    brownie run scripts/profiling/motherboard/profile_mint_redeem.py main [output]
+
+The system is deployed as in the tests, with `BatchVaultPriceOracle` (over `MockPriceOracle` prices) as root price
+oracle, `PrimaryAMMV1` and `ReserveSafetyManager` and `VaultSafetyMode` registered in `RootSafetyCheck`. Vaults are
+`MockGyroVault`s with a configurable number of (sorted) tokens. Each scenario seeds the reserve with a balanced mint
+into all vaults, then profiles a small mint into and a redeem from the first `n_mint_assets` vaults.
+
+Gas is reported per sub-call (including nested calls) and fitted against the number of vaults, to show which sub-calls
+grow superlinearly.
+"""
+
+from itertools import product
+from typing import Dict, List, NamedTuple
+
+from brownie import (  # type: ignore
+    AssetRegistry,
+    BatchVaultPriceOracle,
+    FreezableTransparentUpgradeableProxy,
+    GenericVaultPriceOracle,
+    GydRecovery,
+    GydToken,
+    GyroConfig,
+    MockGyroVault,
+    MockPriceOracle,
+    Motherboard,
+    PrimaryAMMV1,
+    ProxyAdmin,
+    RateManager,
+    Reserve,
+    ReserveManager,
+    ReserveSafetyManager,
+    ReserveStewardshipIncentives,
+    RootSafetyCheck,
+    StaticPercentageFeeHandler,
+    Token,
+    VaultRegistry,
+    VaultSafetyMode,
+    accounts,
+    chain,
+)
+
+from scripts.profiling.gas_benchmark import (
+    fit_scaling,
+    save_results,
+    summarize,
+)
+from scripts.profiling.profiling_utils import comput_gas_stats
+from tests.support import config_keys, constants
+from tests.support.types import (
+    MintAsset,
+    PammParams,
+    PersistedVaultMetadata,
+    RedeemAsset,
+    VaultConfiguration,
+    VaultType,
+)
+from tests.support.utils import scale
+
+VAULT_COUNTS = [1, 2, 4, 6, 8, 10]
+TOKENS_PER_VAULT = [1, 2, 3]
+MINT_ASSET_COUNTS = [1, 2, 4]
+
+# Per vault: seeded into the reserve and, respectively, minted / redeemed in the profiled transactions.
+SEED_AMOUNT = scale(10_000)
+PROFILED_AMOUNT = scale(10)
+
+# A superlinear share of the fitted gas above this at the largest vault count is flagged.
+SUPERLINEAR_THRESHOLD = 0.05
+
+MINT_CALLS = [
+    "Motherboard.mint",
+    "ReserveManager.getReserveState",
+    "BatchVaultPriceOracle.fetchPricesUSD",
+    "RootSafetyCheck.checkAndPersistMint",
+    "ReserveSafetyManager.checkAndPersistMint",
+    "VaultSafetyMode.checkAndPersistMint",
+    "StaticPercentageFeeHandler.applyFees",
+    "ReserveStewardshipIncentives.checkpoint",
+    "GydRecovery.checkAndRun",
+    "PrimaryAMMV1.mint",
+]
+
+REDEEM_CALLS = [
+    "Motherboard.redeem",
+    "ReserveManager.getReserveState",
+    "BatchVaultPriceOracle.fetchPricesUSD",
+    "RootSafetyCheck.checkAndPersistRedeem",
+    "ReserveSafetyManager.checkAndPersistRedeem",
+    "VaultSafetyMode.checkAndPersistRedeem",
+    "StaticPercentageFeeHandler.applyFees",
+    "ReserveStewardshipIncentives.checkpoint",
+    "GydRecovery.checkAndRun",
+    "PrimaryAMMV1.redeem",
+]
+
+
+class Scenario(NamedTuple):
+    n_vaults: int
+    tokens_per_vault: int
+    n_mint_assets: int
+
+    @property
+    def name(self) -> str:
+        return (
+            f"vaults={self.n_vaults},tokens={self.tokens_per_vault},"
+            f"assets={self.n_mint_assets}"
+        )
+
+
+def scenarios() -> List[Scenario]:
+    return [
+        Scenario(n_vaults, tokens, n_assets)
+        for n_vaults, tokens, n_assets in product(
+            VAULT_COUNTS, TOKENS_PER_VAULT, MINT_ASSET_COUNTS
+        )
+        if n_assets <= n_vaults
+    ]
+
+
+class System(NamedTuple):
+    proxy_admin: object
+    gyro_config: object
+    motherboard: object
+    reserve: object
+    reserve_manager: object
+    price_oracle: object
+    fee_handler: object
+    gyd_token: object
+
+
+def _deploy_with_proxy(admin, proxy_admin, Contract, initialize, *args):
+    contract = admin.deploy(Contract, *args)
+    proxy = admin.deploy(
+        FreezableTransparentUpgradeableProxy,
+        contract,
+        proxy_admin,
+        initialize(contract),
+    )
+    FreezableTransparentUpgradeableProxy.remove(proxy)
+    return Contract.at(proxy, owner=admin)
+
+
+def deploy_system(admin, treasury) -> System:
+    """Same setup as the `motherboard` test fixture, with the real PAMM, vault price oracle and safety checks."""
+    proxy_admin = admin.deploy(ProxyAdmin)
+
+    def deploy_with_proxy(Contract, initialize, *args):
+        return _deploy_with_proxy(admin, proxy_admin, Contract, initialize, *args)
+
+    tx_params = {"from": admin}
+
+    gyro_config = deploy_with_proxy(
+        GyroConfig, lambda c: c.initialize.encode_input(admin)
+    )
+    gyro_config.setUint(
+        config_keys.STABLECOIN_MAX_DEVIATION,
+        constants.STABLECOIN_MAX_DEVIATION,
+        tx_params,
+    )
+
+    def set_address(key, contract):
+        gyro_config.setAddress(key, contract, tx_params)
+        return contract
+
+    set_address(
+        config_keys.VAULT_REGISTRY_ADDRESS,
+        deploy_with_proxy(
+            VaultRegistry, lambda c: c.initialize.encode_input(admin), gyro_config
+        ),
+    )
+    set_address(
+        config_keys.ASSET_REGISTRY_ADDRESS,
+        deploy_with_proxy(
+            AssetRegistry, lambda c: c.initialize.encode_input(admin), gyro_config
+        ),
+    )
+    reserve = set_address(
+        config_keys.RESERVE_ADDRESS,
+        deploy_with_proxy(Reserve, lambda c: c.initialize.encode_input(admin)),
+    )
+    set_address(config_keys.RATE_MANAGER_ADDRESS, admin.deploy(RateManager, admin))
+
+    price_oracle = admin.deploy(MockPriceOracle)
+    batch_vault_price_oracle = set_address(
+        config_keys.ROOT_PRICE_ORACLE_ADDRESS,
+        admin.deploy(BatchVaultPriceOracle, admin, price_oracle),
+    )
+    batch_vault_price_oracle.registerVaultPriceOracle(
+        VaultType.GENERIC, admin.deploy(GenericVaultPriceOracle, gyro_config), tx_params
+    )
+
+    reserve_manager = set_address(
+        config_keys.RESERVE_MANAGER_ADDRESS,
+        admin.deploy(ReserveManager, admin, gyro_config),
+    )
+    fee_handler = set_address(
+        config_keys.FEE_HANDLER_ADDRESS, admin.deploy(StaticPercentageFeeHandler, admin)
+    )
+    gyd_token = set_address(
+        config_keys.GYD_TOKEN_ADDRESS,
+        deploy_with_proxy(
+            GydToken, lambda c: c.initialize.encode_input(admin, "GYD Token", "GYD")
+        ),
+    )
+
+    set_address(
+        config_keys.PAMM_ADDRESS,
+        admin.deploy(
+            PrimaryAMMV1,
+            admin,
+            gyro_config,
+            PammParams(
+                int(constants.ALPHA_MIN_REL),
+                int(constants.XU_MAX_REL),
+                int(constants.THETA_FLOOR),
+                int(constants.OUTFLOW_MEMORY),
+            ),
+        ),
+    )
+    gyro_config.setUint(config_keys.REDEEM_DISCOUNT_RATIO, 0, tx_params)
+
+    gyfi = Token.deploy("GYFI", "GYFI", 18, scale(10_000), tx_params)
+    set_address(
+        config_keys.GYD_RECOVERY_ADDRESS,
+        admin.deploy(
+            GydRecovery,
+            admin,
+            gyro_config,
+            gyfi,
+            treasury,
+            30 * constants.SECONDS_PER_DAY,
+            90 * constants.SECONDS_PER_DAY,
+            scale("1.0"),
+        ),
+    )
+    gyro_config.setUint(config_keys.GYD_RECOVERY_TRIGGER_CR, scale("0.8"), tx_params)
+    gyro_config.setUint(config_keys.GYD_RECOVERY_TARGET_CR, scale("1.0"), tx_params)
+
+    set_address(
+        config_keys.STEWARDSHIP_INC_ADDRESS,
+        admin.deploy(ReserveStewardshipIncentives, admin, gyro_config),
+    )
+    gyro_config.setUint(config_keys.STEWARDSHIP_INC_MIN_CR, scale("1.05"), tx_params)
+    gyro_config.setUint(
+        config_keys.STEWARDSHIP_INC_DURATION, 365 * constants.SECONDS_PER_DAY, tx_params
+    )
+    gyro_config.setUint(config_keys.STEWARDSHIP_INC_MAX_VIOLATIONS, 1, tx_params)
+
+    root_safety_check = set_address(
+        config_keys.ROOT_SAFETY_CHECK_ADDRESS,
+        admin.deploy(RootSafetyCheck, admin, gyro_config),
+    )
+    gyro_config.setUint(
+        config_keys.SAFETY_BLOCKS_AUTOMATIC,
+        constants.SAFETY_BLOCKS_AUTOMATIC,
+        tx_params,
+    )
+    gyro_config.setUint(
+        config_keys.SAFETY_BLOCKS_GUARDIAN, constants.SAFETY_BLOCKS_GUARDIAN, tx_params
+    )
+    root_safety_check.addCheck(
+        admin.deploy(
+            ReserveSafetyManager,
+            admin,
+            constants.MAX_ALLOWED_VAULT_DEVIATION,
+            constants.MIN_TOKEN_PRICE,
+        ),
+        tx_params,
+    )
+    root_safety_check.addCheck(
+        admin.deploy(VaultSafetyMode, admin, gyro_config), tx_params
+    )
+
+    motherboard = set_address(
+        config_keys.MOTHERBOARD_ADDRESS,
+        deploy_with_proxy(
+            Motherboard, lambda c: c.initialize.encode_input(admin), gyro_config
+        ),
+    )
+    reserve.addManager(motherboard, tx_params)
+    gyd_token.addMinter(motherboard, tx_params)
+
+    return System(
+        proxy_admin,
+        gyro_config,
+        motherboard,
+        reserve,
+        reserve_manager,
+        price_oracle,
+        fee_handler,
+        gyd_token,
+    )
+
+
+def add_vaults(system: System, admin, user, n_vaults: int, tokens_per_vault: int):
+    """Deploys and registers `n_vaults` vaults with equal weights, all priced at 1 USD, and gives `user` vault tokens.
+    The underlying of each vault is its token with the lowest address, as `GenericVaultPriceOracle` requires.
+    """
+    tx_params = {"from": admin}
+    vaults, configurations = [], []
+    for i in range(n_vaults):
+        amount = SEED_AMOUNT + 2 * PROFILED_AMOUNT
+        tokens = sorted(
+            (
+                Token.deploy(f"Token {i}.{j}", f"T{i}{j}", 18, amount, tx_params)
+                for j in range(tokens_per_vault)
+            ),
+            key=lambda token: int(token.address, 16),
+        )
+        vault = _deploy_with_proxy(
+            admin,
+            system.proxy_admin,
+            MockGyroVault,
+            lambda v: v.initialize.encode_input(tokens[0]),
+        )
+        vault.setTokens(tokens, tx_params)
+        for asset in [*tokens, vault]:
+            system.price_oracle.setUSDPrice(asset, scale(1), tx_params)
+        system.fee_handler.setVaultFees(vault, 0, 0, tx_params)
+
+        tokens[0].transfer(user, amount, tx_params)
+        tokens[0].approve(vault, amount, {"from": user})
+        vault.deposit(amount, 0, {"from": user})
+        vault.approve(system.motherboard, 2**256 - 1, {"from": user})
+
+        weight = scale(1) // n_vaults
+        if i == n_vaults - 1:
+            weight = scale(1) - weight * (n_vaults - 1)
+        configurations.append(
+            VaultConfiguration(
+                vault,
+                PersistedVaultMetadata(
+                    int(scale(1)),
+                    int(weight),
+                    int(constants.OUTFLOW_MEMORY),
+                    int(scale(1_000_000_000)),
+                ),
+            )
+        )
+        vaults.append(vault)
+    system.reserve_manager.setVaults(configurations, tx_params)
+    return vaults
+
+
+def _gas_per_call(tx, calls) -> Dict[str, dict]:
+    gas_stats = comput_gas_stats(tx)
+    return {fn: summarize(gas_stats[fn]) for fn in calls if fn in gas_stats}
+
+
+def run_scenario(system: System, admin, user, scenario: Scenario) -> Dict[str, dict]:
+    vaults = add_vaults(
+        system, admin, user, scenario.n_vaults, scenario.tokens_per_vault
+    )
+    seed_assets = [MintAsset(v, SEED_AMOUNT, v) for v in vaults]
+    system.motherboard.mint(seed_assets, 0, {"from": user})
+
+    profiled_vaults = vaults[: scenario.n_mint_assets]
+    mint_assets = [MintAsset(v, PROFILED_AMOUNT, v) for v in profiled_vaults]
+    mint_tx = system.motherboard.mint(mint_assets, 0, {"from": user})
+
+    ratios = [scale(1) // len(profiled_vaults)] * len(profiled_vaults)
+    ratios[-1] = scale(1) - sum(ratios[:-1])
+    redeem_assets = [
+        RedeemAsset(v, 0, int(ratio), v) for v, ratio in zip(profiled_vaults, ratios)
+    ]
+    gyd_amount = system.gyd_token.balanceOf(user) // 1_000
+    system.gyd_token.approve(system.motherboard, gyd_amount, {"from": user})
+    redeem_tx = system.motherboard.redeem(gyd_amount, redeem_assets, {"from": user})
+
+    return {
+        "mint": _gas_per_call(mint_tx, MINT_CALLS),
+        "redeem": _gas_per_call(redeem_tx, REDEEM_CALLS),
+    }
+
+
+def print_scaling(results: Dict[Scenario, Dict[str, dict]]):
+    """Fits the mean gas of each sub-call against the number of vaults, for each other parameter combination."""
+    groups: Dict[tuple, List[Scenario]] = {}
+    for scenario in results:
+        key = (scenario.tokens_per_vault, scenario.n_mint_assets)
+        groups.setdefault(key, []).append(scenario)
+
+    for (tokens, n_assets), group in sorted(groups.items()):
+        print(f"\ntokens per vault = {tokens}, mint assets = {n_assets}")
+        ns = [s.n_vaults for s in group]
+        for operation, calls in [("mint", MINT_CALLS), ("redeem", REDEEM_CALLS)]:
+            for fn in calls:
+                gas = [results[s][operation].get(fn, {}).get("mean_gas") for s in group]
+                if any(g is None for g in gas):
+                    continue
+                fit = fit_scaling(ns, gas)
+                share = fit.superlinear_share(max(ns))
+                flag = "  <- superlinear" if share > SUPERLINEAR_THRESHOLD else ""
+                print(f"  {operation} {fn}: {fit} ({share:.1%} at n={max(ns)}){flag}")
+
+
+def main(output: str = "mint_redeem_gas.json"):
+    admin, user, treasury = accounts[4], accounts[1], accounts[8]
+    system = deploy_system(admin, treasury)
+
+    results = {}
+    for scenario in scenarios():
+        chain.snapshot()
+        try:
+            results[scenario] = run_scenario(system, admin, user, scenario)
+        finally:
+            chain.revert()
+        print(scenario.name, results[scenario]["mint"].get("Motherboard.mint"))
+
+    save_results({s.name: r for s, r in results.items()}, output)
+    print(f"results written to {output}")
+    print_scaling(results)
@@ -0,0 +1,91 @@
+"""Gas of `ReserveManager.getReserveState` and its sub-calls from 1 to 20 vaults, on the local dev chain.
+
+    brownie run scripts/profiling/motherboard/profile_reserve_state.py main [output]
+
+Uses the same system and vaults as `profile_mint_redeem.py`. The reserve is seeded with a balanced mint into all vaults
+and `getReserveState` is then sent as a transaction so that its trace can be profiled.
+"""
+
+from typing import Dict, List, NamedTuple
+
+from brownie import accounts, chain  # type: ignore
+
+from scripts.profiling.gas_benchmark import fit_scaling, save_results, summarize
+from scripts.profiling.motherboard.profile_mint_redeem import (
+    SEED_AMOUNT,
+    SUPERLINEAR_THRESHOLD,
+    System,
+    add_vaults,
+    deploy_system,
+)
+from scripts.profiling.profiling_utils import comput_gas_stats
+from tests.support.types import MintAsset
+
+VAULT_COUNTS = [1, 2, 5, 10, 15, 20]
+TOKENS_PER_VAULT = [1, 3]
+
+CALLS = [
+    "ReserveManager.getReserveState",
+    "VaultRegistry.listVaultsWithMetadata",
+    "AssetRegistry.getAssetsStabilityAndRanges",
+    "BatchVaultPriceOracle.fetchPricesUSD",
+]
+
+
+class Scenario(NamedTuple):
+    n_vaults: int
+    tokens_per_vault: int
+
+    @property
+    def name(self) -> str:
+        return f"vaults={self.n_vaults},tokens={self.tokens_per_vault}"
+
+
+def run_scenario(system: System, admin, user, scenario: Scenario) -> Dict[str, dict]:
+    vaults = add_vaults(
+        system, admin, user, scenario.n_vaults, scenario.tokens_per_vault
+    )
+    seed_assets = [MintAsset(v, SEED_AMOUNT, v) for v in vaults]
+    system.motherboard.mint(seed_assets, 0, {"from": user})
+
+    tx = system.reserve_manager.getReserveState.transact({"from": admin})
+    gas_stats = comput_gas_stats(tx)
+    return {fn: summarize(gas_stats[fn]) for fn in CALLS if fn in gas_stats}
+
+
+def print_scaling(results: Dict[Scenario, Dict[str, dict]]):
+    for tokens in TOKENS_PER_VAULT:
+        group: List[Scenario] = sorted(
+            s for s in results if s.tokens_per_vault == tokens
+        )
+        print(f"\ntokens per vault = {tokens}")
+        ns = [s.n_vaults for s in group]
+        for fn in CALLS:
+            gas = [results[s].get(fn, {}).get("mean_gas") for s in group]
+            if not ns or any(g is None for g in gas):
+                continue
+            fit = fit_scaling(ns, gas)
+            share = fit.superlinear_share(max(ns))
+            flag = "  <- superlinear" if share > SUPERLINEAR_THRESHOLD else ""
+            print(f"  {fn}: {fit} ({share:.1%} at n={max(ns)}){flag}")
+            print("    " + ", ".join(f"n={n}: {g:,.0f}" for n, g in zip(ns, gas)))
+
+
+def main(output: str = "reserve_state_gas.json"):
+    admin, user, treasury = accounts[4], accounts[1], accounts[8]
+    system = deploy_system(admin, treasury)
+
+    results = {}
+    for n_vaults in VAULT_COUNTS:
+        for tokens in TOKENS_PER_VAULT:
+            scenario = Scenario(n_vaults, tokens)
+            chain.snapshot()
+            try:
+                results[scenario] = run_scenario(system, admin, user, scenario)
+            finally:
+                chain.revert()
+            print(scenario.name, results[scenario].get(CALLS[0]))
+
+    save_results({s.name: r for s, r in results.items()}, output)
+    print(f"results written to {output}")
+    print_scaling(results)
@@ -1,11 +1,15 @@
 from decimal import Decimal
 import time
-from brownie import AssetRegistry, TrustedSignerPriceOracleProfiler  # type: ignore
+from brownie import TrustedSignerPriceOracleProfiler  # type: ignore
 from brownie import accounts
+from scripts.profiling.deployment import deploy_asset_registry
 from scripts.profiling.profiling_utils import comput_gas_stats
 from tests.fixtures.mainnet_contracts import TokenAddresses
-from tests.support import constants
-from tests.support.price_signing import make_message, sign_message
+from tests.support.price_signing import (
+    make_batch_message,
+    make_message,
+    sign_message,
+)
 from tests.support.utils import scale
 
 PRICE_DECIMALS = 6
@@ -21,21 +25,51 @@ def _make_signed_prices(prices, price_signer):
     ]
 
 
+def _make_signed_batch(prices, price_signer):
+    message = make_batch_message(
+        [(key, int(scale(price, PRICE_DECIMALS))) for key, price in prices]
+    )
+    return message, sign_message(message, price_signer)
+
+
+def _compare_batch(profiler, prices, price_signer):
+    """Total gas per price of `postPrice` (one signature per price) and `postBatchPrices` (one signature per batch)"""
+    time.sleep(1)
+    tx = profiler.profilePostPrice(
+        _make_signed_prices(prices, price_signer), {"from": accounts[0]}
+    )
+    single_stats = comput_gas_stats(tx)["TrustedSignerPriceOracleProfiler.postPrice"]
+    single_gas = single_stats.total_gas.total / len(prices)
+
+    time.sleep(1)
+    message, signature = _make_signed_batch(prices, price_signer)
+    tx = profiler.profilePostBatchPrices(message, signature, {"from": accounts[0]})
+    batch_stats = comput_gas_stats(tx)[
+        "TrustedSignerPriceOracleProfiler.postBatchPrices"
+    ]
+    batch_gas = batch_stats.total_gas.total / len(prices)
+
+    print(f"{len(prices)} prices")
+    print(f"  postPrice:       {single_gas:,.0f} gas per price")
+    print(
+        f"  postBatchPrices: {batch_gas:,.0f} gas per price ({batch_gas / single_gas - 1:+.1%})"
+    )
+
+
 def main():
     price_signer = accounts.add(
         "0xb0057716d5917badaf911b193b12b910811c1497b5bada8d7711f758981c3773"
     )
 
-    asset_registry = accounts[0].deploy(
-        AssetRegistry, constants.STABLECOIN_MAX_DEVIATION
+    asset_registry = deploy_asset_registry(
+        accounts[0],
+        [
+            ("ETH", TokenAddresses.ETH),
+            ("BTC", TokenAddresses.WBTC),
+            ("DAI", TokenAddresses.DAI),
+        ],
     )
 
-    admin = accounts[0]
-
-    asset_registry.setAssetAddress("ETH", TokenAddresses.ETH, {"from": admin})
-    asset_registry.setAssetAddress("BTC", TokenAddresses.WBTC, {"from": admin})
-    asset_registry.setAssetAddress("DAI", TokenAddresses.DAI, {"from": admin})
-
     prices = [
         ("ETH", Decimal("2395.99")),
         ("BTC", Decimal("38316.7")),
@@ -81,3 +115,7 @@ def main():
             signed_prices
         )
     )
+
+    print("Batched prices (already allocated storage)")
+    for n in range(1, len(prices) + 1):
+        _compare_batch(trusted_signer_price_oracle_profiler, prices[:n], price_signer)
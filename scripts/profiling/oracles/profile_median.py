@@ -0,0 +1,45 @@
+import random
+from brownie import accounts
+from brownie import OrderStatisticsProfiler  # type: ignore
+
+from scripts.profiling.profiling_utils import comput_gas_stats
+
+# CheckedPriceOracle takes the median of the prices of all ETH price oracles, plus one TWAP price.
+MAX_ORACLES = 15
+
+
+def _random_prices(n, rng):
+    return [[rng.randint(1_000, 4_000) * 10**18 for _ in range(n)] for _ in range(10)]
+
+
+def main():
+    rng = random.Random(0)
+
+    profiler = accounts[0].deploy(OrderStatisticsProfiler)
+    mean_gas = {}
+    for n in range(1, MAX_ORACLES + 1):
+        print(f"n = {n}")
+        args = _random_prices(n, rng)
+
+        select_stats = comput_gas_stats(profiler.profileMedian(args))[
+            "OrderStatistics.median"
+        ]
+        sort_stats = comput_gas_stats(profiler.profileSortMedian(args))[
+            "OrderStatisticsProfiler._sortMedian"
+        ]
+        print(f"quickselect: {select_stats}")
+        print(f"quicksort:   {sort_stats}")
+        delta = select_stats.mean_internal_gas - sort_stats.mean_internal_gas
+        mean_gas[n] = (sort_stats.mean_internal_gas, select_stats.mean_internal_gas)
+        print(
+            f"mean delta:  {delta:+.0f} ({delta / sort_stats.mean_internal_gas:+.1%})"
+        )
+
+        print()
+
+    print(" n  quicksort  quickselect    delta")
+    for n, (sort_gas, select_gas) in mean_gas.items():
+        delta = select_gas - sort_gas
+        print(
+            f"{n:>2}  {sort_gas:>9.0f}  {select_gas:>11.0f}  {delta:>+7.0f} ({delta / sort_gas:+.1%})"
+        )
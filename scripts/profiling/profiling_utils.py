@@ -1,10 +1,14 @@
+import math
 import statistics
 from collections import defaultdict
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from sys import intern
-from typing import Dict, List, Tuple
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
-from brownie.network.transaction import _step_compare
+# Number of values per statistic kept exactly before quantiles are estimated by a sketch.
+EXACT_QUANTILES_LIMIT = 10_000
+# Relative accuracy of the quantile sketch.
+QUANTILE_SKETCH_ACCURACY = 0.005
 
 
 def _format_tuple(info, meta, unscale):
@@ -13,8 +17,178 @@ def _format_tuple(info, meta, unscale):
     return f"{info} ({meta})"
 
 
-@dataclass
+class QuantileSketch:
+    """Streaming quantile estimates with bounded relative error (the DDSketch scheme).
+
+    Values are counted in logarithmic buckets [gamma^(i-1), gamma^i), separately for positive and negative values, so
+    memory only grows with the logarithm of the range of the values and any returned quantile is within a factor of
+    `1 ± relative_accuracy` of a value of the requested rank.
+    """
+
+    def __init__(self, relative_accuracy: float = QUANTILE_SKETCH_ACCURACY):
+        self.gamma = (1 + relative_accuracy) / (1 - relative_accuracy)
+        self._log_gamma = math.log(self.gamma)
+        self.count = 0
+        self.zero_count = 0
+        self.positive: Dict[int, int] = defaultdict(int)
+        self.negative: Dict[int, int] = defaultdict(int)
+
+    def _bucket(self, value) -> int:
+        return math.ceil(math.log(value) / self._log_gamma)
+
+    def _bucket_value(self, bucket: int) -> float:
+        return 2 * self.gamma**bucket / (self.gamma + 1)
+
+    def add(self, value, count: int = 1):
+        self.count += count
+        if value > 0:
+            self.positive[self._bucket(value)] += count
+        elif value < 0:
+            self.negative[self._bucket(-value)] += count
+        else:
+            self.zero_count += count
+
+    def merge(self, other: "QuantileSketch"):
+        if other.gamma != self.gamma:
+            raise ValueError("cannot merge sketches with different accuracies")
+        self.count += other.count
+        self.zero_count += other.zero_count
+        for bucket, count in other.positive.items():
+            self.positive[bucket] += count
+        for bucket, count in other.negative.items():
+            self.negative[bucket] += count
+
+    def quantile(self, q: float) -> float:
+        if self.count == 0:
+            raise ValueError("quantile of an empty sketch")
+        rank = q * (self.count - 1)
+        seen = 0
+        for bucket in sorted(self.negative, reverse=True):
+            seen += self.negative[bucket]
+            if seen > rank:
+                return -self._bucket_value(bucket)
+        seen += self.zero_count
+        if seen > rank:
+            return 0
+        for bucket in sorted(self.positive):
+            seen += self.positive[bucket]
+            if seen > rank:
+                return self._bucket_value(bucket)
+        return self._bucket_value(max(self.positive))
+
+
+class RunningStats:
+    """Count, mean, standard deviation, min, max and quantiles of a stream of values in constant memory.
+
+    The variance uses Welford's algorithm, and the mean is computed from the exact sum so that it is the same as
+    `statistics.mean()`. `argmin` and `argmax` are the (first) positions of the minimum and maximum in the stream.
+    Quantiles are exact (interpolated like `statistics.median()`) until more than `exact_limit` values were added and
+    then estimated with a `QuantileSketch`.
+    """
+
+    def __init__(self, exact_limit: int = EXACT_QUANTILES_LIMIT):
+        self.exact_limit = exact_limit
+        self.count = 0
+        self.total = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        self.min = None
+        self.max = None
+        self.argmin: Optional[int] = None
+        self.argmax: Optional[int] = None
+        self._values: Optional[list] = []
+        self._sketch: Optional[QuantileSketch] = None
+
+    def add(self, value):
+        if self.min is None or value < self.min:
+            self.min, self.argmin = value, self.count
+        if self.max is None or value > self.max:
+            self.max, self.argmax = value, self.count
+        self.count += 1
+        self.total += value
+        delta = value - self._mean
+        self._mean += delta / self.count
+        self._m2 += delta * (value - self._mean)
+        if self._values is not None:
+            self._values.append(value)
+            if len(self._values) > self.exact_limit:
+                self._to_sketch()
+        else:
+            self._sketch.add(value)  # type: ignore
+
+    def merge(self, other: "RunningStats"):
+        """Adds the values of `other` as if they had been added after the values of `self`."""
+        if other.count == 0:
+            return
+        if self.min is None or other.min < self.min:
+            self.min, self.argmin = other.min, self.count + other.argmin
+        if self.max is None or other.max > self.max:
+            self.max, self.argmax = other.max, self.count + other.argmax
+        count = self.count + other.count
+        delta = other._mean - self._mean
+        self._mean += delta * other.count / count
+        self._m2 += other._m2 + delta**2 * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        if self._values is not None and other._values is not None:
+            self._values.extend(other._values)
+            if len(self._values) > self.exact_limit:
+                self._to_sketch()
+            return
+        if self._values is not None:
+            self._to_sketch()
+        if other._values is not None:
+            for value in other._values:
+                self._sketch.add(value)  # type: ignore
+        else:
+            self._sketch.merge(other._sketch)  # type: ignore
+
+    def _to_sketch(self):
+        self._sketch = QuantileSketch()
+        for value in self._values:  # type: ignore
+            self._sketch.add(value)
+        self._values = None
+
+    @property
+    def is_exact(self) -> bool:
+        """Whether quantiles are exact."""
+        return self._values is not None
+
+    @property
+    def mean(self):
+        quotient, remainder = divmod(self.total, self.count)
+        return quotient if remainder == 0 else self.total / self.count
+
+    @property
+    def std(self):
+        if self.count == 1:
+            return 0
+        return math.sqrt(self._m2 / (self.count - 1))
+
+    def quantile(self, q: float):
+        if self._values is None:
+            return self._sketch.quantile(q)  # type: ignore
+        if not self._values:
+            raise statistics.StatisticsError("no values")
+        values = sorted(self._values)
+        rank = q * (len(values) - 1)
+        lower = math.floor(rank)
+        if lower == rank:
+            return values[lower]
+        if rank - lower == 0.5:
+            return (values[lower] + values[lower + 1]) / 2
+        return values[lower] + (values[lower + 1] - values[lower]) * (rank - lower)
+
+    @property
+    def median(self):
+        return self.quantile(0.5)
+
+
 class CallStats:
+    """Gas statistics over calls of a function, see `RunningStats`. Calls can be added one at a time with `add()` or
+    merged from another `CallStats` with `merge()`, e.g., across transactions, without keeping the calls in memory.
+    """
+
     REPR_KEYS = [
         "mean_internal_gas",
         "median_internal_gas",
@@ -23,51 +197,81 @@ class CallStats:
         "max_internal_gas",
     ]
 
-    calls: List[dict]
+    def __init__(
+        self, calls: Iterable[dict] = (), exact_limit: int = EXACT_QUANTILES_LIMIT
+    ):
+        self.internal_gas = RunningStats(exact_limit)
+        self.total_gas = RunningStats(exact_limit)
+        for call in calls:
+            self.add(call)
+
+    def add(self, call: dict):
+        self.internal_gas.add(call["internal_gas"])
+        self.total_gas.add(call["total_gas"])
+
+    def merge(self, other: "CallStats"):
+        self.internal_gas.merge(other.internal_gas)
+        self.total_gas.merge(other.total_gas)
+
+    @property
+    def count(self) -> int:
+        return self.internal_gas.count
 
     @property
     def mean_internal_gas(self):
-        return statistics.mean([x["internal_gas"] for x in self.calls])
+        return self.internal_gas.mean
 
     @property
     def median_internal_gas(self):
-        return statistics.median([x["internal_gas"] for x in self.calls])
+        return self.internal_gas.median
+
+    @property
+    def p95_internal_gas(self):
+        return self.internal_gas.quantile(0.95)
+
+    @property
+    def p99_internal_gas(self):
+        return self.internal_gas.quantile(0.99)
 
     @property
     def std_internal_gas(self):
-        if len(self.calls) == 1:
-            return 0
-        return statistics.stdev([x["internal_gas"] for x in self.calls])
+        return self.internal_gas.std
 
     @property
     def min_internal_gas(self):
-        return min([x["internal_gas"] for x in self.calls])
+        return self.internal_gas.min
 
     @property
     def max_internal_gas(self):
-        return max([x["internal_gas"] for x in self.calls])
+        return self.internal_gas.max
 
     @property
     def mean_total_gas(self):
-        return statistics.mean([x["total_gas"] for x in self.calls])
+        return self.total_gas.mean
 
     @property
     def median_total_gas(self):
-        return statistics.median([x["total_gas"] for x in self.calls])
+        return self.total_gas.median
+
+    @property
+    def p95_total_gas(self):
+        return self.total_gas.quantile(0.95)
+
+    @property
+    def p99_total_gas(self):
+        return self.total_gas.quantile(0.99)
 
     @property
     def std_total_gas(self):
-        if len(self.calls) == 1:
-            return 0
-        return statistics.stdev([x["total_gas"] for x in self.calls])
+        return self.total_gas.std
 
     @property
     def min_total_gas(self):
-        return min([x["total_gas"] for x in self.calls])
+        return self.total_gas.min
 
     @property
     def max_total_gas(self):
-        return max([x["total_gas"] for x in self.calls])
+        return self.total_gas.max
 
     def _format(self, min_gas=None, max_gas=None):
         result = ""
@@ -85,12 +289,9 @@ class CallStats:
         return self._format()
 
     def min_max_with_values(self, values) -> Tuple[Tuple[int, int], Tuple[int, int]]:
-        internal_gases = [x["internal_gas"] for x in self.calls]
-        min_gas = min(internal_gases)
-        min_gas_index = internal_gases.index(min_gas)
-        max_gas = max(internal_gases)
-        max_gas_index = internal_gases.index(max_gas)
-        return ((min_gas, values[min_gas_index]), (max_gas, values[max_gas_index]))
+        """`values[i]` is the input of the i-th call."""
+        stats = self.internal_gas
+        return ((stats.min, values[stats.argmin]), (stats.max, values[stats.argmax]))
 
     def format_with_values(self, values, unscale=False, minmax=False) -> str:
         args = []
@@ -100,83 +301,200 @@ class CallStats:
         return self._format(*args)
 
 
-def comput_gas_stats(tx) -> Dict[str, CallStats]:
-    """
-    Display the complete sequence of contracts and methods called during
-    the transaction. The format:
-    Contract.functionName  [instruction]  start:stop  [gas used]
-    * start:stop are index values for the `trace` member of this object,
-        showing the points where the call begins and ends
-    * for calls that include subcalls, gas use is displayed as
-        [gas used in this frame / gas used in this frame + subcalls]
-    * Calls displayed in red ended with a `REVERT` or `INVALID` instruction.
-    Arguments
-    ---------
-    expand : bool
-        If `True`, show an expanded call trace including inputs and return values
+def _step_gas(step) -> int:
+    """Gas cost of a trace step net of the refunds brownie accounts for (see `TransactionReceipt._get_trace_gas`)."""
+    gas = step["gasCost"]
+    if step["op"] == "SSTORE" and int(step["stack"][-2], 16) == 0:
+        gas -= 15000
+    elif step["op"] == "SELFDESTRUCT":
+        gas -= 24000
+    return gas
+
+
+@dataclass
+class CallNode:
+    """A call (external call or jump into an internal function) in a transaction trace."""
+
+    fn: str
+    # Index of the first trace step of the call
+    start: int
+    # Gas of the call's own steps, excluding its subcalls
+    internal_gas: int = 0
+    # Gas of the call including its subcalls
+    total_gas: int = 0
+    children: List["CallNode"] = field(default_factory=list)
+
+    def walk(self) -> Iterator[Tuple[Tuple[str, ...], "CallNode"]]:
+        """All calls in the tree in call order, with the names of the calls on the stack up to and including each."""
+        pending = [((self.fn,), self)]
+        while pending:
+            path, node = pending.pop()
+            yield path, node
+            pending.extend(
+                (path + (child.fn,), child) for child in reversed(node.children)
+            )
+
+
+class _Frame:
+    __slots__ = ("key", "end_key", "gas_start", "internal_gas", "node")
+
+    def __init__(self, key, gas_start, node, external):
+        # (depth, jumpDepth) of the steps that belong to this frame itself
+        self.key = key
+        # The frame ends at the first later step whose (depth, jumpDepth) compares lower than this: an external call
+        # ends when the depth decreases, an internal function also when the jumpDepth decreases at the same depth.
+        self.end_key = key[:1] if external else key
+        self.gas_start = gas_start
+        # Gas of the steps at exactly `key`, minus the gas passed to external calls made from these steps.
+        self.internal_gas = 0
+        self.node = node
+
+
+def _step_fn(step) -> str:
+    return step["fn"]
+
+
+UNKNOWN_CONTRACT = "<UnknownContract>"
+
+
+def make_name_resolver(
+    contract_names: Optional[Dict[str, str]] = None,
+    selectors: Optional[Dict[str, str]] = None,
+) -> Callable[[dict], str]:
+    """Name resolver for `get_call_tree()` that also names calls into contracts brownie doesn't know, which it names
+    "<UnknownContract>.<selector>". `contract_names` maps addresses to contract names and `selectors` maps 4-byte
+    selectors ("0x" + 8 hex digits) to function names."""
+    contract_names = {a.lower(): n for a, n in (contract_names or {}).items()}
+    selectors = {k.lower(): v for k, v in (selectors or {}).items()}
+
+    def resolve_name(step: dict) -> str:
+        fn = step["fn"]
+        if not fn.startswith(UNKNOWN_CONTRACT + "."):
+            return fn
+        selector = fn[len(UNKNOWN_CONTRACT) + 1 :]
+        contract = contract_names.get(str(step.get("address", "")).lower())
+        return f"{contract or UNKNOWN_CONTRACT}.{selectors.get(selector.lower(), selector)}"
+
+    return resolve_name
+
+
+def get_call_tree(tx, resolve_name: Callable[[dict], str] = _step_fn) -> CallNode:
     """
+    Tree of the calls (external calls and jumps into internal functions) in the trace of `tx`. Each call is named by
+    `resolve_name` applied to its first trace step, by default the step's "fn", i.e., "Contract.function".
 
-    results = defaultdict(list)
+    Frames are matched in a single pass over the trace with a stack of open frames, and gas is accumulated per run of
+    steps with the same (depth, jumpDepth), so this is linear in the length of the trace. The gas of each call is the
+    same as what `tx._get_trace_gas(start, end)` returns for the frame.
+    """
 
     trace = tx.trace
-    fn = trace[0]["fn"]
-    total_gas, internal_gas = tx._get_trace_gas(0, len(tx.trace))
-    results[fn].append({"total_gas": total_gas, "internal_gas": internal_gas})
-    key = {"fn": fn, "total_gas": total_gas, "internal_gas": internal_gas}
-    # key = _step_internal(
-    #     trace[0], trace[-1], 0, len(trace), tx._get_trace_gas(0, len(tx.trace))
-    # )
-
-    call_tree: List = [[key]]
-    active_tree: List = [call_tree[0]]
-
-    # (index, depth, jumpDepth) for relevent steps in the trace
-    trace_index = [(0, 0, 0)] + [
-        (i, trace[i]["depth"], trace[i]["jumpDepth"])
-        for i in range(1, len(trace))
-        if not _step_compare(trace[i], trace[i - 1])
-    ]  # type: ignore
-
-    subcalls = tx.subcalls[::-1]
-    for i, (idx, depth, jump_depth) in enumerate(trace_index[1:], start=1):
-        last = trace_index[i - 1]
-        if depth == last[1] and jump_depth < last[2]:
-            # returning from an internal function, reduce tree by one
-            active_tree.pop()
-            continue
-        elif depth < last[1]:
-            # returning from an external call, return tree by jumpDepth of the previous depth
-            active_tree = active_tree[: -(last[2] + 1)]
-            continue
-
-        if depth > last[1]:
-            # called to a new contract
-            end = next((x[0] for x in trace_index[i + 1 :] if x[1] < depth), len(trace))
-            total_gas, internal_gas = tx._get_trace_gas(idx, end)
-            fn = trace[idx]["fn"]
-            key = {"fn": fn, "total_gas": total_gas, "internal_gas": internal_gas}
-            results[fn].append({"total_gas": total_gas, "internal_gas": internal_gas})
-        elif depth == last[1] and jump_depth > last[2]:
-            # jumped into an internal function
-            end = next(
-                (
-                    x[0]
-                    for x in trace_index[i + 1 :]
-                    if x[1] < depth or (x[1] == depth and x[2] < jump_depth)
-                ),
-                len(trace),
-            )
+    if not trace:
+        raise ValueError("empty trace")
+
+    # Runs of consecutive steps with the same (depth, jumpDepth): (first index, key, gas before the run).
+    runs = []
+    gas = 0
+    last_key = None
+    for i, step in enumerate(trace):
+        key = (step["depth"], step["jumpDepth"])
+        if key != last_key:
+            runs.append((i, key, gas))
+            last_key = key
+        gas += _step_gas(step)
+    runs.append((len(trace), None, gas))
+
+    frames_by_key: Dict[Tuple[int, int], List[_Frame]] = defaultdict(list)
+
+    def open_frame(run, parent=None, external=False):
+        idx, key, gas_start = run
+        node = CallNode(resolve_name(trace[idx]), idx)
+        if parent is not None:
+            parent.node.children.append(node)
+        frame = _Frame(key, gas_start, node, external)
+        frames_by_key[key].append(frame)
+        return frame
+
+    def close_frame(frame, gas_end):
+        node = frame.node
+        node.total_gas = gas_end - frame.gas_start
+        node.internal_gas = frame.internal_gas
+        start = node.start
+        if start > 0 and trace[start]["depth"] > trace[start - 1]["depth"]:
+            # For external calls, add the remaining gas returned back
+            node.total_gas += trace[start - 1]["gasCost"]
+            node.internal_gas += trace[start - 1]["gasCost"]
+
+    # The root frame spans the whole trace and is never closed early.
+    root = open_frame(runs[0])
+    stack: List[_Frame] = []
+
+    for r in range(len(runs) - 1):
+        idx, key, gas_start = runs[r]
+        if r > 0:
+            last_key = runs[r - 1][1]
+            # returning from internal functions or external calls
+            while stack and stack[-1].end_key > key:
+                frame = stack.pop()
+                frames_by_key[frame.key].pop()
+                close_frame(frame, gas_start)
+            if key[0] > last_key[0]:
+                # calling a new contract: the gas passed to it does not count as internal gas of the caller
+                for frame in frames_by_key[last_key]:
+                    frame.internal_gas -= trace[idx - 1]["gasCost"]
+            if key > last_key:
+                # called to a new contract or jumped into an internal function
+                parent = stack[-1] if stack else root
+                external = key[0] > last_key[0]
+                stack.append(open_frame(runs[r], parent, external))
+        run_gas = runs[r + 1][2] - gas_start
+        for frame in frames_by_key[key]:
+            frame.internal_gas += run_gas
+
+    gas_end = runs[-1][2]
+    for frame in stack:
+        close_frame(frame, gas_end)
+    close_frame(root, gas_end)
+
+    return root.node
+
+
+def get_call_gas(tx) -> Dict[str, List[Dict[str, int]]]:
+    """Gas of each call in the trace of `tx`, per function, in the order in which the calls were made. See
+    `get_call_tree()`.
+
+    NB: the keys are swapped, "total_gas" is the gas of the call's own steps and "internal_gas" the gas including
+    subcalls. This matches the historical unpacking of brownie's `_get_trace_gas()`, which returns (internal, total),
+    and is kept for consistency with previously recorded statistics.
+    """
+    if not tx.trace:
+        return {}
+    results: Dict[str, List[Dict[str, int]]] = defaultdict(list)
+    for _, node in get_call_tree(tx).walk():
+        results[node.fn].append(
+            {"total_gas": node.internal_gas, "internal_gas": node.total_gas}
+        )
+    return dict(results)
 
-            total_gas, internal_gas = tx._get_trace_gas(idx, end)
-            fn = trace[idx]["fn"]
 
-            key = {"fn": fn, "total_gas": total_gas, "internal_gas": internal_gas}
-            results[fn].append({"total_gas": total_gas, "internal_gas": internal_gas})
-            # key = _step_internal(
-            #     trace[idx], trace[end - 1], idx, end, (total_gas, internal_gas)
-            # )
+def comput_gas_stats(tx) -> Dict[str, CallStats]:
+    """Gas statistics per function over the calls in the trace of `tx`. See `get_call_gas()`."""
+    return {fn: CallStats(calls) for fn, calls in get_call_gas(tx).items()}
+
+
+def folded_stacks(tree: CallNode) -> List[str]:
+    """The call tree in folded-stack format ("root;caller;callee gas" per line), as read by flamegraph.pl and
+    speedscope. Each line is weighted by the internal gas of the call, so the width of a frame in the flamegraph is its
+    total gas. Identical stacks are merged. Internal gas can be negative because of refunds and is counted as zero.
+    """
+    weights: Dict[Tuple[str, ...], int] = defaultdict(int)
+    for path, node in tree.walk():
+        weights[path] += max(node.internal_gas, 0)
+    return [f"{';'.join(path)} {weight}" for path, weight in weights.items()]
 
-        active_tree[-1].append([key])
-        active_tree.append(active_tree[-1][-1])
 
-    return {fn: CallStats(calls) for fn, calls in results.items()}
+def write_folded_stacks(tx, path: str, resolve_name: Callable[[dict], str] = _step_fn):
+    """Writes the calls of `tx` in folded-stack format to `path`. See `folded_stacks()`."""
+    with open(path, "w") as f:
+        for line in folded_stacks(get_call_tree(tx, resolve_name)):
+            f.write(line + "\n")
@@ -0,0 +1,274 @@
+"""Runs the gas benchmarks of all profiler contracts and optionally compares them against a baseline.
+
+    brownie run scripts/profiling/run_benchmarks.py main [output] [baseline] [threshold] [only]
+
+- `output`: path of the JSON results (default: `gas_benchmarks.json`)
+- `baseline`: path of previous JSON results; if given, changes are printed and the script fails if the mean gas of any
+  function increased by more than `threshold` (relative, default 0.01)
+- `only`: comma-separated names of benchmarks to run (default: all)
+
+Profiler contracts are discovered by name (`*Profiler`). A new profiler is benchmarked by adding a `Benchmark` to
+`BENCHMARKS` with its input sweep.
+"""
+
+import random
+import sys
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+from brownie import accounts, chain, project
+
+from scripts.profiling.deployment import deploy_asset_registry
+from scripts.profiling.gas_benchmark import (
+    DEFAULT_THRESHOLD,
+    BenchmarkResults,
+    compare_results,
+    find_regressions,
+    format_changes,
+    load_results,
+    save_results,
+    summarize,
+)
+from scripts.profiling.profiling_utils import comput_gas_stats
+from tests.fixtures.mainnet_contracts import TokenAddresses
+from tests.support.price_signing import (
+    make_batch_message,
+    make_message,
+    sign_message,
+)
+from tests.support.utils import scale
+
+DEFAULT_OUTPUT = "gas_benchmarks.json"
+
+PRICE_SIGNER_KEY = "0xb0057716d5917badaf911b193b12b910811c1497b5bada8d7711f758981c3773"
+PRICE_DECIMALS = 6
+
+
+@dataclass
+class Benchmark:
+    name: str
+    # Name of the profiler contract
+    profiler: str
+    # Functions, as named in the trace, whose gas is reported
+    functions: List[str]
+    # Parameter sweep: (case name, input)
+    cases: Callable[[], Iterable[Tuple[str, Any]]]
+    # Sends the transaction that profiles one case
+    run: Callable[[Any, Any], Any]
+    deploy: Callable[[Any], Any] = lambda container: accounts[0].deploy(container)
+
+
+def _random_addresses(n, rng):
+    return [
+        ["0x" + rng.randint(0, 100).to_bytes(20, "big").hex() for _ in range(n)]
+        for _ in range(10)
+    ]
+
+
+def _addresses_with_duplicates(n, rng):
+    args = []
+    for _ in range(10):
+        arr = []
+        for i in range(n):
+            arr.extend(["0x" + i.to_bytes(20, "big").hex()] * rng.randint(0, 4))
+        args.append(arr[:n])
+    return args
+
+
+def _sort_cases():
+    rng = random.Random(0)
+    return [(f"n={n}", _random_addresses(n, rng)) for n in range(5, 15)]
+
+
+def _dedup_cases():
+    rng = random.Random(0)
+    return [(f"n={n}", _addresses_with_duplicates(n, rng)) for n in range(5, 15)]
+
+
+def _sqrt_cases():
+    values = ["0", "0.1", "0.5", "1.0", "1.5", "2", "3", "5", "10", "50", "100", "500"]
+    return [
+        ("small", [scale(v) for v in values[:4]]),
+        ("medium", [scale(v) for v in values[4:8]]),
+        ("large", [scale(v) for v in values[8:]]),
+    ]
+
+
+def _median_cases():
+    rng = random.Random(0)
+    return [
+        (
+            f"n={n}",
+            [[rng.randint(1_000, 4_000) * 10**18 for _ in range(n)] for _ in range(10)],
+        )
+        for n in range(1, 16)
+    ]
+
+
+def _deploy_trusted_signer_price_oracle_profiler(container):
+    admin = accounts[0]
+    price_signer = accounts.add(PRICE_SIGNER_KEY)
+    asset_registry = deploy_asset_registry(
+        admin,
+        [
+            ("ETH", TokenAddresses.ETH),
+            ("BTC", TokenAddresses.WBTC),
+            ("DAI", TokenAddresses.DAI),
+        ],
+    )
+    return admin.deploy(container, asset_registry, price_signer.address, True)
+
+
+def _post_price_cases():
+    # The second case overwrites the prices stored by the first one.
+    return [
+        (
+            "new storage",
+            [("ETH", "2395.99"), ("BTC", "38316.7"), ("DAI", "1.013")],
+        ),
+        (
+            "allocated storage",
+            [("ETH", "2385.99"), ("BTC", "38216.7"), ("DAI", "1.213")],
+        ),
+    ]
+
+
+def _post_prices(profiler, prices):
+    price_signer = accounts.add(PRICE_SIGNER_KEY)
+    chain.sleep(1)
+    chain.mine()
+    timestamp = chain.time()
+    signed_prices = []
+    for key, price in prices:
+        message = make_message(
+            key, int(scale(Decimal(price), PRICE_DECIMALS)), timestamp
+        )
+        signed_prices.append((message, sign_message(message, price_signer)))
+    return profiler.profilePostPrice(signed_prices, {"from": accounts[0]})
+
+
+def _post_batch_prices(profiler, prices):
+    price_signer = accounts.add(PRICE_SIGNER_KEY)
+    chain.sleep(1)
+    chain.mine()
+    message = make_batch_message(
+        [(key, int(scale(Decimal(price), PRICE_DECIMALS))) for key, price in prices],
+        chain.time(),
+    )
+    return profiler.profilePostBatchPrices(
+        message, sign_message(message, price_signer), {"from": accounts[0]}
+    )
+
+
+BENCHMARKS = [
+    Benchmark(
+        "Arrays.sort",
+        "ArraysProfiler",
+        ["Arrays.sort"],
+        _sort_cases,
+        lambda profiler, args: profiler.profileQuickSort(args),
+    ),
+    Benchmark(
+        "Arrays.dedup",
+        "ArraysProfiler",
+        ["Arrays.dedup"],
+        _dedup_cases,
+        lambda profiler, args: profiler.profileDedup(args),
+    ),
+    Benchmark(
+        "LogExpMath.sqrt",
+        "LogExpMathProfiler",
+        ["LogExpMath.sqrt"],
+        _sqrt_cases,
+        lambda profiler, args: profiler.profileSqrt(args),
+    ),
+    Benchmark(
+        "OrderStatistics.median",
+        "OrderStatisticsProfiler",
+        ["OrderStatistics.median"],
+        _median_cases,
+        lambda profiler, args: profiler.profileMedian(args),
+    ),
+    Benchmark(
+        "TrustedSignerPriceOracle.postPrice",
+        "TrustedSignerPriceOracleProfiler",
+        ["TrustedSignerPriceOracleProfiler.postPrice"],
+        _post_price_cases,
+        _post_prices,
+        _deploy_trusted_signer_price_oracle_profiler,
+    ),
+    Benchmark(
+        "TrustedSignerPriceOracle.postBatchPrices",
+        "TrustedSignerPriceOracleProfiler",
+        ["TrustedSignerPriceOracleProfiler.postBatchPrices"],
+        _post_price_cases,
+        _post_batch_prices,
+        _deploy_trusted_signer_price_oracle_profiler,
+    ),
+]
+
+
+def discover_profilers() -> Dict[str, Any]:
+    """Contract containers of all profiler contracts in the project."""
+    containers = project.get_loaded_projects()[0].dict()
+    return {name: c for name, c in containers.items() if name.endswith("Profiler")}
+
+
+def run_benchmark(benchmark: Benchmark, container) -> Dict[str, Dict[str, Any]]:
+    profiler = benchmark.deploy(container)
+    results = {}
+    for case, args in benchmark.cases():
+        tx = benchmark.run(profiler, args)
+        gas_stats = comput_gas_stats(tx)
+        results[case] = {
+            fn: summarize(gas_stats[fn])
+            for fn in benchmark.functions
+            if fn in gas_stats
+        }
+        print(f"{benchmark.name} [{case}]: {results[case]}")
+    return results
+
+
+def run_benchmarks(only: Iterable[str] = ()) -> BenchmarkResults:
+    only = set(only)
+    profilers = discover_profilers()
+    benchmarked = {b.profiler for b in BENCHMARKS}
+    for name in sorted(profilers.keys() - benchmarked):
+        print(f"warning: no benchmark for profiler {name}", file=sys.stderr)
+
+    results = {}
+    for benchmark in BENCHMARKS:
+        if only and benchmark.name not in only:
+            continue
+        if benchmark.profiler not in profilers:
+            print(
+                f"warning: profiler {benchmark.profiler} not found, skipping {benchmark.name}",
+                file=sys.stderr,
+            )
+            continue
+        results[benchmark.name] = run_benchmark(
+            benchmark, profilers[benchmark.profiler]
+        )
+    return results
+
+
+def main(
+    output: str = DEFAULT_OUTPUT,
+    baseline: str = "",
+    threshold: str = str(DEFAULT_THRESHOLD),
+    only: str = "",
+):
+    results = run_benchmarks(filter(None, only.split(",")))
+    save_results(results, output)
+    print(f"results written to {output}")
+
+    if not baseline:
+        return
+    changes = compare_results(results, load_results(baseline))
+    print(format_changes(changes, threshold=0))
+    regressions = find_regressions(changes, float(threshold))
+    if regressions:
+        print(f"\ngas regressions above {float(threshold):.2%}:")
+        print(format_changes(regressions))
+        sys.exit(1)
@@ -208,3 +208,16 @@ def deploy_proxy(contract, init_data=b"", config_key=None, overwrite_proxy=False
     container.remove(contract)
     container.at(proxy.address)
     return container
+
+
+def upgrade_proxy(contract, config_key):
+    """Points the proxy registered under `config_key` to the implementation `contract`."""
+    deployer = get_deployer()
+    # proxy_admin = ProxyAdmin[0]
+    proxy_admin = ProxyAdmin.at("0x581aE43498196e3Dc274F3F23FF7718d287BC2C6")
+    proxy = get_gyro_config().getAddress(config_key)
+    GovernanceProxy[0].executeCall(
+        proxy_admin,
+        proxy_admin.upgrade.encode_input(proxy, contract),
+        {"from": deployer, **make_tx_params()},
+    )
@@ -1,4 +1,5 @@
 import os
+import sys
 import pytest
 
 from brownie.network import gas_price, priority_fee
@@ -24,6 +25,15 @@ def pytest_addoption(parser):
     parser.addoption("--underlying", help="only run tests for given underlying")
 
 
+def pytest_terminal_summary(terminalreporter):
+    # How often the adaptive evaluation of the high-precision LP share pricing had to fall back to 100 decimals.
+    high_prec = sys.modules.get("lp_share_pricing_high_prec")
+    if high_prec is not None and high_prec.ESCALATION_STATS.evaluations:
+        terminalreporter.write_line(
+            f"lp_share_pricing_high_prec: {high_prec.ESCALATION_STATS}"
+        )
+
+
 def pytest_generate_tests(metafunc):
     if "underlying" in metafunc.fixturenames:
         underlying = metafunc.config.getoption("underlying")
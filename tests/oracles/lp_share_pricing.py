@@ -1,7 +1,8 @@
 from operator import add, sub
 from typing import Iterable
 
-from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.eclp.derived_params_cache import DERIVED_PARAMS_CACHE
+from tests.support.quantized_backend import QuantizedDecimal as D
 
 
 class ECLP_params:
@@ -18,6 +19,17 @@ class ECLP_derived_params:
         self.tau_alpha = tau_alpha
         self.tau_beta = tau_beta
 
+    @staticmethod
+    def from_params(params: ECLP_params) -> "ECLP_derived_params":
+        """Derived params via the (persistent) derived params cache."""
+        tau_alpha, tau_beta = DERIVED_PARAMS_CACHE.get(
+            "lp_share_pricing",
+            (params.alpha, params.beta, params.c, params.s, params.lam),
+            lambda: (tau(params, params.alpha), tau(params, params.beta)),
+            D,
+        )
+        return ECLP_derived_params(tau_alpha, tau_beta)
+
 
 def price_bpt_CPMM(
     weights: Iterable[D], invariant_div_supply: D, underlying_prices: Iterable[D]
@@ -57,7 +69,7 @@ def price_bpt_2clp(
     elif px / py >= sqrt_beta**2:
         return invariant_div_supply * py * (sqrt_beta - sqrt_alpha)
     else:
-        term = 2 * D(px * py) ** D(1 / 2) - px / sqrt_beta - py * sqrt_alpha
+        term = 2 * D(px * py).sqrt() - px / sqrt_beta - py * sqrt_alpha
         return term * invariant_div_supply
 
 
@@ -69,7 +81,7 @@ def price_bpt_3clp_representable(
     price_bpt_price_bpt_3CLP().
     """
     px, py, pz = (underlying_prices[0], underlying_prices[1], underlying_prices[2])
-    term = 3 * (px * py * pz) ** D(1 / 3) - (px + py + pz) * cbrt_alpha
+    term = 3 * (px * py * pz).cbrt() - (px + py + pz) * cbrt_alpha
     return term * invariant_div_supply
 
 
@@ -79,24 +91,38 @@ def price_bpt_ECLP(
     invariant_div_supply: D,
     underlying_prices: Iterable[D],
 ) -> D:
+    return price_bpt_ECLP_Ainv(
+        params,
+        mul_Ainv(params, derived_params.tau_alpha),
+        mul_Ainv(params, derived_params.tau_beta),
+        invariant_div_supply,
+        underlying_prices,
+    )
+
+
+def price_bpt_ECLP_Ainv(
+    params: ECLP_params,
+    Ainv_tau_alpha: tuple[D, D],
+    Ainv_tau_beta: tuple[D, D],
+    invariant_div_supply: D,
+    underlying_prices: Iterable[D],
+) -> D:
+    """
+    Same as price_bpt_ECLP(), with mul_Ainv(params, tau_alpha) and mul_Ainv(params, tau_beta) given, so they can be
+    reused across calls with the same params.
+    """
     px, py = (underlying_prices[0], underlying_prices[1])
     px_in_y = px / py
     if px_in_y < params.alpha:
-        bp = (
-            mul_Ainv(params, derived_params.tau_beta)[0]
-            - mul_Ainv(params, derived_params.tau_alpha)[0]
-        )
+        bp = Ainv_tau_beta[0] - Ainv_tau_alpha[0]
         return bp * px * invariant_div_supply
     elif px_in_y > params.beta:
-        bp = (
-            mul_Ainv(params, derived_params.tau_alpha)[1]
-            - mul_Ainv(params, derived_params.tau_beta)[1]
-        )
+        bp = Ainv_tau_alpha[1] - Ainv_tau_beta[1]
         return bp * py * invariant_div_supply
     else:
         sub_vec = mul_Ainv(params, tau(params, px_in_y))
-        vecx = mul_Ainv(params, derived_params.tau_beta)[0] - sub_vec[0]
-        vecy = mul_Ainv(params, derived_params.tau_alpha)[1] - sub_vec[1]
+        vecx = Ainv_tau_beta[0] - sub_vec[0]
+        vecy = Ainv_tau_alpha[1] - sub_vec[1]
         return scalar_prod((px, py), (vecx, vecy)) * invariant_div_supply
 
 
@@ -126,7 +152,7 @@ def tau(params: ECLP_params, px: D) -> tuple[D, D]:
 
 
 def eta(pxc: D) -> tuple[D, D]:
-    z = D(1 + pxc**2) ** D(1 / 2)
+    z = D(1 + pxc**2).sqrt()
     vecx = pxc / z
     vecy = D(1) / z
     return (vecx, vecy)
@@ -174,7 +200,7 @@ def price_bpt_3CLP(
     # Relative prices of a pool that is arbitrage-free with the external market
     pXZPool, pYZPool = relativeEquilibriumPrices3CLP(alpha, pXZ, pYZ)
 
-    gamma = (pXZPool * pYZPool) ** (D(1) / 3)
+    gamma = (pXZPool * pYZPool).cbrt()
 
     # Absolute prices (short notation)
     px, py, pz = underlying_prices
@@ -0,0 +1,118 @@
+"""Batched evaluation of the BPT price functions in `lp_share_pricing`.
+
+A `BptPriceTable` is built once from a table of pools and then prices all of them for one row of underlying prices
+per pool (e.g., once per oracle tick). Everything that only depends on the pool parameters is computed once per
+distinct set of parameters, in particular `mul_Ainv(tau_alpha)` / `mul_Ainv(tau_beta)` for ECLPs (and tau(alpha),
+tau(beta) themselves, from the derived params cache, if no derived params are given). Pools are then priced with the
+scalar functions, so results are identical to calling them pool by pool.
+"""
+
+from functools import partial
+from typing import Any, Callable, Dict, List, NamedTuple, Sequence
+
+import lp_share_pricing as math_implementation
+from tests.support.quantized_backend import QuantizedDecimal as D
+
+CPMM = "CPMM"
+CLP2 = "2CLP"
+CLP3 = "3CLP"
+ECLP = "ECLP"
+
+
+class PoolRow(NamedTuple):
+    """One pool. `params` depends on `pool_type`:
+
+    - CPMM: the weights
+    - 2CLP: (sqrt_alpha, sqrt_beta)
+    - 3CLP: root3Alpha. Priced with `price_bpt_3clp_representable`, so prices must be representable in the pool.
+    - ECLP: ECLP_params or (ECLP_params, ECLP_derived_params). Derived params are computed if missing.
+    """
+
+    pool_type: str
+    params: Any
+    invariant_div_supply: D
+
+
+Pricer = Callable[[D, Sequence[D]], D]
+
+
+def _cpmm_pricer(weights: Sequence[D]) -> Pricer:
+    return partial(math_implementation.price_bpt_CPMM, list(weights))
+
+
+def _2clp_pricer(params) -> Pricer:
+    sqrt_alpha, sqrt_beta = params
+    return partial(math_implementation.price_bpt_2clp, sqrt_alpha, sqrt_beta)
+
+
+def _3clp_pricer(root3Alpha: D) -> Pricer:
+    return partial(math_implementation.price_bpt_3clp_representable, root3Alpha)
+
+
+def _split_eclp_params(params):
+    if isinstance(params, tuple) and len(params) == 2:
+        return params
+    return params, None
+
+
+def _eclp_pricer(params) -> Pricer:
+    params, derived = _split_eclp_params(params)
+    if derived is None:
+        derived = math_implementation.ECLP_derived_params.from_params(params)
+    return partial(
+        math_implementation.price_bpt_ECLP_Ainv,
+        params,
+        math_implementation.mul_Ainv(params, derived.tau_alpha),
+        math_implementation.mul_Ainv(params, derived.tau_beta),
+    )
+
+
+_PRICER_FACTORIES: Dict[str, Callable[[Any], Pricer]] = {
+    CPMM: _cpmm_pricer,
+    CLP2: _2clp_pricer,
+    CLP3: _3clp_pricer,
+    ECLP: _eclp_pricer,
+}
+
+
+def _params_key(pool_type: str, params):
+    """Hashable key identifying pools with the same parameters."""
+    if pool_type == ECLP:
+        params, derived = _split_eclp_params(params)
+        derived_key = None
+        if derived is not None:
+            derived_key = (tuple(derived.tau_alpha), tuple(derived.tau_beta))
+        return (params.alpha, params.beta, params.c, params.s, params.lam), derived_key
+    if pool_type in (CPMM, CLP2):
+        return tuple(params)
+    return params
+
+
+class BptPriceTable:
+    def __init__(self, pools: Sequence[PoolRow]):
+        self.pools = list(pools)
+        pricers: Dict[Any, Pricer] = {}
+        self._pricers: List[Pricer] = []
+        for pool in self.pools:
+            if pool.pool_type not in _PRICER_FACTORIES:
+                raise ValueError(f"unknown pool type {pool.pool_type!r}")
+            key = (pool.pool_type, _params_key(pool.pool_type, pool.params))
+            if key not in pricers:
+                pricers[key] = _PRICER_FACTORIES[pool.pool_type](pool.params)
+            self._pricers.append(pricers[key])
+        self.n_distinct_params = len(pricers)
+
+    def price_all(self, prices: Sequence[Sequence[D]]) -> List[D]:
+        """BPT prices of all pools. `prices[i]` are the underlying prices for pool i."""
+        if len(prices) != len(self.pools):
+            raise ValueError(
+                f"expected {len(self.pools)} rows of prices, got {len(prices)}"
+            )
+        return [
+            pricer(pool.invariant_div_supply, row)
+            for pricer, pool, row in zip(self._pricers, self.pools, prices)
+        ]
+
+
+def price_bpt_batch(pools: Sequence[PoolRow], prices: Sequence[Sequence[D]]) -> List[D]:
+    return BptPriceTable(pools).price_all(prices)
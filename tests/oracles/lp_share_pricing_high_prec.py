@@ -1,10 +1,136 @@
+"""High-precision variant of `lp_share_pricing`: all intermediate values are computed with 100 decimals (D3).
+
+By default, evaluation is *adaptive*: each function is first evaluated with 38 decimals (D2) and, to estimate the
+error of that, with 18 decimals (D). Since errors scale with the precision, the 38-decimal error is about 1e-20 times
+the difference between the two. If both evaluations take the same branches and every value that's rounded to 18
+decimals (incl. the result) is either the same in both or doesn't lie within that error of a rounding boundary, the
+38-decimal result is the same as the 100-decimal one and we return it. Otherwise, we escalate to 100 decimals.
+`ESCALATION_STATS` counts how often that happens.
+
+Set the environment variable `LP_SHARE_PRICING_PRECISION=high` to always evaluate with 100 decimals.
+"""
+
+import decimal
+import os
+from dataclasses import dataclass
 from operator import add, sub
 from typing import Iterable
 
+import tests.support.quantized_decimal_38 as quantized_decimal_38
+import tests.support.quantized_decimal_100 as quantized_decimal_100
+from tests.support.eclp.derived_params_cache import DERIVED_PARAMS_CACHE
 from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_decimal_38 import QuantizedDecimal as D2
 from tests.support.quantized_decimal_100 import QuantizedDecimal as D3
 from tests.support.quantized_decimal_convd import convd
 
+PRECISION = os.environ.get("LP_SHARE_PRICING_PRECISION", "adaptive")
+
+if PRECISION not in ("adaptive", "high"):
+    raise ValueError(
+        f"unknown LP_SHARE_PRICING_PRECISION {PRECISION!r}, expected 'adaptive' or 'high'"
+    )
+
+# Safety factor on the estimated error of the 38-decimal evaluation, and a lower bound for it.
+ERROR_SAFETY_FACTOR = 1000
+MIN_ERROR = decimal.Decimal("1E-34")
+
+# (QuantizedDecimal class, decimal context precision) for each evaluation.
+_LOW_PREC = (D, quantized_decimal_38.MAX_PREC_VALUE)
+_MID_PREC = (D2, quantized_decimal_38.MAX_PREC_VALUE)
+_HIGH_PREC = (D3, quantized_decimal_100.MAX_PREC_VALUE)
+
+
+@dataclass
+class EscalationStats:
+    evaluations: int = 0
+    escalations: int = 0
+
+    @property
+    def escalation_rate(self) -> float:
+        return self.escalations / self.evaluations if self.evaluations else 0.0
+
+    def reset(self):
+        self.evaluations = 0
+        self.escalations = 0
+
+    def __str__(self):
+        return (
+            f"{self.escalations} of {self.evaluations} evaluations escalated to 100 decimals "
+            + f"({self.escalation_rate:.2%})"
+        )
+
+
+ESCALATION_STATS = EscalationStats()
+
+
+class _Trace:
+    """Record of one evaluation, for comparing evaluations at different precisions. Passed to the evaluated function."""
+
+    def __init__(self):
+        # Values rounded to 18 decimals, see `down()`
+        self.values = []
+        # Branches taken, see `branch()`
+        self.branches = []
+
+    def down(self, x):
+        """convd(x, D), recording x for the rounding boundary check of the adaptive evaluation."""
+        self.values.append(x)
+        return convd(x, D)
+
+    def branch(self, branch_id: str):
+        """Record that the evaluation took the branch `branch_id`."""
+        self.branches.append(branch_id)
+
+
+def _run(f, prec, args):
+    H, context_prec = prec
+    trace = _Trace()
+    with decimal.localcontext() as context:
+        context.prec = context_prec
+        return f(H, trace, *args), trace
+
+
+def _is_safe(value, low_prec_value) -> bool:
+    """Whether `value` rounds to the same 18-decimal value as the exact value, given the less precise estimate
+    `low_prec_value` (18 decimals) of it.
+
+    This also applies if both are the same: the value may still be just below a rounding boundary, which the
+    18-decimal evaluation can't resolve (e.g., for results that are 18-decimal values themselves).
+    """
+    with decimal.localcontext() as context:
+        context.prec = quantized_decimal_38.MAX_PREC_VALUE
+        error = abs(value.raw - low_prec_value.raw).scaleb(-20) * ERROR_SAFETY_FACTOR
+        error = max(error, MIN_ERROR)
+        return D(value.raw - error) == D(value.raw + error)
+
+
+def _evaluate(f, *args):
+    """Evaluate `f(H, trace, *args)`, where H is the QuantizedDecimal class to use for high-precision values and
+    `trace` the `_Trace` of the evaluation."""
+    if PRECISION == "high":
+        return _run(f, _HIGH_PREC, args)[0]
+
+    ESCALATION_STATS.evaluations += 1
+    try:
+        _, low_prec_trace = _run(f, _LOW_PREC, args)
+        result, trace = _run(f, _MID_PREC, args)
+    except ArithmeticError:
+        safe = False
+    else:
+        safe = (
+            trace.branches == low_prec_trace.branches
+            and len(trace.values) == len(low_prec_trace.values)
+            and all(
+                _is_safe(v, lv) for v, lv in zip(trace.values, low_prec_trace.values)
+            )
+        )
+    if safe:
+        return result
+
+    ESCALATION_STATS.escalations += 1
+    return _run(f, _HIGH_PREC, args)[0]
+
 
 class ECLP_params:
     def __init__(self, alpha: D, beta: D, c: D, s: D, lam: D):
@@ -20,72 +146,112 @@ class ECLP_derived_params:
         self.tau_alpha = tau_alpha
         self.tau_beta = tau_beta
 
+    @staticmethod
+    def from_params(params: ECLP_params) -> "ECLP_derived_params":
+        """Derived params via the (persistent) derived params cache."""
+        tau_alpha, tau_beta = DERIVED_PARAMS_CACHE.get(
+            "lp_share_pricing_high_prec",
+            (params.alpha, params.beta, params.c, params.s, params.lam),
+            lambda: (tau(params, params.alpha), tau(params, params.beta)),
+            D,
+        )
+        return ECLP_derived_params(tau_alpha, tau_beta)
+
 
 def price_bpt_CPMM(
     weights: Iterable[D], invariant_div_supply: D, underlying_prices: Iterable[D]
 ) -> D:
-    prod = convd(invariant_div_supply, D3)
+    return _evaluate(_price_bpt_CPMM, weights, invariant_div_supply, underlying_prices)
+
+
+def _price_bpt_CPMM(H, trace, weights, invariant_div_supply, underlying_prices):
+    prod = convd(invariant_div_supply, H)
     for i in range(len(weights)):
-        prod = prod * (
-            convd(underlying_prices[i], D3) / convd(weights[i], D3)
-        ) ** convd(weights[i], D3)
-    return convd(prod, D)
+        prod = prod * (convd(underlying_prices[i], H) / convd(weights[i], H)) ** convd(
+            weights[i], H
+        )
+    return trace.down(prod)
 
 
 def price_bpt_two_asset_CPMM(
     weights: Iterable[D], invariant_div_supply: D, underlying_prices: Iterable[D]
 ) -> D:
+    return _evaluate(
+        _price_bpt_two_asset_CPMM, weights, invariant_div_supply, underlying_prices
+    )
+
+
+def _price_bpt_two_asset_CPMM(
+    H, trace, weights, invariant_div_supply, underlying_prices
+):
     second_term = (
-        (convd(underlying_prices[0], D3) * convd(weights[1], D3))
-        / (convd(weights[0], D3) * convd(underlying_prices[1], D3))
-    ) ** convd(weights[0], D3)
-    third_term = convd(underlying_prices[1], D3) / convd(weights[1], D3)
-    return convd(invariant_div_supply * second_term * third_term, D)
+        (convd(underlying_prices[0], H) * convd(weights[1], H))
+        / (convd(weights[0], H) * convd(underlying_prices[1], H))
+    ) ** convd(weights[0], H)
+    third_term = convd(underlying_prices[1], H) / convd(weights[1], H)
+    return trace.down(invariant_div_supply * second_term * third_term)
 
 
 def price_bpt_CPMM_equal_weights(
     weight: D, invariant_div_supply: D, underlying_prices: Iterable[D]
 ) -> D:
-    prod = D3("1")
+    return _evaluate(
+        _price_bpt_CPMM_equal_weights, weight, invariant_div_supply, underlying_prices
+    )
+
+
+def _price_bpt_CPMM_equal_weights(
+    H, trace, weight, invariant_div_supply, underlying_prices
+):
+    prod = H("1")
     for i in range(len(underlying_prices)):
-        prod = prod * convd(underlying_prices[i], D3) / convd(weight, D3)
-    prod = prod ** convd(weight, D3)
-    return convd(prod * convd(invariant_div_supply, D3), D)
+        prod = prod * convd(underlying_prices[i], H) / convd(weight, H)
+    prod = prod ** convd(weight, H)
+    return trace.down(prod * convd(invariant_div_supply, H))
 
 
 def price_bpt_2clp(
     sqrt_alpha: D, sqrt_beta: D, invariant_div_supply: D, underlying_prices: Iterable[D]
 ) -> D:
-    px, py = (convd(underlying_prices[0], D3), convd(underlying_prices[1], D3))
-    sqrt_alpha_high_prec = convd(sqrt_alpha, D3)
-    sqrt_beta_high_prec = convd(sqrt_beta, D3)
-    invariant_div_supply_high_prec = convd(invariant_div_supply, D3)
+    return _evaluate(
+        _price_bpt_2clp, sqrt_alpha, sqrt_beta, invariant_div_supply, underlying_prices
+    )
+
+
+def _price_bpt_2clp(
+    H, trace, sqrt_alpha, sqrt_beta, invariant_div_supply, underlying_prices
+):
+    px, py = (convd(underlying_prices[0], H), convd(underlying_prices[1], H))
+    sqrt_alpha_high_prec = convd(sqrt_alpha, H)
+    sqrt_beta_high_prec = convd(sqrt_beta, H)
+    invariant_div_supply_high_prec = convd(invariant_div_supply, H)
 
     if px / py <= sqrt_alpha_high_prec**2:
-        return convd(
+        trace.branch("below alpha")
+        return trace.down(
             (
                 invariant_div_supply_high_prec
                 * px
-                * (D3(1) / sqrt_alpha_high_prec - D3(1) / sqrt_beta_high_prec)
-            ),
-            D,
+                * (H(1) / sqrt_alpha_high_prec - H(1) / sqrt_beta_high_prec)
+            )
         )
     elif px / py >= sqrt_beta_high_prec**2:
-        return convd(
+        trace.branch("above beta")
+        return trace.down(
             (
                 invariant_div_supply_high_prec
                 * py
                 * (sqrt_beta_high_prec - sqrt_alpha_high_prec)
-            ),
-            D,
+            )
         )
     else:
+        trace.branch("in range")
         term = (
-            D3("2") * D3(px * py) ** D3(1 / 2)
+            H("2") * H(px * py) ** H(1 / 2)
             - px / sqrt_beta_high_prec
             - py * sqrt_alpha_high_prec
         )
-        return convd(term * invariant_div_supply_high_prec, D)
+        return trace.down(term * invariant_div_supply_high_prec)
 
 
 def price_bpt_3clp(
@@ -102,27 +268,38 @@ def price_bpt_ECLP(
     invariant_div_supply: D,
     underlying_prices: Iterable[D],
 ) -> D:
-    invariant_div_supply_high_prec = convd(invariant_div_supply, D3)
-    px, py = (convd(underlying_prices[0], D3), convd(underlying_prices[1], D3))
+    return _evaluate(
+        _price_bpt_ECLP, params, derived_params, invariant_div_supply, underlying_prices
+    )
+
+
+def _price_bpt_ECLP(
+    H, trace, params, derived_params, invariant_div_supply, underlying_prices
+):
+    invariant_div_supply_high_prec = convd(invariant_div_supply, H)
+    px, py = (convd(underlying_prices[0], H), convd(underlying_prices[1], H))
     px_in_y = px / py
-    if px_in_y < convd(params.alpha, D3):
+    if px_in_y < convd(params.alpha, H):
+        trace.branch("below alpha")
         bp = (
-            mul_Ainv(params, derived_params.tau_beta)[0]
-            - mul_Ainv(params, derived_params.tau_alpha)[0]
+            mul_Ainv(params, derived_params.tau_beta, H)[0]
+            - mul_Ainv(params, derived_params.tau_alpha, H)[0]
         )
-        return convd(bp * px * invariant_div_supply_high_prec, D)
-    elif px_in_y > convd(params.beta, D3):
+        return trace.down(bp * px * invariant_div_supply_high_prec)
+    elif px_in_y > convd(params.beta, H):
+        trace.branch("above beta")
         bp = (
-            mul_Ainv(params, derived_params.tau_alpha)[1]
-            - mul_Ainv(params, derived_params.tau_beta)[1]
+            mul_Ainv(params, derived_params.tau_alpha, H)[1]
+            - mul_Ainv(params, derived_params.tau_beta, H)[1]
         )
-        return convd(bp * py * invariant_div_supply_high_prec, D)
+        return trace.down(bp * py * invariant_div_supply_high_prec)
     else:
-        sub_vec = mul_Ainv(params, tau(params, convd(px_in_y, D)))
-        vecx = mul_Ainv(params, derived_params.tau_beta)[0] - sub_vec[0]
-        vecy = mul_Ainv(params, derived_params.tau_alpha)[1] - sub_vec[1]
-        return convd(
-            scalar_prod((px, py), (vecx, vecy)) * invariant_div_supply_high_prec, D
+        trace.branch("in range")
+        sub_vec = mul_Ainv(params, tau(params, trace.down(px_in_y)), H)
+        vecx = mul_Ainv(params, derived_params.tau_beta, H)[0] - sub_vec[0]
+        vecy = mul_Ainv(params, derived_params.tau_alpha, H)[1] - sub_vec[1]
+        return trace.down(
+            scalar_prod((px, py), (vecx, vecy)) * invariant_div_supply_high_prec
         )
 
 
@@ -130,13 +307,13 @@ def scalar_prod(t1: tuple[D3, D3], t2: tuple[D3, D3]) -> D3:
     return t1[0] * t2[0] + t1[1] * t2[1]
 
 
-def mul_Ainv(params: ECLP_params, t: tuple[D, D]) -> tuple[D3, D3]:
-    vecx = convd(t[0], D3) * convd(params.lam, D3) * convd(params.c, D3) + convd(
-        t[1], D3
-    ) * convd(params.s, D3)
-    vecy = convd(-t[0], D3) * convd(params.lam, D3) * convd(params.s, D3) + convd(
-        t[1], D3
-    ) * convd(params.c, D3)
+def mul_Ainv(params: ECLP_params, t: tuple[D, D], H=D3) -> tuple[D3, D3]:
+    vecx = convd(t[0], H) * convd(params.lam, H) * convd(params.c, H) + convd(
+        t[1], H
+    ) * convd(params.s, H)
+    vecy = convd(-t[0], H) * convd(params.lam, H) * convd(params.s, H) + convd(
+        t[1], H
+    ) * convd(params.c, H)
     return (vecx, vecy)
 
 
@@ -163,66 +340,88 @@ def eta(pxc: D) -> tuple[D, D]:
 
 
 def relativeEquilibriumPrices3CLP(alpha: D, pXZ: D, pYZ: D) -> tuple[D, D]:
-    alpha_high_prec = convd(alpha, D3)
-    pXZ_high_prec = convd(pXZ, D3)
-    pYZ_high_prec = convd(pYZ, D3)
+    return _evaluate(_relativeEquilibriumPrices3CLP, alpha, pXZ, pYZ)
+
+
+def _relativeEquilibriumPrices3CLP(H, trace, alpha, pXZ, pYZ):
+    alpha_high_prec = convd(alpha, H)
+    pXZ_high_prec = convd(pXZ, H)
+    pYZ_high_prec = convd(pYZ, H)
 
     # Comparisons are re-ordered vs. the write-up to increase precision.
-    beta_high_prec = D3(1) / alpha_high_prec
+    beta_high_prec = H(1) / alpha_high_prec
     if pYZ_high_prec < alpha_high_prec * (pXZ_high_prec**2):
         if pYZ_high_prec < alpha_high_prec:
-            return D(1), convd(alpha_high_prec, D)
+            trace.branch("y below alpha")
+            return D(1), trace.down(alpha_high_prec)
         elif pYZ_high_prec > beta_high_prec:
-            return convd(beta_high_prec, D), convd(beta_high_prec, D)
+            trace.branch("y above beta")
+            return trace.down(beta_high_prec), trace.down(beta_high_prec)
         else:
-            return convd((beta_high_prec * pYZ_high_prec).sqrt(), D), convd(
-                pYZ_high_prec, D
+            trace.branch("y in range")
+            return trace.down((beta_high_prec * pYZ_high_prec).sqrt()), trace.down(
+                pYZ_high_prec
             )
     elif pXZ_high_prec < alpha_high_prec * (pYZ_high_prec**2):
         if pXZ_high_prec < alpha_high_prec:
-            return convd(alpha_high_prec, D), D(1)
+            trace.branch("x below alpha")
+            return trace.down(alpha_high_prec), D(1)
         elif pXZ_high_prec > beta_high_prec:
-            return convd(beta_high_prec, D), convd(beta_high_prec, D)
+            trace.branch("x above beta")
+            return trace.down(beta_high_prec), trace.down(beta_high_prec)
         else:
-            return convd(pXZ_high_prec, D), convd(
-                (beta_high_prec * pXZ_high_prec).sqrt(), D
+            trace.branch("x in range")
+            return trace.down(pXZ_high_prec), trace.down(
+                (beta_high_prec * pXZ_high_prec).sqrt()
             )
     elif pXZ_high_prec * pYZ_high_prec < alpha_high_prec:
         if pXZ_high_prec < alpha_high_prec * pYZ_high_prec:
-            return convd(alpha_high_prec, D), D(1)
+            trace.branch("xy below alpha, x below")
+            return trace.down(alpha_high_prec), D(1)
         elif pXZ_high_prec > beta_high_prec * pYZ_high_prec:
-            return D(1), convd(alpha_high_prec, D)
+            trace.branch("xy below alpha, x above")
+            return D(1), trace.down(alpha_high_prec)
         else:
+            trace.branch("xy below alpha")
             return (
-                convd((alpha_high_prec * pXZ_high_prec / pYZ_high_prec).sqrt(), D),
-                convd((alpha_high_prec * pYZ_high_prec / pXZ_high_prec).sqrt(), D),
+                trace.down((alpha_high_prec * pXZ_high_prec / pYZ_high_prec).sqrt()),
+                trace.down((alpha_high_prec * pYZ_high_prec / pXZ_high_prec).sqrt()),
             )
     else:
-        return convd(pXZ_high_prec, D), convd(pYZ_high_prec, D)
+        trace.branch("in range")
+        return trace.down(pXZ_high_prec), trace.down(pYZ_high_prec)
 
 
 def price_bpt_3CLP(
     root3Alpha: D, invariant_div_supply: D, underlying_prices: Iterable[D]
 ) -> D:
-    alpha_high_prec = convd(root3Alpha, D3) ** 3
-    invariant_div_supply_high_prec = convd(invariant_div_supply, D3)
+    return _evaluate(
+        _price_bpt_3CLP, root3Alpha, invariant_div_supply, underlying_prices
+    )
+
+
+def _price_bpt_3CLP(H, trace, root3Alpha, invariant_div_supply, underlying_prices):
+    alpha_high_prec = convd(root3Alpha, H) ** 3
+    invariant_div_supply_high_prec = convd(invariant_div_supply, H)
 
-    pX = convd(underlying_prices[0], D3)
-    pY = convd(underlying_prices[1], D3)
-    pZ = convd(underlying_prices[2], D3)
+    pX = convd(underlying_prices[0], H)
+    pY = convd(underlying_prices[1], H)
+    pZ = convd(underlying_prices[2], H)
 
     # Relative external (actual) prices
     pXZ = pX / pZ
     pYZ = pY / pZ
 
     # Relative prices of a pool that is arbitrage-free with the external market
-    pXZPool, pYZPool = relativeEquilibriumPrices3CLP(alpha_high_prec, pXZ, pYZ)
+    pXZPool, pYZPool = _relativeEquilibriumPrices3CLP(
+        H, trace, alpha_high_prec, pXZ, pYZ
+    )
 
-    gamma = (convd(pXZPool, D3) * convd(pYZPool, D3)) ** (D3(1) / 3)
+    gamma = (convd(pXZPool, H) * convd(pYZPool, H)) ** (H(1) / 3)
 
     # Absolute prices (short notation)
     value_factor = gamma * (
-        pX / convd(pXZPool, D3) + pY / convd(pYZPool, D3) + pZ
-    ) - convd(root3Alpha, D3) * (pX + pY + pZ)
+        pX / convd(pXZPool, H) + pY / convd(pYZPool, H) + pZ
+    ) - convd(root3Alpha, H) * (pX + pY + pZ)
 
-    return convd(convd(invariant_div_supply_high_prec, D3) * value_factor, D)
+    return trace.down(convd(invariant_div_supply_high_prec, H) * value_factor)
@@ -84,6 +84,16 @@ def test_remove_asset(asset_registry):
     assert not asset_registry.isAssetStable(TokenAddresses.DAI)
 
 
+def test_asset_addresses_version(asset_registry):
+    assert asset_registry.assetAddressesVersion() == 0
+    asset_registry.setAssetAddress("DAI", TokenAddresses.DAI)
+    assert asset_registry.assetAddressesVersion() == 1
+    asset_registry.addStableAsset(TokenAddresses.DAI)
+    assert asset_registry.assetAddressesVersion() == 1
+    asset_registry.removeAsset("DAI")
+    assert asset_registry.assetAddressesVersion() == 2
+
+
 def test_inexistent_asset_range(asset_registry):
     asset_registry.setAssetAddress("DAI", TokenAddresses.DAI)
     with reverts(error_codes.ASSET_NOT_SUPPORTED):
@@ -95,3 +105,27 @@ def test_set_asset_range(admin, asset_registry):
     price_range = Range(scale("0.95"), scale("1.02"))
     asset_registry.setAssetRange(TokenAddresses.DAI, price_range, {"from": admin})
     assert asset_registry.getAssetRange(TokenAddresses.DAI) == price_range
+
+
+def test_get_assets_stability_and_ranges(admin, asset_registry):
+    asset_registry.setAssetAddress("DAI", TokenAddresses.DAI)
+    asset_registry.setAssetAddress("USDC", TokenAddresses.USDC)
+    asset_registry.setAssetAddress("WETH", TokenAddresses.WETH)
+    for asset in [TokenAddresses.DAI, TokenAddresses.USDC]:
+        asset_registry.addStableAsset(asset, {"from": admin})
+    dai_range = Range(scale("0.95"), scale("1.02"))
+    usdc_range = Range(scale("0.97"), scale("1.01"))
+    asset_registry.setAssetRange(TokenAddresses.DAI, dai_range, {"from": admin})
+    asset_registry.setAssetRange(TokenAddresses.USDC, usdc_range, {"from": admin})
+
+    assets = [TokenAddresses.WETH, TokenAddresses.USDC, TokenAddresses.DAI]
+    is_stable, ranges = asset_registry.getAssetsStabilityAndRanges(assets)
+    assert is_stable == [False, True, True]
+    assert ranges == [(0, 0), usdc_range, dai_range]
+
+
+def test_get_assets_stability_and_ranges_missing_range(admin, asset_registry):
+    asset_registry.setAssetAddress("DAI", TokenAddresses.DAI)
+    asset_registry.addStableAsset(TokenAddresses.DAI, {"from": admin})
+    with reverts(error_codes.ASSET_NOT_SUPPORTED):
+        asset_registry.getAssetsStabilityAndRanges([TokenAddresses.DAI])
@@ -6,6 +6,7 @@ import hypothesis.strategies as st
 import numpy as np
 import pytest
 import requests
+from brownie import ZERO_ADDRESS
 from brownie.test import given
 from brownie.test.managers.runner import RevertContextManager as reverts
 from tests.fixtures.mainnet_contracts import TokenAddresses
@@ -291,6 +292,99 @@ def test_get_prices_usd_large_deviation_multiple_assets(
         )
 
 
+@pytest.mark.usefixtures("set_dummy_usd_prices", "initialize_local_oracle")
+def test_get_prices_usd_preferred_asset_for_relative_price_check(
+    local_checked_price_oracle, mock_price_oracle, admin
+):
+    # CRV/WETH is checked first without a preferred asset and is inconsistent with the USD prices.
+    mock_price_oracle.setRelativePrice(
+        TokenAddresses.CRV,
+        TokenAddresses.WETH,
+        scale(CRV_USD_PRICE / ETH_USD_PRICE) * Decimal("0.9"),
+    )
+    mock_price_oracle.setRelativePrice(
+        TokenAddresses.CRV, TokenAddresses.USDC, scale(CRV_USD_PRICE / USDC_USD_PRICE)
+    )
+    mock_price_oracle.setRelativePrice(
+        TokenAddresses.WETH, TokenAddresses.USDC, scale(ETH_USD_PRICE / USDC_USD_PRICE)
+    )
+    tokens = [TokenAddresses.CRV, TokenAddresses.WETH, TokenAddresses.USDC]
+
+    with reverts(error_codes.STALE_PRICE):
+        local_checked_price_oracle.getPricesUSD(tokens)
+
+    local_checked_price_oracle.setPreferredAssetForRelativePriceCheck(
+        TokenAddresses.CRV, TokenAddresses.USDC, {"from": admin}
+    )
+    assert (
+        local_checked_price_oracle.getPreferredAssetForRelativePriceCheck(
+            TokenAddresses.CRV
+        )
+        == TokenAddresses.USDC
+    )
+    usd_prices = local_checked_price_oracle.getPricesUSD(tokens)
+    assert usd_prices == [CRV_USD_PRICE, ETH_USD_PRICE, USDC_USD_PRICE]
+
+    # Falls back to the search once the preferred asset isn't used for checks anymore.
+    local_checked_price_oracle.removeAssetForRelativePriceCheck(
+        TokenAddresses.USDC, {"from": admin}
+    )
+    with reverts(error_codes.STALE_PRICE):
+        local_checked_price_oracle.getPricesUSD(tokens)
+
+
+@pytest.mark.usefixtures("initialize_local_oracle")
+def test_set_preferred_asset_for_relative_price_check(
+    local_checked_price_oracle, mock_price_oracle, admin, alice
+):
+    mock_price_oracle.setRelativePrice(
+        TokenAddresses.WBTC, TokenAddresses.USDC, scale(BTC_USD_PRICE / USDC_USD_PRICE)
+    )
+    with reverts(error_codes.ASSET_NOT_SUPPORTED):
+        local_checked_price_oracle.setPreferredAssetForRelativePriceCheck(
+            TokenAddresses.WBTC, TokenAddresses.WETH, {"from": admin}
+        )
+    with reverts(error_codes.ASSET_NOT_SUPPORTED):
+        local_checked_price_oracle.setPreferredAssetForRelativePriceCheck(
+            TokenAddresses.USDC, TokenAddresses.CRV, {"from": admin}
+        )
+    with reverts(error_codes.NOT_AUTHORIZED):
+        local_checked_price_oracle.setPreferredAssetForRelativePriceCheck(
+            TokenAddresses.WBTC, TokenAddresses.USDC, {"from": alice}
+        )
+
+    local_checked_price_oracle.setPreferredAssetForRelativePriceCheck(
+        TokenAddresses.WBTC, TokenAddresses.USDC, {"from": admin}
+    )
+    local_checked_price_oracle.setPreferredAssetForRelativePriceCheck(
+        TokenAddresses.WBTC, ZERO_ADDRESS, {"from": admin}
+    )
+    assert (
+        local_checked_price_oracle.getPreferredAssetForRelativePriceCheck(
+            TokenAddresses.WBTC
+        )
+        == ZERO_ADDRESS
+    )
+
+
+@given(
+    addresses=st.lists(
+        st.integers(min_value=1, max_value=2**160 - 1),
+        min_size=1,
+        max_size=20,
+        unique=True,
+    ),
+    data=st.data(),
+)
+def test_find_price(testing_checked_price_oracle, addresses, data):
+    tokens = ["0x" + a.to_bytes(20, "big").hex() for a in addresses]
+    prices = list(range(1, len(tokens) + 1))
+    i = data.draw(st.integers(min_value=0, max_value=len(tokens) - 1))
+    assert (
+        testing_checked_price_oracle.findPrice(tokens[i], tokens, prices) == prices[i]
+    )
+
+
 @pytest.mark.mainnetFork
 @pytest.mark.usefixtures(
     "set_common_chainlink_feeds",
@@ -326,6 +420,19 @@ def test_median(testing_checked_price_oracle, values):
         assert median_sol == int(true_median)
 
 
+@given(
+    values=st.lists(st.integers(min_value=0, max_value=10**30), min_size=1, max_size=15)
+)
+def test_median_few_oracles(testing_checked_price_oracle, values):
+    ordered = sorted(values)
+    n = len(values)
+    if n % 2 == 1:
+        expected = ordered[n // 2]
+    else:
+        expected = (ordered[n // 2 - 1] + ordered[n // 2]) // 2
+    assert testing_checked_price_oracle.median(values) == expected
+
+
 @given(
     values=st.lists(
         st.integers(min_value=1, max_value=2**63 - 1), min_size=1, max_size=100
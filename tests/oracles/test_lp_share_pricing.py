@@ -391,10 +391,9 @@ def faulty_params_eclp(params: ECLPMathParams):
 
 
 def mk_derived_params(params: ECLPMathParams):
-    tau_alpha = math_implementation.tau(params, params.alpha)
-    tau_beta = math_implementation.tau(params, params.beta)
+    derived = math_implementation.ECLP_derived_params.from_params(params)
     return ECLPMathDerivedParams(
-        Vector2(tau_alpha[0], tau_alpha[1]), Vector2(tau_beta[0], tau_beta[1])
+        Vector2(*derived.tau_alpha), Vector2(*derived.tau_beta)
     )
 
 
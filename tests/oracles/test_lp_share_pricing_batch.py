@@ -0,0 +1,85 @@
+from math import cos, pi, sin
+
+import hypothesis.strategies as st
+import pytest
+from brownie.test import given
+
+import lp_share_pricing as math_implementation
+import lp_share_pricing_batch as batch
+from tests.support.quantized_decimal import QuantizedDecimal as D
+
+price_strategy = st.decimals(min_value="1e-4", max_value="1e4", places=6)
+
+
+def _eclp_params(phi_degrees, alpha, beta, lam):
+    phi = phi_degrees / 360 * 2 * pi
+    return math_implementation.ECLP_params(
+        D(alpha), D(beta), D(cos(phi)), D(sin(phi)), D(lam)
+    )
+
+
+ECLP_PARAMS = _eclp_params(45, "0.97", "1.02", "500")
+
+POOLS = [
+    batch.PoolRow(batch.CPMM, (D("0.5"), D("0.5")), D("1.3")),
+    batch.PoolRow(batch.CPMM, (D("0.2"), D("0.3"), D("0.5")), D("0.7")),
+    batch.PoolRow(batch.CLP2, (D("0.99").sqrt(), D("1.01").sqrt()), D("2.5")),
+    batch.PoolRow(batch.CLP3, D("0.995"), D("1.1")),
+    batch.PoolRow(batch.ECLP, ECLP_PARAMS, D("3")),
+    batch.PoolRow(batch.ECLP, ECLP_PARAMS, D("4")),
+]
+
+
+def _scalar_price(pool: batch.PoolRow, prices):
+    if pool.pool_type == batch.CPMM:
+        return math_implementation.price_bpt_CPMM(
+            pool.params, pool.invariant_div_supply, prices
+        )
+    if pool.pool_type == batch.CLP2:
+        return math_implementation.price_bpt_2clp(
+            *pool.params, pool.invariant_div_supply, prices
+        )
+    if pool.pool_type == batch.CLP3:
+        return math_implementation.price_bpt_3clp_representable(
+            pool.params, pool.invariant_div_supply, prices
+        )
+    derived = math_implementation.ECLP_derived_params.from_params(pool.params)
+    return math_implementation.price_bpt_ECLP(
+        pool.params, derived, pool.invariant_div_supply, prices
+    )
+
+
+def test_shared_params():
+    table = batch.BptPriceTable(POOLS)
+    assert table.n_distinct_params == len(POOLS) - 1
+
+
+def test_invalid_input():
+    with pytest.raises(ValueError):
+        batch.BptPriceTable([batch.PoolRow("4CLP", None, D(1))])
+    with pytest.raises(ValueError):
+        batch.BptPriceTable(POOLS).price_all([])
+
+
+def _n_assets(pool: batch.PoolRow) -> int:
+    if pool.pool_type == batch.CPMM:
+        return len(pool.params)
+    if pool.pool_type == batch.CLP3:
+        return 3
+    return 2
+
+
+def _check_price_all(prices):
+    rows = [prices[: _n_assets(pool)] for pool in POOLS]
+    expected = [_scalar_price(pool, row) for pool, row in zip(POOLS, rows)]
+    assert batch.BptPriceTable(POOLS).price_all(rows) == expected
+
+
+@pytest.mark.parametrize("px", ["0.9", "0.98", "1", "1.015", "1.1"])
+def test_price_all_regions(px):
+    _check_price_all([D(px), D(1), D(1)])
+
+
+@given(prices=st.lists(price_strategy, min_size=3, max_size=3))
+def test_price_all(prices):
+    _check_price_all([D(p) for p in prices])
@@ -384,10 +384,9 @@ def faulty_params_eclp(params: ECLPMathParams):
 
 
 def mk_derived_params(params: ECLPMathParams):
-    tau_alpha = math_implementation.tau(params, params.alpha)
-    tau_beta = math_implementation.tau(params, params.beta)
+    derived = math_implementation.ECLP_derived_params.from_params(params)
     return ECLPMathDerivedParams(
-        Vector2(tau_alpha[0], tau_alpha[1]), Vector2(tau_beta[0], tau_beta[1])
+        Vector2(*derived.tau_alpha), Vector2(*derived.tau_beta)
     )
 
 
@@ -426,3 +425,93 @@ def test_price_bpt_eclp(
     )
 
     assert to_decimal(bpt_price_sol) == scale(bpt_price).approxed(rel=D("1e-8"))
+
+
+######################################################################
+### Adaptive precision
+
+
+def _evaluate_both(f, *args):
+    try:
+        adaptive = f(*args)
+        math_implementation.PRECISION = "high"
+        high = f(*args)
+    finally:
+        math_implementation.PRECISION = "adaptive"
+    return adaptive, high
+
+
+@given(
+    sqrt_alpha=st.decimals(min_value="0.02", max_value="0.99995", places=4),
+    sqrt_beta=st.decimals(min_value="1.00005", max_value="1.8", places=4),
+    invariant_div_supply=st.decimals(min_value="0.5", max_value="100000000", places=4),
+    underlying_prices=st.tuples(price_strategy, price_strategy),
+    weight=weights_strategy,
+)
+def test_adaptive_precision(
+    sqrt_alpha, sqrt_beta, invariant_div_supply, underlying_prices, weight
+):
+    adaptive, high = _evaluate_both(
+        math_implementation.price_bpt_2clp,
+        sqrt_alpha,
+        sqrt_beta,
+        invariant_div_supply,
+        underlying_prices,
+    )
+    assert adaptive == high
+
+    adaptive, high = _evaluate_both(
+        math_implementation.price_bpt_two_asset_CPMM,
+        (weight, D(1) - weight),
+        invariant_div_supply,
+        underlying_prices,
+    )
+    assert adaptive == high
+
+
+def _count_escalations(f, *args):
+    stats = math_implementation.ESCALATION_STATS
+    escalations = stats.escalations
+    adaptive, high = _evaluate_both(f, *args)
+    assert adaptive == high
+    return stats.escalations - escalations
+
+
+def test_adaptive_precision_exact():
+    # 3 * 0.333333333333333333 is exactly 0.999999999999999999 in both evaluations. That's a rounding boundary, and
+    # the 18-decimal evaluation can't tell it apart from a value just below it, so we have to escalate.
+    assert (
+        _count_escalations(
+            math_implementation.price_bpt_CPMM_equal_weights, D(1), D(3), [D(1) / 3]
+        )
+        == 1
+    )
+
+
+def test_adaptive_precision_escalates():
+    # The result is 2 * sqrt(1 + 1e-18) = 2.000000000000000000999...975, just below a rounding boundary, which the
+    # 38-decimal evaluation can't resolve.
+    assert (
+        _count_escalations(
+            math_implementation.price_bpt_CPMM_equal_weights,
+            D("0.5"),
+            D(1),
+            [D(1), D("1.000000000000000001")],
+        )
+        == 1
+    )
+
+
+def test_adaptive_precision_escalates_on_branch_mismatch():
+    # px / py is just above sqrt_alpha**2, but both round down to the same 18-decimal value, so the 18-decimal
+    # evaluation takes the "below alpha" branch and the 38-decimal one the "in range" branch.
+    assert (
+        _count_escalations(
+            math_implementation.price_bpt_2clp,
+            D("0.577350269189625764"),
+            D("1.2"),
+            D(1),
+            [D("2.33333333333333333"), D(7)],
+        )
+        == 1
+    )
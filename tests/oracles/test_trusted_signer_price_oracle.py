@@ -7,7 +7,11 @@ from brownie.test.managers.runner import RevertContextManager as reverts
 from tests.fixtures.mainnet_contracts import TokenAddresses
 from tests.support import error_codes
 from tests.support.constants import COINBASE_SIGNING_ADDRESS
-from tests.support.price_signing import make_message, sign_message
+from tests.support.price_signing import (
+    make_batch_message,
+    make_message,
+    sign_message,
+)
 from tests.support.utils import scale
 
 SAMPLE_MESSAGE = "0x00000000000000000000000000000000000000000000000000000000000000800000000000000000000000000000000000000000000000000000000061f1824800000000000000000000000000000000000000000000000000000000000000c000000000000000000000000000000000000000000000000000000008ebdae68f0000000000000000000000000000000000000000000000000000000000000006707269636573000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000000034254430000000000000000000000000000000000000000000000000000000000"
@@ -98,6 +102,74 @@ def test_post_prices(local_signer_price_oracle, price_signer, asset_registry):
         assert local_signer_price_oracle.getPriceUSD(asset_address) == expected_price
 
 
+@pytest.mark.usefixtures("add_assets_to_registry")
+def test_post_batch_prices(local_signer_price_oracle, price_signer, asset_registry):
+    timestamp = int(time.time())
+    prices = [
+        ("ETH", Decimal("2395.99")),
+        ("BTC", Decimal("38316.7")),
+        ("DAI", Decimal("1.013")),
+    ]
+    message = make_batch_message(
+        [(key, int(scale(price, PRICE_DECIMALS))) for key, price in prices], timestamp
+    )
+    signature = sign_message(message, price_signer)
+
+    tx = local_signer_price_oracle.postBatchPrices(message, signature)
+    assert len(tx.events["PriceUpdated"]) == len(prices)
+
+    for asset_name, unscaled_price in prices:
+        asset_address = asset_registry.getAssetAddress(asset_name)
+        expected_price = scale(unscaled_price, 18)
+        assert local_signer_price_oracle.getPriceUSD(asset_address) == expected_price
+        assert local_signer_price_oracle.getLastUpdate(asset_address) == timestamp
+
+    with reverts(error_codes.STALE_PRICE):
+        local_signer_price_oracle.postBatchPrices(message, signature)
+
+
+@pytest.mark.usefixtures("add_assets_to_registry")
+def test_post_batch_prices_invalid_signature(local_signer_price_oracle, accounts):
+    message = make_batch_message([("ETH", 2395990000)])
+    signature = sign_message(message, accounts[0])
+
+    with reverts(error_codes.INVALID_MESSAGE):
+        local_signer_price_oracle.postBatchPrices(message, signature)
+
+
+@pytest.mark.usefixtures("add_assets_to_registry")
+def test_post_batch_prices_follows_registry_updates(
+    local_signer_price_oracle, price_signer, asset_registry, admin
+):
+    message = make_batch_message([("ETH", 2395990000)], int(time.time()) - 10)
+    tx = local_signer_price_oracle.postBatchPrices(
+        message, sign_message(message, price_signer)
+    )
+    assert tx.events["PriceUpdated"]["asset"] == ETH_ADDRESS
+
+    asset_registry.setAssetAddress("ETH", TokenAddresses.WETH, {"from": admin})
+    message = make_batch_message([("ETH", 2385990000)])
+    tx = local_signer_price_oracle.postBatchPrices(
+        message, sign_message(message, price_signer)
+    )
+    assert tx.events["PriceUpdated"]["asset"] == TokenAddresses.WETH
+
+    asset_registry.removeAsset("ETH", {"from": admin})
+    message = make_batch_message([("ETH", 2375990000)], int(time.time()) + 1)
+    with reverts(error_codes.ASSET_NOT_SUPPORTED):
+        local_signer_price_oracle.postBatchPrices(
+            message, sign_message(message, price_signer)
+        )
+
+
+def test_post_batch_prices_inexistent_asset(local_signer_price_oracle, price_signer):
+    message = make_batch_message([("NAA", 12345678)])
+    signature = sign_message(message, price_signer)
+
+    with reverts(error_codes.ASSET_NOT_SUPPORTED):
+        local_signer_price_oracle.postBatchPrices(message, signature)
+
+
 def test_post_inexistent_asset(local_signer_price_oracle, price_signer):
     encoded_message = make_message("NAA", 12345678)
     signature = sign_message(encoded_message, price_signer)
@@ -1,9 +1,12 @@
 # from curses import meta
 # from importlib.metadata import metadata
-from typing import Dict, Iterable, List, Tuple
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
 
 from tests.support import constants
-from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_backend import QuantizedDecimal as D
 from tests.support.utils import scale
 
 STABLECOIN_IDEAL_PRICE = "1e18"
@@ -132,29 +135,10 @@ def build_metadata(order: List[Tuple], tokens: None) -> List[D]:
 
 
 def is_mint_safe(order: List[Tuple], tokens, mock_price_oracle, asset_registry) -> str:
-    metadata = build_metadata(order, tokens)
-    metadata = update_metadata_with_price_safety(
-        metadata, mock_price_oracle, asset_registry
-    )
-    metadata = update_metadata_with_epsilon_status(metadata)
-
-    if not metadata[3]:
-        return "55"
-
-    if metadata[1]:
-        if metadata[2]:
-            print("BINGO 1")
-            return ""
-        elif vault_weight_off_peg_falls(metadata):
-            print("BINGO 2")
-            return ""
-    elif safe_to_execute_outside_epsilon(metadata) & vault_weight_off_peg_falls(
-        metadata
-    ):
-        print("BINGO 3")
-        return ""
-
-    return "52"
+    metadata = ReserveMetadata.from_order(order, tokens)
+    metadata.update_price_safety(mock_price_oracle, asset_registry)
+    metadata.update_epsilon_status()
+    return metadata.mint_safety_code()
 
 
 def is_redeem_feasible(order: List[Tuple]):
@@ -170,21 +154,10 @@ def is_redeem_safe(
     if not is_redeem_feasible(order):
         return "56"
 
-    metadata = build_metadata(order, tokens)
-    metadata = update_metadata_with_price_safety(
-        metadata, mock_price_oracle, asset_registry
-    )
-    metadata = update_metadata_with_epsilon_status(metadata)
-
-    if not metadata[3]:
-        return "55"
-
-    if metadata[1]:
-        return ""
-    elif safe_to_execute_outside_epsilon(metadata):
-        return ""
-
-    return "53"
+    metadata = ReserveMetadata.from_order(order, tokens)
+    metadata.update_price_safety(mock_price_oracle, asset_registry)
+    metadata.update_epsilon_status()
+    return metadata.redeem_safety_code()
 
 
 def update_vault_with_price_safety(
@@ -238,3 +211,216 @@ def safe_to_execute_outside_epsilon(metadata):
             expected = False
 
     return expected
+
+
+# Columnar ("struct of arrays") version of the metadata above. Instead of a tuple per vault addressed by index, there
+# is one array per field across all vaults, and the weight, epsilon and price safety passes are evaluated on whole
+# columns at once. Numeric columns are object arrays of D (or the ints the tuple version would have held), so the
+# arithmetic is exactly the same as in the tuple version.
+
+
+def _object_array(values) -> np.ndarray:
+    result = np.empty(len(values), dtype=object)
+    result[:] = list(values)
+    return result
+
+
+@dataclass
+class VaultMetadataColumns:
+    """Per-vault metadata, one array per field. Same fields as the entries of `build_metadata()[0]`."""
+
+    vaults: List[Any]
+    ideal_weights: np.ndarray
+    current_weights: np.ndarray
+    resulting_weights: np.ndarray
+    prices: np.ndarray
+    all_stablecoins_on_peg: np.ndarray
+    at_least_one_price_large_enough: np.ndarray
+    within_epsilon: np.ndarray
+
+    def __len__(self):
+        return len(self.vaults)
+
+    @classmethod
+    def from_tuples(cls, vaults_metadata) -> "VaultMetadataColumns":
+        columns = list(zip(*vaults_metadata)) if vaults_metadata else [()] * 8
+        return cls(
+            list(columns[0]),
+            _object_array(columns[1]),
+            _object_array(columns[2]),
+            _object_array(columns[3]),
+            _object_array(columns[4]),
+            np.array(columns[5], dtype=bool),
+            np.array(columns[6], dtype=bool),
+            np.array(columns[7], dtype=bool),
+        )
+
+    def to_tuples(self) -> List[Tuple]:
+        return list(
+            zip(
+                self.vaults,
+                self.ideal_weights,
+                self.current_weights,
+                self.resulting_weights,
+                self.prices,
+                self.all_stablecoins_on_peg.tolist(),
+                self.at_least_one_price_large_enough.tolist(),
+                self.within_epsilon.tolist(),
+            )
+        )
+
+
+@dataclass
+class ReserveMetadata:
+    """Columnar equivalent of the tuple returned by `build_metadata()`."""
+
+    vaults: VaultMetadataColumns
+    all_vaults_within_epsilon: bool = False
+    all_stablecoins_all_vaults_on_peg: bool = False
+    all_vaults_using_large_enough_prices: bool = False
+    mint: bool = False
+
+    @classmethod
+    def from_order(cls, order: List[Tuple], tokens) -> "ReserveMetadata":
+        """Same as `build_metadata()`."""
+        vaults_with_amount, mint = order[0], order[1]
+        n = len(vaults_with_amount)
+        balances = _object_array([D(v[0][5]) for v in vaults_with_amount])
+        amounts = _object_array([D(v[1]) for v in vaults_with_amount])
+        prices = _object_array([D(v[0][1]) for v in vaults_with_amount])
+
+        resulting_amounts = balances + amounts if mint else balances - amounts
+        weights, _ = calculate_weights_and_total_columns(resulting_amounts, prices)
+        if len(weights) == 0:
+            weights = _object_array([D("0")] * n)
+        resulting_weights = _object_array([scale(w) for w in weights])
+
+        vaults = VaultMetadataColumns(
+            list(tokens[:n]),
+            _object_array([v[0][7] for v in vaults_with_amount]),
+            _object_array([v[0][6] for v in vaults_with_amount]),
+            resulting_weights,
+            _object_array([v[0][3] for v in vaults_with_amount]),
+            np.zeros(n, dtype=bool),
+            np.zeros(n, dtype=bool),
+            np.zeros(n, dtype=bool),
+        )
+        return cls(vaults, mint=mint)
+
+    @classmethod
+    def from_tuple(cls, metadata) -> "ReserveMetadata":
+        return cls(VaultMetadataColumns.from_tuples(metadata[0]), *metadata[1:5])
+
+    def to_tuple(self) -> Tuple:
+        return (
+            self.vaults.to_tuples(),
+            self.all_vaults_within_epsilon,
+            self.all_stablecoins_all_vaults_on_peg,
+            self.all_vaults_using_large_enough_prices,
+            self.mint,
+        )
+
+    def update_epsilon_status(self):
+        """Same as `update_metadata_with_epsilon_status()`, in place."""
+        ideal = self.vaults.ideal_weights
+        scaled_epsilon = (
+            _object_array([D(w) for w in ideal])
+            * constants.MAX_ALLOWED_VAULT_DEVIATION
+            / scale("1")
+        )
+        within = np.abs(ideal - self.vaults.resulting_weights) <= scaled_epsilon
+        self.vaults.within_epsilon = within.astype(bool)
+        self.all_vaults_within_epsilon = bool(self.vaults.within_epsilon.all())
+
+    def update_price_safety(self, price_oracle, asset_registry):
+        """Same as `update_metadata_with_price_safety()`, in place.
+
+        Prices and stable flags are fetched for all tokens of all vaults first and then checked in one pass.
+        """
+        vault_index, token_prices, is_stable = [], [], []
+        for i, tokens in enumerate(self.vaults.vaults):
+            for token in tokens:
+                vault_index.append(i)
+                token_prices.append(price_oracle.getPriceUSD(token))
+                is_stable.append(bool(asset_registry.isAssetStable(token)))
+        self.set_token_prices(
+            np.array(vault_index, dtype=int),
+            _object_array(token_prices),
+            np.array(is_stable, dtype=bool),
+        )
+
+    def set_token_prices(
+        self, vault_index: np.ndarray, token_prices: np.ndarray, is_stable: np.ndarray
+    ):
+        """Price safety pass given flat arrays over all tokens of all vaults. `vault_index[j]` is the vault of
+        token j."""
+        n = len(self.vaults)
+        if len(token_prices) > 0:
+            off_peg = is_stable & (
+                np.abs(token_prices - D(STABLECOIN_IDEAL_PRICE))
+                > constants.STABLECOIN_MAX_DEVIATION
+            ).astype(bool)
+            large_enough = is_stable | (
+                token_prices >= constants.MIN_TOKEN_PRICE
+            ).astype(bool)
+        else:
+            off_peg = large_enough = np.zeros(0, dtype=bool)
+
+        any_off_peg = np.zeros(n, dtype=bool)
+        any_large_enough = np.zeros(n, dtype=bool)
+        np.logical_or.at(any_off_peg, vault_index, off_peg)
+        np.logical_or.at(any_large_enough, vault_index, large_enough)
+
+        self.vaults.all_stablecoins_on_peg = ~any_off_peg
+        self.vaults.at_least_one_price_large_enough = any_large_enough
+        self.all_stablecoins_all_vaults_on_peg = bool((~any_off_peg).all())
+        self.all_vaults_using_large_enough_prices = bool(any_large_enough.all())
+
+    def vault_weight_off_peg_falls(self) -> bool:
+        """Same as `vault_weight_off_peg_falls()`."""
+        v = self.vaults
+        falls = (v.resulting_weights < v.current_weights).astype(bool)
+        return bool((v.all_stablecoins_on_peg | falls).all())
+
+    def safe_to_execute_outside_epsilon(self) -> bool:
+        """Same as `safe_to_execute_outside_epsilon()`."""
+        v = self.vaults
+        resulting_to_ideal = np.abs(v.resulting_weights - v.ideal_weights)
+        current_to_ideal = np.abs(v.current_weights - v.ideal_weights)
+        closer = (resulting_to_ideal < current_to_ideal).astype(bool)
+        return bool((v.within_epsilon | closer).all())
+
+    def mint_safety_code(self) -> str:
+        if not self.all_vaults_using_large_enough_prices:
+            return "55"
+        if self.all_vaults_within_epsilon:
+            if (
+                self.all_stablecoins_all_vaults_on_peg
+                or self.vault_weight_off_peg_falls()
+            ):
+                return ""
+        elif (
+            self.safe_to_execute_outside_epsilon() and self.vault_weight_off_peg_falls()
+        ):
+            return ""
+        return "52"
+
+    def redeem_safety_code(self) -> str:
+        if not self.all_vaults_using_large_enough_prices:
+            return "55"
+        if self.all_vaults_within_epsilon or self.safe_to_execute_outside_epsilon():
+            return ""
+        return "53"
+
+
+def calculate_weights_and_total_columns(
+    amounts: np.ndarray, prices: np.ndarray
+) -> Tuple[np.ndarray, D]:
+    """Same as `calculate_weights_and_total()` on object arrays."""
+    values = amounts * prices
+    total = 0
+    for value in values:
+        total += value
+    if total == 0:
+        return _object_array([]), total
+    return values / total, total
@@ -0,0 +1,153 @@
+"""Offline mirror of `ReserveManager.getReserveState()`.
+
+Computes the reserve USD value, current weights and target weights from a snapshot of the vault registry without a
+chain, with the same rounding as the contract (FixedPoint mulDown / divDown / divUp, DecimalScale.scaleFrom,
+VaultMetadataExtension.scheduleWeight and the clamp of the sum of target weights to ONE). All columns are NumPy object
+arrays of Python ints (uint256 values don't fit into int64), so one call handles thousands of vaults without a
+per-vault Python loop in this module.
+
+Overflow checks of the contract are not reproduced; inputs are assumed to be in the range where the contract doesn't
+revert. A zero priceAtCalibration raises ZeroDivisionError where the contract reverts with ZERO_DIVISION.
+"""
+
+from typing import NamedTuple, Sequence
+
+import numpy as np
+
+from tests.support.types import PersistedVaultMetadata
+
+ONE = 10**18
+DECIMALS = 18
+
+
+def _int_array(values) -> np.ndarray:
+    result = np.empty(len(values), dtype=object)
+    result[:] = [int(v) for v in values]
+    return result
+
+
+def mul_down(a, b):
+    return a * b // ONE
+
+
+def div_down(a, b):
+    return a * ONE // b
+
+
+def div_up(a, b):
+    """Elementwise FixedPoint.divUp. `b` must not be zero."""
+    a_inflated = a * ONE
+    return np.where(a_inflated == 0, 0, (a_inflated - 1) // b + 1)
+
+
+class VaultSnapshot(NamedTuple):
+    """One vault as read by getReserveState(). `price` is what the root price oracle returns for the vault."""
+
+    reserve_balance: int
+    decimals: int
+    price: int
+    persisted_metadata: PersistedVaultMetadata
+
+
+class ReserveSnapshot(NamedTuple):
+    """Columnar snapshot of all vaults, one array per field."""
+
+    reserve_balances: np.ndarray
+    decimals: np.ndarray
+    prices: np.ndarray
+    prices_at_calibration: np.ndarray
+    weights_at_calibration: np.ndarray
+    weights_at_previous_calibration: np.ndarray
+    times_of_calibration: np.ndarray
+    weight_transition_durations: np.ndarray
+
+    @classmethod
+    def from_vaults(cls, vaults: Sequence[VaultSnapshot]) -> "ReserveSnapshot":
+        metadata = [v.persisted_metadata for v in vaults]
+        return cls(
+            _int_array([v.reserve_balance for v in vaults]),
+            _int_array([v.decimals for v in vaults]),
+            _int_array([v.price for v in vaults]),
+            _int_array([m.price_at_calibration for m in metadata]),
+            _int_array([m.weight_at_calibration for m in metadata]),
+            _int_array([m.weight_at_previous_calibration for m in metadata]),
+            _int_array([m.time_of_calibration for m in metadata]),
+            _int_array([m.weight_transition_duration for m in metadata]),
+        )
+
+    @property
+    def n_vaults(self) -> int:
+        return len(self.reserve_balances)
+
+
+class ReserveState(NamedTuple):
+    total_usd_value: int
+    usd_values: np.ndarray
+    current_weights: np.ndarray
+    target_weights: np.ndarray
+
+
+def scale_from(values: np.ndarray, decimals: np.ndarray) -> np.ndarray:
+    """Elementwise DecimalScale.scaleFrom()."""
+    scale_up = _int_array([10 ** max(DECIMALS - d, 0) for d in decimals])
+    scale_down = _int_array([10 ** max(d - DECIMALS, 0) for d in decimals])
+    return values * scale_up // scale_down
+
+
+def schedule_weights(snapshot: ReserveSnapshot, timestamp: int) -> np.ndarray:
+    """Elementwise VaultMetadataExtension.scheduleWeight() at block time `timestamp`."""
+    time_since_calibration = timestamp - snapshot.times_of_calibration
+    if snapshot.n_vaults > 0 and (time_since_calibration < 0).any():
+        raise ValueError("calibration time is in the future")
+    durations = snapshot.weight_transition_durations
+    transition_done = (time_since_calibration >= durations).astype(bool)
+    # Durations are only used where the transition isn't done, i.e., where they're positive.
+    multiplier = div_down(
+        time_since_calibration, np.where(transition_done, 1, durations)
+    )
+    at_calibration = snapshot.weights_at_calibration
+    at_previous = snapshot.weights_at_previous_calibration
+    weight_delta = mul_down(np.abs(at_calibration - at_previous), multiplier)
+    transitioning = np.where(
+        (at_calibration > at_previous).astype(bool),
+        at_previous + weight_delta,
+        at_previous - weight_delta,
+    )
+    return np.where(transition_done, at_calibration, transitioning)
+
+
+def target_weights(weighted_returns: np.ndarray) -> np.ndarray:
+    """Target weights from weighted returns, rounding up and clamping the running total to ONE like the contract.
+
+    The contract caps each weight so that the running total doesn't exceed ONE. The capped running total is therefore
+    min(uncapped running total, ONE), and the weights are its differences."""
+    returns_sum = sum(weighted_returns, 0)
+    if returns_sum == 0:
+        return _int_array([0] * len(weighted_returns))
+    uncapped = div_up(weighted_returns, returns_sum)
+    running_total = np.minimum(np.cumsum(uncapped), ONE)
+    return np.diff(running_total, prepend=0).astype(object)
+
+
+def get_reserve_state(snapshot: ReserveSnapshot, timestamp: int) -> ReserveState:
+    """Same as ReserveManager.getReserveState() for the given snapshot and block time."""
+    if snapshot.n_vaults == 0:
+        empty = _int_array([])
+        return ReserveState(0, empty, empty, empty)
+
+    scaled_balances = scale_from(snapshot.reserve_balances, snapshot.decimals)
+    usd_values = mul_down(snapshot.prices, scaled_balances)
+    total_usd_value = sum(usd_values, 0)
+
+    weights = schedule_weights(snapshot, timestamp)
+    if total_usd_value == 0:
+        current_weights = weights
+    else:
+        current_weights = div_down(usd_values, total_usd_value)
+
+    weighted_returns = mul_down(
+        div_down(snapshot.prices, snapshot.prices_at_calibration), weights
+    )
+    return ReserveState(
+        total_usd_value, usd_values, current_weights, target_weights(weighted_returns)
+    )
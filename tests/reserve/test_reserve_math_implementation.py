@@ -0,0 +1,94 @@
+import hypothesis.strategies as st
+from brownie.test import given
+
+from tests.reserve.reserve_math_implementation import (
+    ReserveMetadata,
+    build_metadata,
+    safe_to_execute_outside_epsilon,
+    update_metadata_with_epsilon_status,
+    update_metadata_with_price_safety,
+    vault_weight_off_peg_falls,
+)
+from tests.support import constants
+from tests.support.utils import scale
+
+amount_generator = st.integers(
+    min_value=int(scale("0.001")), max_value=int(scale(1_000_000))
+)
+weight_generator = st.integers(min_value=int(scale("0.001")), max_value=int(scale(1)))
+token_price_generator = st.one_of(
+    st.integers(min_value=int(scale("0.9")), max_value=int(scale("1.1"))),
+    st.integers(min_value=0, max_value=int(scale("1e-4"))),
+)
+
+TOKENS = ["dai", "usdc", "abc", "sdt"]
+STABLE_TOKENS = {"dai", "usdc"}
+
+
+class PriceOracle:
+    def __init__(self, prices):
+        self.prices = prices
+
+    def getPriceUSD(self, token):
+        return self.prices[token]
+
+
+class AssetRegistry:
+    def isAssetStable(self, token):
+        return token in STABLE_TOKENS
+
+
+vaults_generator = st.lists(
+    st.tuples(
+        amount_generator,
+        amount_generator,
+        amount_generator,
+        weight_generator,
+        weight_generator,
+        st.lists(st.sampled_from(TOKENS), max_size=2),
+    ),
+    min_size=1,
+    max_size=constants.RESERVE_VAULTS,
+)
+
+
+def _order_and_tokens(vaults, mint):
+    vaults_with_amount, tokens = [], []
+    for price, balance, amount, current_weight, target_weight, vault_tokens in vaults:
+        if not mint:
+            amount = min(amount, balance)
+        vault_info = (None, price, None, price, None, balance, current_weight)
+        vaults_with_amount.append((vault_info + (target_weight,), amount))
+        tokens.append(vault_tokens)
+    return (vaults_with_amount, mint), tokens
+
+
+def _as_tuple(metadata):
+    return ([tuple(v) for v in metadata[0]], *metadata[1:])
+
+
+@given(
+    vaults=vaults_generator,
+    mint=st.booleans(),
+    token_prices=st.tuples(*[token_price_generator] * len(TOKENS)),
+)
+def test_columns_match_tuples(vaults, mint, token_prices):
+    order, tokens = _order_and_tokens(vaults, mint)
+    price_oracle = PriceOracle(dict(zip(TOKENS, token_prices)))
+    asset_registry = AssetRegistry()
+
+    metadata = build_metadata(order, tokens)
+    columns = ReserveMetadata.from_order(order, tokens)
+    assert columns.to_tuple() == _as_tuple(metadata)
+
+    metadata = update_metadata_with_price_safety(metadata, price_oracle, asset_registry)
+    metadata = update_metadata_with_epsilon_status(metadata)
+    columns.update_price_safety(price_oracle, asset_registry)
+    columns.update_epsilon_status()
+
+    assert columns.to_tuple() == _as_tuple(metadata)
+    assert columns.vault_weight_off_peg_falls() == vault_weight_off_peg_falls(metadata)
+    assert columns.safe_to_execute_outside_epsilon() == (
+        safe_to_execute_outside_epsilon(metadata)
+    )
+    assert ReserveMetadata.from_tuple(metadata).to_tuple() == columns.to_tuple()
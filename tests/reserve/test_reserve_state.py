@@ -0,0 +1,169 @@
+import hypothesis.strategies as st
+import pytest
+from brownie.test import given
+
+from tests.reserve.reserve_state import (
+    ONE,
+    ReserveSnapshot,
+    VaultSnapshot,
+    get_reserve_state,
+)
+from tests.support.types import PersistedVaultMetadata
+
+TIMESTAMP = 1_700_000_000
+
+
+def _mul_down(a, b):
+    return a * b // ONE
+
+
+def _div_down(a, b):
+    assert b != 0
+    return 0 if a == 0 else a * ONE // b
+
+
+def _div_up(a, b):
+    assert b != 0
+    return 0 if a == 0 else (a * ONE - 1) // b + 1
+
+
+def _schedule_weight(metadata: PersistedVaultMetadata, timestamp: int) -> int:
+    time_since_calibration = timestamp - metadata.time_of_calibration
+    if time_since_calibration >= metadata.weight_transition_duration:
+        return metadata.weight_at_calibration
+    multiplier = _div_down(time_since_calibration, metadata.weight_transition_duration)
+    weight_difference = abs(
+        metadata.weight_at_calibration - metadata.weight_at_previous_calibration
+    )
+    weight_delta = _mul_down(weight_difference, multiplier)
+    if metadata.weight_at_calibration > metadata.weight_at_previous_calibration:
+        return metadata.weight_at_previous_calibration + weight_delta
+    return metadata.weight_at_previous_calibration - weight_delta
+
+
+def _scale_from(value: int, decimals: int) -> int:
+    if decimals > 18:
+        return value // 10 ** (decimals - 18)
+    return value * 10 ** (18 - decimals)
+
+
+def _reserve_state_loop(vaults, timestamp):
+    """Line-by-line transcription of ReserveManager.getReserveState()."""
+    usd_values = [
+        _mul_down(v.price, _scale_from(v.reserve_balance, v.decimals)) for v in vaults
+    ]
+    total = sum(usd_values)
+    current_weights = [
+        (
+            _schedule_weight(v.persisted_metadata, timestamp)
+            if total == 0
+            else _div_down(usd_value, total)
+        )
+        for v, usd_value in zip(vaults, usd_values)
+    ]
+    weighted_returns = [
+        _mul_down(
+            _div_down(v.price, v.persisted_metadata.price_at_calibration),
+            _schedule_weight(v.persisted_metadata, timestamp),
+        )
+        for v in vaults
+    ]
+    returns_sum = sum(weighted_returns)
+    target_weights = [0] * len(vaults)
+    if returns_sum > 0:
+        total_target_weight = 0
+        for i, weighted_return in enumerate(weighted_returns):
+            target_weight = _div_up(weighted_return, returns_sum)
+            if total_target_weight + target_weight > ONE:
+                target_weight = ONE - total_target_weight
+            target_weights[i] = target_weight
+            total_target_weight += target_weight
+    return total, usd_values, current_weights, target_weights
+
+
+def _check(vaults, timestamp=TIMESTAMP):
+    state = get_reserve_state(ReserveSnapshot.from_vaults(vaults), timestamp)
+    total, usd_values, current_weights, target_weights = _reserve_state_loop(
+        vaults, timestamp
+    )
+    assert state.total_usd_value == total
+    assert list(state.usd_values) == usd_values
+    assert list(state.current_weights) == current_weights
+    assert list(state.target_weights) == target_weights
+    return state
+
+
+def _vault(balance, price, weight, decimals=18, price_at_calibration=ONE, **kwargs):
+    metadata = PersistedVaultMetadata(price_at_calibration, weight, 0, 0, **kwargs)
+    return VaultSnapshot(balance, decimals, price, metadata)
+
+
+def test_target_weights_clamped_to_one():
+    # divUp(1/3) * 3 > ONE, so the last target weight is reduced.
+    vaults = [_vault(ONE, ONE, ONE // 3) for _ in range(3)]
+    state = _check(vaults)
+    assert list(state.target_weights) == [ONE // 3 + 1, ONE // 3 + 1, ONE // 3 - 1]
+    assert sum(state.target_weights) == ONE
+
+
+def test_empty_reserve():
+    vaults = [_vault(0, ONE, ONE // 4), _vault(0, ONE, 3 * ONE // 4, decimals=6)]
+    state = _check(vaults)
+    assert state.total_usd_value == 0
+    assert list(state.current_weights) == [ONE // 4, 3 * ONE // 4]
+    assert len(get_reserve_state(ReserveSnapshot.from_vaults([]), 0).usd_values) == 0
+
+
+def test_weight_transition():
+    vaults = [
+        _vault(
+            ONE,
+            ONE,
+            ONE // 2,
+            weight_at_previous_calibration=ONE,
+            time_of_calibration=TIMESTAMP - 1000,
+        ),
+        _vault(
+            ONE,
+            ONE,
+            ONE // 2,
+            weight_at_previous_calibration=0,
+            time_of_calibration=TIMESTAMP - 1000,
+        ),
+    ]
+    _check(vaults)
+    with pytest.raises(ValueError):
+        get_reserve_state(ReserveSnapshot.from_vaults(vaults), TIMESTAMP - 1001)
+
+
+def test_many_vaults():
+    vaults = [
+        _vault(
+            (i * 7919) % 10**9 * ONE,
+            ONE + i * 10**12,
+            (i * 104729) % ONE,
+            decimals=6 + i % 19,
+            price_at_calibration=ONE + (i % 13) * 10**15,
+            time_of_calibration=TIMESTAMP - i * 97,
+        )
+        for i in range(2_000)
+    ]
+    _check(vaults)
+
+
+vault_generator = st.builds(
+    _vault,
+    balance=st.integers(min_value=0, max_value=10**30),
+    price=st.integers(min_value=0, max_value=10**24),
+    weight=st.integers(min_value=0, max_value=ONE),
+    decimals=st.integers(min_value=0, max_value=30),
+    price_at_calibration=st.integers(min_value=1, max_value=10**24),
+    weight_at_previous_calibration=st.integers(min_value=0, max_value=ONE),
+    time_of_calibration=st.integers(min_value=TIMESTAMP - 10**6, max_value=TIMESTAMP),
+    weight_transition_duration=st.integers(min_value=0, max_value=10**6),
+)
+
+
+@given(vaults=st.lists(vault_generator, min_size=1, max_size=50))
+def test_matches_contract_transcription(vaults):
+    _check(vaults)
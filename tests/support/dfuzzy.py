@@ -2,9 +2,13 @@
 
 from logging import warning
 
-from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_backend import IS_EXACT
+from tests.support.quantized_backend import QuantizedDecimal as D
+from tests.support.quantized_rational import WORKING_DECIMALS
 
-prec_internal = D("1E-12")
+# The exact backend doesn't round intermediate results, but it still approximates roots and non-integer powers to
+# WORKING_DECIMALS decimals. We allow the same margin (a factor 1e6) over that as over the 18 decimals otherwise.
+prec_internal = D(f"1E-{WORKING_DECIMALS - 6}") if IS_EXACT else D("1E-12")
 prec_input = D("1E-8")  # when checking how to behave towards an input
 prec_sanity_check = D(
     "1E-8"
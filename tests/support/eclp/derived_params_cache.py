@@ -0,0 +1,188 @@
+"""Persistent cache of derived ECLP params.
+
+Derived params (tau(alpha), tau(beta)) need square roots, but they only depend on the pool parameters, which are
+fixed for the life of a pool and recur between test runs. This caches them in memory, keyed on the parameter tuple,
+and persists the cache as JSON when the process exits, so that later runs start with the derived params for all
+parameters seen before.
+
+The cache file is `gyd-core/eclp_derived_params.json` in the user cache directory (`$XDG_CACHE_HOME`, by default
+`~/.cache`). Set the environment variable `ECLP_DERIVED_PARAMS_CACHE` to another path, or to the empty string to keep
+the cache in memory only.
+
+Entries are grouped by namespace because different reference implementations compute derived params with slightly
+different formulas (and therefore rounding). Within the file, the namespace is qualified with the number type and a
+fingerprint of the source code that computes the values: the module that defines `compute()`, the module of the number
+type and, recursively, all modules of this repository they use. So backends don't share entries, and any change to the
+formulas or the number types (e.g., how square roots are computed) makes the cache miss instead of returning stale
+values.
+
+Values are stored exactly: as decimal strings for the decimal-backed types and as `numerator/denominator` for types
+with an exact `Fraction` value (`QuantizedRational`).
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import sys
+from fractions import Fraction
+from pathlib import Path
+from types import ModuleType
+from typing import Any, Callable, Dict, Optional, Sequence, Type
+
+REPOSITORY_ROOT = Path(__file__).parents[3]
+
+DEFAULT_PATH = (
+    Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+    / "gyd-core"
+    / "eclp_derived_params.json"
+)
+
+
+def _encode(value):
+    if isinstance(value, (tuple, list)):
+        return [_encode(v) for v in value]
+    exact = getattr(value, "exact", None)
+    if isinstance(exact, Fraction):
+        return f"{exact.numerator}/{exact.denominator}"
+    return str(value)
+
+
+def _decode(value, number_type: Type):
+    if isinstance(value, list):
+        return tuple(_decode(v, number_type) for v in value)
+    if "/" in value:
+        return number_type.from_fraction(Fraction(value))
+    return number_type(value)
+
+
+def _local_modules(module: ModuleType, found: Dict[str, ModuleType]):
+    """Add `module` and, recursively, all modules of this repository it uses to `found` (by file)."""
+    file = getattr(module, "__file__", None)
+    if file is None or file in found:
+        return
+    if REPOSITORY_ROOT.resolve() not in Path(file).resolve().parents:
+        return
+    found[file] = module
+    for value in list(vars(module).values()):
+        if not isinstance(value, ModuleType):
+            value = sys.modules.get(getattr(value, "__module__", None) or "")
+        if value is not None:
+            _local_modules(value, found)
+
+
+_fingerprints: Dict[tuple, str] = {}
+
+
+def source_fingerprint(*modules: ModuleType) -> str:
+    """Hash of the source code of `modules` and all modules of this repository they use."""
+    key = tuple(m.__name__ for m in modules)
+    if key not in _fingerprints:
+        found: Dict[str, ModuleType] = {}
+        for module in modules:
+            _local_modules(module, found)
+        digest = hashlib.sha256()
+        for file in sorted(found):
+            digest.update(Path(file).read_bytes())
+        _fingerprints[key] = digest.hexdigest()[:16]
+    return _fingerprints[key]
+
+
+def _qualified_namespace(
+    namespace: str, compute: Callable[[], Any], number_type: Type
+) -> str:
+    fingerprint = source_fingerprint(
+        sys.modules[compute.__module__], sys.modules[number_type.__module__]
+    )
+    return f"{namespace}:{number_type.__qualname__}:{fingerprint}"
+
+
+class DerivedParamsCache:
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        # Entries as read from the file, i.e., encoded. They're decoded on first use because only the caller knows
+        # the number type.
+        self._file_entries: Optional[Dict[str, Dict[str, Any]]] = None
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._new_entries: Dict[str, Dict[str, Any]] = {}
+
+    def _read_file(self) -> Dict[str, Dict[str, Any]]:
+        if self.path is None:
+            return {}
+        try:
+            with open(self.path) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            # Missing or corrupt. Not a problem, we'll recompute.
+            return {}
+
+    def _lookup(self, namespace: str, key: str, number_type: Type):
+        entries = self._entries.setdefault(namespace, {})
+        if key in entries:
+            return entries[key]
+        if self._file_entries is None:
+            self._file_entries = self._read_file()
+        encoded = self._file_entries.get(namespace, {}).get(key)
+        if encoded is None:
+            return None
+        value = entries[key] = _decode(encoded, number_type)
+        return value
+
+    def get(
+        self,
+        namespace: str,
+        params: Sequence,
+        compute: Callable[[], Any],
+        number_type: Type,
+    ):
+        """Derived params for `params` in `namespace`, calling `compute()` if they're not cached yet.
+
+        `compute()` must return a `number_type` or (nested) tuple of `number_type`."""
+        namespace = _qualified_namespace(namespace, compute, number_type)
+        key = ",".join(_encode(p) for p in params)
+        value = self._lookup(namespace, key, number_type)
+        if value is not None:
+            self.hits += 1
+            return value
+        self.misses += 1
+        entries = self._entries[namespace]
+        value = entries[key] = compute()
+        self._new_entries.setdefault(namespace, {})[key] = value
+        return value
+
+    def save(self):
+        """Write new entries to disk, merging with entries written concurrently by other processes."""
+        if self.path is None or not self._new_entries:
+            return
+        data = self._read_file()
+        for namespace, entries in self._new_entries.items():
+            data.setdefault(namespace, {}).update(
+                {key: _encode(value) for key, value in entries.items()}
+            )
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+        self._new_entries = {}
+
+    def clear(self):
+        """Clear the in-memory cache. Doesn't touch the file."""
+        self._file_entries = {}
+        self._entries = {}
+        self._new_entries = {}
+        self.hits = 0
+        self.misses = 0
+
+
+def _default_path() -> Optional[Path]:
+    path = os.environ.get("ECLP_DERIVED_PARAMS_CACHE")
+    if path is None:
+        return DEFAULT_PATH
+    return Path(path) if path else None
+
+
+DERIVED_PARAMS_CACHE = DerivedParamsCache(_default_path())
+atexit.register(DERIVED_PARAMS_CACHE.save)
@@ -16,6 +16,7 @@ from tests.support.eclp.dfuzzy import (
     sqrt,
     prec_input,
 )
+from tests.support.eclp.derived_params_cache import DERIVED_PARAMS_CACHE
 
 Vector = tuple[
     D, D
@@ -100,14 +101,24 @@ class Params:
 
     # The following two are somewhat expensive to compute and we may therefore want to cache them in the solidity
     # implementation, too. A comparison should be done though.
+    # Here, they're shared between instances and test runs via the derived params cache.
+
+    @cached_property
+    def _tau_alpha_beta(self) -> tuple[Vector, Vector]:
+        return DERIVED_PARAMS_CACHE.get(
+            "mimpl",
+            (self.alpha, self.beta, self.rx, self.ry, self.l),
+            lambda: (self.tau(self.alpha), self.tau(self.beta)),
+            D,
+        )
 
     @cached_property
     def tau_alpha(self) -> Vector:
-        return self.tau(self.alpha)
+        return self._tau_alpha_beta[0]
 
     @cached_property
     def tau_beta(self) -> Vector:
-        return self.tau(self.beta)
+        return self._tau_alpha_beta[1]
 
     def Ainv_times(self, x: D, y: D) -> Vector:
         """A^{-1} . (x, y), where '.' is matrix-vector multiplication and A is the transformation matrix."""
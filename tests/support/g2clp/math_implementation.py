@@ -2,7 +2,7 @@ from operator import add, sub
 from typing import Iterable
 
 import pytest
-from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_backend import QuantizedDecimal as D
 
 _MAX_IN_RATIO = D("0.3")
 _MAX_OUT_RATIO = D("0.3")
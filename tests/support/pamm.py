@@ -1,10 +1,12 @@
+from bisect import bisect_left
 from dataclasses import dataclass
+from decimal import Decimal
 from enum import Enum
-from functools import cached_property
-from typing import Optional, Tuple, Union
+from functools import cached_property, lru_cache
+from typing import Iterable, Iterator, NamedTuple, Optional, Tuple, Union
 
 from tests.support.dfuzzy import isge, isle, prec_input, sqrt
-from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_backend import QuantizedDecimal as D
 
 
 class Region(Enum):
@@ -52,12 +54,31 @@ _pieces2region_rules = [
 ]
 
 
+# Max number of distinct (alpha_bar, xu_bar, theta_bar) triples for which derived params are kept, see
+# `_derive_params()`.
+PARAMS_CACHE_SIZE = 1024
+
+
 @dataclass
 class Params:
+    """The derived thresholds below are shared between all instances with the same (alpha_bar, xu_bar, theta_bar), so
+    constructing `Params` repeatedly (e.g., once per hypothesis example) only derives them once. Don't mutate the
+    fields of an instance after construction."""
+
     decay_slope_lower_bound: D = D("0.6")  # ᾱ
     stable_redeem_threshold_upper_bound: D = D("0.3")  # x̄_U
     target_reserve_ratio_floor: D = D("0.6")  # θ̄
 
+    def __post_init__(self):
+        # Pre-populate the cached properties below.
+        self.__dict__.update(
+            _derive_params(
+                self.decay_slope_lower_bound,
+                self.stable_redeem_threshold_upper_bound,
+                self.target_reserve_ratio_floor,
+            )
+        )
+
     @cached_property
     def target_utilization_ceiling(self):
         return 1 - self.target_reserve_ratio_floor
@@ -132,6 +153,34 @@ class Params:
             self.ba_threshold_III_hl, D(1), self.slope_threshold_III_HL, D(0)
         )
 
+    @cached_property
+    def region_index(self) -> "RegionIndex":
+        return RegionIndex(self)
+
+
+_DERIVED_PARAMS = [
+    name for name, value in vars(Params).items() if isinstance(value, cached_property)
+]
+
+
+# typed=True so that the different QuantizedDecimal backends don't share entries.
+@lru_cache(maxsize=PARAMS_CACHE_SIZE, typed=True)
+def _derive_params(alpha_bar: D, xu_bar: D, theta_bar: D) -> dict:
+    params = object.__new__(Params)  # Bypass __post_init__()
+    params.decay_slope_lower_bound = alpha_bar
+    params.stable_redeem_threshold_upper_bound = xu_bar
+    params.target_reserve_ratio_floor = theta_bar
+    return {name: getattr(params, name) for name in _DERIVED_PARAMS}
+
+
+def params_cache_info():
+    """Hit/miss counters of the shared derived params cache."""
+    return _derive_params.cache_info()
+
+
+def clear_params_cache():
+    _derive_params.cache_clear()
+
 
 def compute_relative_reserve_for_xu(
     xu: D, ya: D, params: Params, alpha: Optional[D] = None
@@ -317,6 +366,141 @@ def compute_price(x: D, ba: D, ya: D, params: Params) -> D:
         return D(1) - alpha * (xl - xu)
 
 
+class RegionIndex:
+    """Lookup of the case (I, II h/l, III H/L) of a normalized state (ya = 1).
+
+    The boundaries between the cases are the fixed reserve curves through the threshold anchors in `Params`. We store
+    the breakpoints (xu and xl of all curves) in sorted order and, for each interval between breakpoints, which piece
+    of each curve applies there together with its coefficients. A lookup is a bisect over the breakpoints and then the
+    same sequence of boundary checks as `Pamm._compute_normalized_case_by_checks()`.
+
+    Each boundary is first evaluated in floating point, which is an order of magnitude cheaper than in D. Only if the
+    reserve is within `FLOAT_TOLERANCE` of the float value, we evaluate the boundary in D with the same operations as
+    `compute_fixed_reserve()`. So this gives the same result as the chain of checks, and a lookup needs at most one
+    evaluation in D unless the reserve is close to where several boundaries coincide. We can't binary search over the
+    curves, or check them top to bottom: they coincide mathematically on their last piece, where rounding errors can
+    flip their order.
+    """
+
+    # Float evaluation errors are ~1e-16 relative to the (normalized, order 1) values, and D evaluation errors ~1e-18.
+    FLOAT_TOLERANCE = 1e-12
+
+    def __init__(self, params: Params):
+        alpha_min = params.decay_slope_lower_bound
+        # (ba, alpha, xu, xl) of the boundaries of case I, case II and, if they exist, of the subcases II h and III H.
+        curves = [
+            (
+                params.ba_threshold_region_I,
+                alpha_min,
+                params.stable_redeem_threshold_upper_bound,
+                params.xl_threshold_at_threshold_I,
+            ),
+            (
+                params.ba_threshold_region_II,
+                alpha_min,
+                D(0),
+                params.xl_threshold_at_threshold_II,
+            ),
+        ]
+        self._second_subcase = (
+            "H" if params.ba_threshold_II_hl <= params.ba_threshold_region_II else "L"
+        )
+        # Check if case l or h, respectively, even exist. See `Pamm._is_in_second_subcase()`.
+        self._curve_II_H = self._curve_III_H = None
+        if (
+            params.ba_threshold_region_II
+            < params.ba_threshold_II_hl
+            < params.ba_threshold_region_I
+        ):
+            self._curve_II_H = len(curves)
+            curves.append(
+                (
+                    params.ba_threshold_II_hl,
+                    alpha_min,
+                    params.xu_threshold_II_hl,
+                    params.xl_threshold_II_hl,
+                )
+            )
+        if params.ba_threshold_III_hl < params.ba_threshold_region_II:
+            self._curve_III_H = len(curves)
+            curves.append(
+                (
+                    params.ba_threshold_III_hl,
+                    params.slope_threshold_III_HL,
+                    D(0),
+                    params.xl_threshold_III_HL,
+                )
+            )
+
+        self.breakpoints = sorted({v for c in curves for v in c[2:]})
+        # One entry per interval (.., breakpoints[0]], (breakpoints[0], breakpoints[1]], ..., (breakpoints[-1], ..)
+        self.pieces = [
+            [self._piece(c, upper) for c in curves]
+            for upper in self.breakpoints + [None]
+        ]
+        # Float versions of the above. Near a breakpoint, the float bisect may pick the neighboring interval. That's
+        # fine because the curves are continuous, and we bisect over the exact breakpoints before evaluating in D.
+        self._float_breakpoints = [float(v) for v in self.breakpoints]
+        self._float_pieces = [
+            [(piece[0], *map(float, piece[1:])) for piece in pieces]
+            for pieces in self.pieces
+        ]
+
+    @staticmethod
+    def _piece(curve, upper: Optional[D]):
+        """Piece of `curve` on the interval with upper end `upper` (None = unbounded) and its coefficients."""
+        ba, alpha, xu, xl = curve
+        if upper is not None and upper <= xu:
+            return 0, ba
+        if upper is not None and upper <= xl:
+            return 1, ba, alpha / 2, xu
+        return 2, 1 - alpha * (xl - xu)
+
+    @staticmethod
+    def _evaluate(piece, x: D) -> D:
+        if piece[0] == 0:
+            return piece[1] - x
+        if piece[0] == 1:
+            _, ba, half_alpha, xu = piece
+            return ba - x + half_alpha * (x - xu) ** 2
+        return piece[1] * (D(1) - x)
+
+    @staticmethod
+    def _evaluate_float(piece, x: float) -> float:
+        if piece[0] == 0:
+            return piece[1] - x
+        if piece[0] == 1:
+            _, ba, half_alpha, xu = piece
+            return ba - x + half_alpha * (x - xu) ** 2
+        return piece[1] * (1.0 - x)
+
+    def lookup(
+        self, scaled_reserve: D, scaled_redemption: D
+    ) -> Tuple[str, Optional[str]]:
+        reserve, redemption = float(scaled_reserve), float(scaled_redemption)
+        tolerance = self.FLOAT_TOLERANCE * max(1.0, abs(reserve))
+        float_pieces = self._float_pieces[
+            bisect_left(self._float_breakpoints, redemption)
+        ]
+
+        def is_above(curve: int) -> bool:
+            margin = reserve - self._evaluate_float(float_pieces[curve], redemption)
+            if abs(margin) > tolerance:
+                return margin > 0
+            pieces = self.pieces[bisect_left(self.breakpoints, scaled_redemption)]
+            return scaled_reserve >= self._evaluate(pieces[curve], scaled_redemption)
+
+        if is_above(0):
+            return "I", None
+        if is_above(1):
+            if self._curve_II_H is not None and is_above(self._curve_II_H):
+                return "II", "H"
+            return "II", self._second_subcase
+        if self._curve_III_H is not None and is_above(self._curve_III_H):
+            return "III", "H"
+        return "III", "L"
+
+
 class Pamm:
     def __init__(self, params: Params):
         self.params = params
@@ -451,8 +635,7 @@ class Pamm:
 
         if region == Region.CASE_III_H:
             delta = (scaled_supply - scaled_reserve) / (
-                1
-                - (scaled_redemption**2)  # exploit that the scaled value of ya is 1.
+                1 - (scaled_redemption**2)  # exploit that the scaled value of ya is 1.
             )
             return one - delta
 
@@ -499,34 +682,48 @@ class Pamm:
         theta_floor = self.params.target_reserve_ratio_floor
         theta = self.params.target_utilization_ceiling
 
-        # todo maybe should some of these be replaced by fuzzy comparison to improve numerical stability?
-        if self._is_in_first_region(scaled_reserve, scaled_redemption):
-            # case I
+        case = self.params.region_index.lookup(scaled_reserve, scaled_redemption)
+
+        if case == ("I", None):
             if scaled_redemption <= xu_max:
                 return Region.CASE_i
             if reserve_ratio <= 1 - alpha_min * (scaled_redemption - xu_max):
                 return Region.CASE_I_ii
             return Region.CASE_I_iii
 
-        if self._is_in_second_region(scaled_reserve, scaled_redemption):
-            # case II
-            if self._is_in_second_subcase(scaled_reserve, scaled_redemption):
-                # case h
-                if scaled_supply - scaled_reserve <= alpha_min / 2 * scaled_supply**2:
-                    return Region.CASE_i
-                return Region.CASE_II_H
+        if case == ("II", "H"):
+            if scaled_supply - scaled_reserve <= alpha_min / 2 * scaled_supply**2:
+                return Region.CASE_i
+            return Region.CASE_II_H
 
+        if case == ("II", "L"):
             if scaled_reserve - theta_floor * scaled_supply >= theta**2 / (
                 2 * alpha_min
             ):
                 return Region.CASE_i
             return Region.CASE_II_L
 
-        if self._is_in_high_subcase(scaled_reserve, scaled_redemption):
+        if case == ("III", "H"):
             return Region.CASE_III_H
 
         return Region.CASE_III_L
 
+    def _compute_normalized_case_by_checks(
+        self, scaled_reserve: D, scaled_redemption: D
+    ) -> Tuple[str, str]:
+        """Case (I, II h/l or III H/L) via the chain of boundary checks, like PrimaryAMMV1. Same result as
+        `params.region_index.lookup()`, which is what we use."""
+        # todo maybe should some of these be replaced by fuzzy comparison to improve numerical stability?
+        if self._is_in_first_region(scaled_reserve, scaled_redemption):
+            return "I", None
+        if self._is_in_second_region(scaled_reserve, scaled_redemption):
+            if self._is_in_second_subcase(scaled_reserve, scaled_redemption):
+                return "II", "H"
+            return "II", "L"
+        if self._is_in_high_subcase(scaled_reserve, scaled_redemption):
+            return "III", "H"
+        return "III", "L"
+
     def _compute_current_region_ext(self):
         """Extended reconstructed region. For testing only."""
         reserve_ratio = self.reserve_value / self.total_gyro_supply
@@ -550,3 +747,103 @@ class Pamm:
         self.redemption_level = redemption_level
         self.reserve_value = reserve_value
         self.total_gyro_supply = total_gyro_supply
+
+
+# Bound on the per-step difference between `PammSimulator` and `Pamm` results, see `PammSimulator`.
+SIMULATOR_STEP_ERROR = Decimal("1E-16")
+
+
+class _Anchor(NamedTuple):
+    ba: D
+    ya: D
+    alpha: D
+    xu: D
+    xl: D
+    piece: int  # 0, 1, 2 for region i, ii, iii of the redemption level the anchor was computed at
+
+
+class PammSimulator(Pamm):
+    """`Pamm` for long redemption paths.
+
+    Redemptions don't move the anchor point (ba, ya), so we reconstruct it only once and then evaluate the fixed
+    reserve curve directly for each redemption, which is O(1). The anchor is reconstructed again only when the
+    redemption level crosses xu or xl (i.e., the region changes) or when the state is changed from outside.
+
+    Results don't agree exactly with `Pamm`, and the difference grows with the length of the path: `Pamm` reconstructs
+    the anchor from the rounded state on every step, so its anchor moves by up to one reconstruction error per step
+    (~1e-17 in the 18-decimal backends), while ours stays fixed. The result of the k-th redemption (counting from 1)
+    is within k * SIMULATOR_STEP_ERROR of `Pamm` as long as the supply stays positive.
+    """
+
+    def __init__(self, params: Params):
+        super().__init__(params)
+        self._anchor: Optional[_Anchor] = None
+        self.anchor_computations = 0
+
+    def update_state(self, redemption_level: D, reserve_value: D, total_gyro_supply: D):
+        super().update_state(redemption_level, reserve_value, total_gyro_supply)
+        self._anchor = None
+
+    @staticmethod
+    def _piece(x: D, xu: D, xl: D) -> int:
+        if x <= xu:
+            return 0
+        if x <= xl:
+            return 1
+        return 2
+
+    def _compute_anchor(self) -> Optional[_Anchor]:
+        self.anchor_computations += 1
+        ya = self.total_gyro_supply + self.redemption_level
+        ba = self._compute_normalized_anchor_reserve_value() * ya
+        ra = ba / ya
+        if ra > 1 or ra <= self.params.target_reserve_ratio_floor:
+            # Not on the curve. Can only happen due to rounding errors at the edges; don't cache.
+            return None
+        alpha = compute_slope(
+            ba,
+            ya,
+            self.params.target_reserve_ratio_floor,
+            self.params.decay_slope_lower_bound,
+        )
+        xu = compute_upper_redemption_threshold(
+            ba,
+            ya,
+            alpha,
+            self.params.stable_redeem_threshold_upper_bound,
+            self.params.target_utilization_ceiling,
+        )
+        xl = compute_lower_redemption_threshold(ba, ya, alpha, xu)
+        piece = self._piece(self.redemption_level, xu, xl)
+        return _Anchor(ba, ya, alpha, xu, xl, piece)
+
+    def compute_redeem_amount(self, amount: D) -> D:
+        reserve_ratio = self.reserve_value / self.total_gyro_supply
+        if reserve_ratio >= 1 or isle(
+            reserve_ratio, self.params.target_reserve_ratio_floor, prec_input
+        ):
+            self._anchor = None
+            return super().compute_redeem_amount(amount)
+
+        anchor = self._anchor
+        if anchor is None or anchor.piece != self._piece(
+            self.redemption_level, anchor.xu, anchor.xl
+        ):
+            anchor = self._anchor = self._compute_anchor()
+            if anchor is None:
+                return super().compute_redeem_amount(amount)
+
+        next_reserve_value = compute_fixed_reserve(
+            self.redemption_level + amount,
+            anchor.ba,
+            anchor.ya,
+            anchor.alpha,
+            anchor.xu,
+            anchor.xl,
+        )
+        return self.reserve_value - next_reserve_value
+
+    def redeem_stream(self, amounts: Iterable[D]) -> Iterator[D]:
+        """Redeem `amounts` one after the other, yielding the redeem amount for each."""
+        for amount in amounts:
+            yield self.redeem(amount)
@@ -0,0 +1,432 @@
+"""Batched evaluation of the PAMM reference model in `tests.support.pamm`.
+
+All functions here take and return NumPy object arrays of *scaled* Python ints (value * 10^18, i.e., the same
+representation as the uint256 values of `TestingPAMMV1`). Every step rounds exactly like the scalar implementation in
+`pamm.py` on QuantizedDecimal, so results are bit-identical to evaluating the scalar functions point by point, but the
+per-point Python loop and QuantizedDecimal overhead are gone.
+
+Use `to_scaled_array()` to convert sequences of D / Decimal / str values and `from_scaled_array()` to convert back.
+"""
+
+import math
+from logging import warning
+from typing import Dict, List, NamedTuple, Sequence, Tuple, Union
+
+import numpy as np
+
+from tests.support import dfuzzy
+from tests.support.pamm import Params, Region
+from tests.support.quantized_backend import QuantizedDecimal as D
+
+ONE = 10**18
+
+_isqrt = np.frompyfunc(math.isqrt, 1, 1)
+
+
+class BatchResult(NamedTuple):
+    reserves: np.ndarray
+    prices: np.ndarray
+    regions: np.ndarray  # Region values, see `pamm.Region`
+
+
+def scaled(value) -> int:
+    """Scaled int representation of a single D-like value."""
+    return int(D(value).raw.scaleb(18))
+
+
+def to_scaled_array(values) -> np.ndarray:
+    """Convert a sequence of D-like values to an object array of scaled ints.
+
+    Object arrays (e.g., outputs of the functions in this module) are returned as is."""
+    if isinstance(values, np.ndarray) and values.dtype == object:
+        return values
+    return np.array([scaled(v) for v in values], dtype=object)
+
+
+def from_scaled_array(values: np.ndarray) -> list:
+    return [D(v) / ONE for v in values]
+
+
+# Elementwise fixed-point helpers. These mirror the QuantizedDecimal operators, i.e., they round towards zero.
+
+
+def _div_int(a, b):
+    # Works on both object arrays and plain ints (for precomputed scalars), so no np.where() here.
+    q = a // b
+    return q + ((q < 0) & (q * b != a))
+
+
+def _mul(a, b):
+    return _div_int(a * b, ONE)
+
+
+def _div(a, b):
+    return _div_int(a * ONE, b)
+
+
+def _sq(a):
+    return _mul(a, a)
+
+
+def _sqrt(x):
+    """Same semantics as `dfuzzy.sqrt()`: negative inputs are treated as zero."""
+    if np.any(x < -scaled(dfuzzy.prec_internal)):
+        warning("Negative number in sqrt, assuming zero")
+    return _isqrt(np.maximum(x, 0) * ONE)
+
+
+def _full(n: int, value: int = 0) -> np.ndarray:
+    return np.full(n, value, dtype=object)
+
+
+def _broadcast(*arrays):
+    return [np.asarray(a, dtype=object) for a in np.broadcast_arrays(*arrays)]
+
+
+def _params(params: Params):
+    return (
+        scaled(params.decay_slope_lower_bound),
+        scaled(params.stable_redeem_threshold_upper_bound),
+        scaled(params.target_reserve_ratio_floor),
+        scaled(params.target_utilization_ceiling),
+    )
+
+
+def _group_by_params(params: Sequence[Params], n: int):
+    """Yield (Params, indices) for each distinct Params in a column with one Params per point."""
+    if len(params) != n:
+        raise ValueError(f"expected {n} Params, one per point, got {len(params)}")
+    # Group by identity first, which is cheap, and then merge equal Params.
+    by_id: Dict[int, Tuple[Params, List[int]]] = {}
+    for i, p in enumerate(params):
+        by_id.setdefault(id(p), (p, []))[1].append(i)
+    groups: Dict[tuple, Tuple[Params, List[int]]] = {}
+    for p, indices in by_id.values():
+        groups.setdefault(_params(p), (p, []))[1].extend(indices)
+    for p, indices in groups.values():
+        yield p, np.array(indices, dtype=int)
+
+
+# Batched versions of the module-level functions in pamm.py.
+
+
+def compute_slope_unconstrained(ba, ya, theta_bar: int):
+    ra = _div(ba, ya)
+    theta = ONE - theta_bar
+    assert np.all(ra > theta_bar)  # O/w the slope is infinite or makes no sense.
+    high = ra >= _div_int(ONE + theta_bar, 2)
+    result = _full(len(ba))
+    result[high] = _div(2 * (ONE - ra[high]), ya[high])
+    low = ~high
+    result[low] = _div(_sq(theta), 2 * (ba[low] - _mul(theta_bar, ya[low])))
+    return result
+
+
+def compute_slope(ba, ya, theta_bar: int, alpha_bar: int):
+    alpha_min = _div(alpha_bar, ya)
+    return np.maximum(alpha_min, compute_slope_unconstrained(ba, ya, theta_bar))
+
+
+def compute_upper_redemption_threshold_unconstrained(ba, ya, alpha, theta: int):
+    delta = ya - ba
+    first = _mul(alpha, delta) <= _div_int(_sq(theta), 2)
+    result = _full(len(ba))
+    result[first] = ya[first] - _sqrt(_div(2 * delta[first], alpha[first]))
+    second = ~first
+    result[second] = (
+        ya[second] - _div(delta[second], theta) - _div(theta, 2 * alpha[second])
+    )
+    return result
+
+
+def compute_upper_redemption_threshold(ba, ya, alpha, xu_bar: int, theta: int):
+    xu_max = _mul(xu_bar, ya)
+    xu_hat = compute_upper_redemption_threshold_unconstrained(ba, ya, alpha, theta)
+    return np.maximum(0, np.minimum(xu_max, xu_hat))
+
+
+def compute_lower_redemption_threshold(ba, ya, alpha, xu):
+    ba, ya, alpha, xu = _broadcast(ba, ya, alpha, xu)
+    result = ya.copy()
+    below = _div(ba, ya) < ONE
+    ya_, ba_ = ya[below], ba[below]
+    result[below] = ya_ - _sqrt(
+        _sq(ya_ - xu[below]) - _mul(_div(2 * ONE, alpha[below]), ya_ - ba_)
+    )
+    return result
+
+
+def compute_fixed_reserve(x, ba, ya, alpha, xu, xl):
+    x, ba, ya, alpha, xu, xl = _broadcast(x, ba, ya, alpha, xu, xl)
+    rl = ONE - _mul(alpha, xl - xu)
+    return np.select(
+        [x <= xu, x <= xl],
+        [ba - x, ba - x + _mul(_div_int(alpha, 2), _sq(x - xu))],
+        _mul(rl, ya - x),
+    )
+
+
+def _compute_alpha_xu_xl(ba, ya, params: Params):
+    alpha_bar, xu_bar, theta_bar, theta = _params(params)
+    alpha = compute_slope(ba, ya, theta_bar, alpha_bar)
+    xu = compute_upper_redemption_threshold(ba, ya, alpha, xu_bar, theta)
+    xl = compute_lower_redemption_threshold(ba, ya, alpha, xu)
+    return alpha, xu, xl
+
+
+def compute_reserve(x, ba, ya, params: Params) -> np.ndarray:
+    x, ba, ya = _broadcast(x, ba, ya)
+    theta_bar = scaled(params.target_reserve_ratio_floor)
+    ra = _div(ba, ya)
+    result = ba - x
+    low = ra <= theta_bar
+    result[low] = ba[low] - _mul(ra[low], x[low])
+    mid = (ra <= ONE) & ~low
+    alpha, xu, xl = _compute_alpha_xu_xl(ba[mid], ya[mid], params)
+    result[mid] = compute_fixed_reserve(x[mid], ba[mid], ya[mid], alpha, xu, xl)
+    return result
+
+
+def compute_price(x, ba, ya, params: Params) -> np.ndarray:
+    x, ba, ya = _broadcast(x, ba, ya)
+    theta_bar = scaled(params.target_reserve_ratio_floor)
+    result = _full(len(x), ONE)
+    low = (ba <= _mul(ya, theta_bar)) & (ba < ya)
+    result[low] = _div(ba[low], ya[low])
+    mid = (ba < ya) & ~low
+    x_ = x[mid]
+    alpha, xu, xl = _compute_alpha_xu_xl(ba[mid], ya[mid], params)
+    result[mid] = np.select(
+        [x_ <= xu, x_ <= xl],
+        [ONE, ONE - _mul(alpha, x_ - xu)],
+        ONE - _mul(alpha, xl - xu),
+    )
+    return result
+
+
+# Piece codes for compute_region().
+_D1 = [None, "I", "II", "III"]
+_D2 = [None, "H", "L"]
+_D3 = [None, "i", "ii", "iii"]
+
+
+def compute_region(x, ba, ya, params: Params, prec=D(0)) -> np.ndarray:
+    """Batched `pamm.compute_region()`. Returns an int array of `Region` values."""
+    x, ba, ya = _broadcast(x, ba, ya)
+    alpha_bar, xu_bar, theta_bar, theta = _params(params)
+    prec = scaled(prec)
+    n = len(x)
+
+    d1, d2, d3 = np.zeros(n, dtype=int), np.zeros(n, dtype=int), np.zeros(n, dtype=int)
+
+    above = ba >= ya
+    d3[above] = 1
+    low = ~above & (ba - _mul(ya, theta_bar) <= prec)
+    d3[low] = 3
+
+    mid = ~above & ~low
+    x, ba, ya = x[mid], ba[mid], ya[mid]
+    xu_max = _mul(xu_bar, ya)
+    alpha_min = _div(alpha_bar, ya)
+    alpha_hat = compute_slope_unconstrained(ba, ya, theta_bar)
+    alpha = np.maximum(alpha_min, alpha_hat)
+    xu_hat = compute_upper_redemption_threshold_unconstrained(ba, ya, alpha, theta)
+    xu = np.minimum(xu_max, xu_hat)
+    xl = compute_lower_redemption_threshold(ba, ya, alpha, xu)
+    deltaa = ya - ba
+    ra = _div(ba, ya)
+
+    alpha_is_min = alpha_hat - alpha_min <= prec
+    case_I = alpha_is_min & (xu_max - xu_hat <= prec)
+    case_II = alpha_is_min & ~case_I
+    case_III = ~alpha_is_min
+    ii_high = _mul(alpha, deltaa) - _mul(ONE // 2, _sq(ONE - theta_bar)) <= prec
+    iii_high = _div_int(ONE + theta_bar, 2) - ra <= prec
+
+    mid_d1 = np.select([case_I, case_II], [1, 2], 3)
+    mid_d2 = np.select(
+        [case_II & ii_high, case_II, case_III & iii_high, case_III], [1, 2, 1, 2], 0
+    )
+    mid_d3 = np.select([x - xu <= prec, x - xl <= prec], [1, 2], 3)
+    d1[mid], d2[mid], d3[mid] = mid_d1, mid_d2, mid_d3
+
+    keys = d1 * 100 + d2 * 10 + d3
+    regions = np.zeros(n, dtype=int)
+    for key in np.unique(keys):
+        region = Region.from_pieces(_D1[key // 100], _D2[key // 10 % 10], _D3[key % 10])
+        regions[keys == key] = region.value
+    return regions
+
+
+def evaluate(x, ba, ya, params: Union[Params, Sequence[Params]]) -> BatchResult:
+    """Reserves, spot prices and regions for all points (x, ba, ya) in one call.
+
+    `params` is either one `Params` for all points or a column with one `Params` per point. Points are then evaluated
+    in one batch per distinct `Params`."""
+    x, ba, ya = _broadcast(to_scaled_array(x), to_scaled_array(ba), to_scaled_array(ya))
+    if isinstance(params, Params):
+        return BatchResult(
+            compute_reserve(x, ba, ya, params),
+            compute_price(x, ba, ya, params),
+            compute_region(x, ba, ya, params),
+        )
+    result = BatchResult(_full(len(x)), _full(len(x)), np.zeros(len(x), dtype=int))
+    for p, i in _group_by_params(params, len(x)):
+        group = evaluate(x[i], ba[i], ya[i], p)
+        for column, values in zip(result, group):
+            column[i] = values
+    return result
+
+
+# Batched version of `Pamm.compute_redeem_amount()`.
+
+
+def _compute_normalized_current_region(params: Params, sred, sres, ssup, rr):
+    alpha_min, xu_max, theta_floor, theta = _params(params)
+
+    def above(ba, alpha, xu, xl):
+        return sres >= compute_fixed_reserve(
+            sred, scaled(ba), ONE, scaled(alpha), scaled(xu), scaled(xl)
+        )
+
+    first = above(
+        params.ba_threshold_region_I,
+        params.decay_slope_lower_bound,
+        params.stable_redeem_threshold_upper_bound,
+        params.xl_threshold_at_threshold_I,
+    )
+    second = above(
+        params.ba_threshold_region_II,
+        params.decay_slope_lower_bound,
+        0,
+        params.xl_threshold_at_threshold_II,
+    )
+    if params.ba_threshold_II_hl >= params.ba_threshold_region_I:
+        second_subcase = np.zeros(len(sred), dtype=bool)
+    elif params.ba_threshold_II_hl <= params.ba_threshold_region_II:
+        second_subcase = np.ones(len(sred), dtype=bool)
+    else:
+        second_subcase = above(
+            params.ba_threshold_II_hl,
+            params.decay_slope_lower_bound,
+            params.xu_threshold_II_hl,
+            params.xl_threshold_II_hl,
+        )
+    if params.ba_threshold_III_hl >= params.ba_threshold_region_II:
+        high_subcase = np.zeros(len(sred), dtype=bool)
+    else:
+        high_subcase = above(
+            params.ba_threshold_III_hl,
+            params.slope_threshold_III_HL,
+            0,
+            params.xl_threshold_III_HL,
+        )
+
+    case_I = first
+    case_II = ~first & second
+    case_III = ~first & ~second
+    return np.select(
+        [
+            case_I & (sred <= xu_max),
+            case_I & (rr <= ONE - _mul(alpha_min, sred - xu_max)),
+            case_I,
+            case_II
+            & second_subcase
+            & (ssup - sres <= _mul(_div_int(alpha_min, 2), _sq(ssup))),
+            case_II & second_subcase,
+            case_II
+            & (sres - _mul(theta_floor, ssup) >= _div(_sq(theta), 2 * alpha_min)),
+            case_II,
+            case_III & high_subcase,
+        ],
+        [
+            Region.CASE_i.value,
+            Region.CASE_I_ii.value,
+            Region.CASE_I_iii.value,
+            Region.CASE_i.value,
+            Region.CASE_II_H.value,
+            Region.CASE_i.value,
+            Region.CASE_II_L.value,
+            Region.CASE_III_H.value,
+        ],
+        Region.CASE_III_L.value,
+    )
+
+
+def _compute_normalized_anchor_reserve_value(params: Params, x, b, y):
+    alpha_min, xu_max, theta_floor, theta = _params(params)
+    ya = y + x
+    sred, sres, ssup = _div(x, ya), _div(b, ya), _div(y, ya)
+    rr = _div(b, y)
+    used = ONE - rr
+    region = _compute_normalized_current_region(params, sred, sres, ssup, rr)
+    result = _full(len(x))
+
+    m = region == Region.CASE_i.value
+    result[m] = sres[m] + sred[m]
+
+    m = region == Region.CASE_I_ii.value
+    result[m] = sres[m] + sred[m] - _div_int(_mul(alpha_min, _sq(sred[m] - xu_max)), 2)
+
+    m = region == Region.CASE_I_iii.value
+    lh = ONE - _mul(ONE - xu_max, used[m])
+    result[m] = lh + _div(_sq(used[m]), 2 * alpha_min)
+
+    m = region == Region.CASE_II_H.value
+    delta = _div_int(
+        _mul(alpha_min, _sq(_div(used[m], alpha_min) + _div_int(ssup[m], 2))), 2
+    )
+    result[m] = ONE - delta
+
+    m = region == Region.CASE_II_L.value
+    p = _mul(theta, _div(theta, 2 * alpha_min) + ssup[m])
+    d = _mul(_div(_sq(theta) * 2, alpha_min), sres[m] - _mul(theta_floor, ssup[m]))
+    result[m] = ONE - p + _sqrt(d)
+
+    m = region == Region.CASE_III_H.value
+    delta = _div(ssup[m] - sres[m], ONE - _sq(sred[m]))
+    result[m] = ONE - delta
+
+    m = region == Region.CASE_III_L.value
+    diff = ssup[m] - sres[m]
+    p = _div_int(diff + _mul(theta, ONE), 2)
+    q = _mul(_mul(diff, theta), ONE) + _div_int(_mul(_sq(theta), _sq(sred[m])), 4)
+    result[m] = ONE - (p - _sqrt(_sq(p) - q))
+
+    return result
+
+
+def compute_redeem_amount(
+    params: Union[Params, Sequence[Params]],
+    redemption_level,
+    reserve_value,
+    total_gyro_supply,
+    amount,
+) -> np.ndarray:
+    """Batched `Pamm.compute_redeem_amount()` for many states (x, b, y) and redemption amounts at once.
+
+    Like for `evaluate()`, `params` can also be a column with one `Params` per state."""
+    x, b, y, amount = _broadcast(
+        to_scaled_array(redemption_level),
+        to_scaled_array(reserve_value),
+        to_scaled_array(total_gyro_supply),
+        to_scaled_array(amount),
+    )
+    if not isinstance(params, Params):
+        result = _full(len(x))
+        for p, i in _group_by_params(params, len(x)):
+            result[i] = compute_redeem_amount(p, x[i], b[i], y[i], amount[i])
+        return result
+    theta_floor = scaled(params.target_reserve_ratio_floor)
+    rr = _div(b, y)
+    result = amount.copy()
+
+    low = (rr < ONE) & (rr - theta_floor <= scaled(dfuzzy.prec_input))
+    result[low] = _mul(rr[low], amount[low])
+
+    mid = (rr < ONE) & ~low
+    x, b, y, amount = x[mid], b[mid], y[mid], amount[mid]
+    ya = y + x
+    ba = _mul(_compute_normalized_anchor_reserve_value(params, x, b, y), ya)
+    result[mid] = b - compute_reserve(x + amount, ba, ya, params)
+    return result
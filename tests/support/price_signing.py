@@ -1,5 +1,5 @@
 import time
-from typing import Optional
+from typing import Iterable, Optional, Tuple
 
 import web3
 from eth_abi.abi import encode_abi
@@ -26,3 +26,15 @@ def make_message(key: str, price: int, timestamp: Optional[int] = None):
         ["string", "uint256", "string", "uint256"], ["prices", timestamp, key, price]
     )
     return "0x" + encoded.hex()
+
+
+def make_batch_message(
+    prices: Iterable[Tuple[str, int]], timestamp: Optional[int] = None
+):
+    if timestamp is None:
+        timestamp = int(time.time())
+    batch_prices = [(key.encode(), timestamp, price) for key, price in prices]
+    encoded = encode_abi(
+        ["bytes32", "(bytes32,uint64,uint128)[]"], [b"batch-prices", batch_prices]
+    )
+    return "0x" + encoded.hex()
@@ -0,0 +1,36 @@
+"""Configurable QuantizedDecimal implementation for the Python reference models.
+
+The backend is selected with the environment variable `QUANTIZED_DECIMAL_BACKEND`:
+
+- `decimal` (default): `quantized_decimal.QuantizedDecimal`, backed by `decimal.Decimal`.
+- `int`: `quantized_int.QuantizedInt`, backed by a scaled Python int. Gives the same results, much faster.
+- `rational`: `quantized_rational.QuantizedRational`, backed by an exact `fractions.Fraction`. Rounds only when a value
+  is output, so results differ from the contracts by (at most) the final rounding. For testing the mathematical model.
+
+Example: QUANTIZED_DECIMAL_BACKEND=int brownie test tests/test_pamm.py
+"""
+
+import os
+
+from tests.support.quantized_decimal import QuantizedDecimal as DecimalQuantizedDecimal
+from tests.support.quantized_int import QuantizedInt
+from tests.support.quantized_rational import QuantizedRational
+
+BACKENDS = {
+    "decimal": DecimalQuantizedDecimal,
+    "int": QuantizedInt,
+    "rational": QuantizedRational,
+}
+
+# Backends that compute exactly, i.e., where fuzzy comparisons don't need to account for accumulated rounding errors.
+EXACT_BACKENDS = {"rational"}
+
+BACKEND = os.environ.get("QUANTIZED_DECIMAL_BACKEND", "decimal")
+
+if BACKEND not in BACKENDS:
+    raise ValueError(
+        f"unknown QUANTIZED_DECIMAL_BACKEND {BACKEND!r}, expected one of {list(BACKENDS)}"
+    )
+
+QuantizedDecimal = BACKENDS[BACKEND]
+IS_EXACT = BACKEND in EXACT_BACKENDS
@@ -34,6 +34,37 @@ def set_decimals(ndecimals: int):
 set_decimals(18)
 
 
+def integer_nth_root(a: int, n: int) -> int:
+    """floor(a^(1/n)) for integers a >= 0, n >= 1, using integer Newton iteration."""
+    if n < 1:
+        raise ValueError(f"invalid root degree: {n}")
+    if n == 2:
+        return math.isqrt(a)
+    if a < 2 or n == 1:
+        return a
+    # Start above the root. From there, Newton iterates decrease monotonically until they reach floor(a^(1/n)).
+    x = 1 << -(-a.bit_length() // n)
+    while True:
+        y = ((n - 1) * x + a // x ** (n - 1)) // n
+        if y >= x:
+            return x
+        x = y
+
+
+def scaled_nth_root(scaled: int, n: int, rounding=decimal.ROUND_DOWN) -> int:
+    """n-th root of a non-negative scaled value (value * 10^DECIMAL_PRECISION), as a scaled value.
+
+    ROUND_DOWN gives the largest representable value whose n-th power is at most the input, ROUND_UP the smallest
+    whose n-th power is at least the input."""
+    if rounding not in (decimal.ROUND_DOWN, decimal.ROUND_UP):
+        raise ValueError(f"unsupported rounding: {rounding}")
+    a = scaled * 10 ** (DECIMAL_PRECISION * (n - 1))
+    root = integer_nth_root(a, n)
+    if rounding == decimal.ROUND_UP and root**n != a:
+        root += 1
+    return root
+
+
 @total_ordering
 class QuantizedDecimal:
     """Wrapper of `decimal.Decimal` with quantized semantics
@@ -168,9 +199,22 @@ class QuantizedDecimal:
     def is_zero(self):
         return self == 0
 
-    def sqrt(self):
-        """For consistency with Decimal"""
-        return self ** QuantizedDecimal("0.5")
+    def sqrt(self, rounding=decimal.ROUND_DOWN):
+        """For consistency with Decimal. See `nth_root()` for `rounding`."""
+        return self.nth_root(2, rounding)
+
+    def cbrt(self, rounding=decimal.ROUND_DOWN):
+        return self.nth_root(3, rounding)
+
+    def nth_root(self, n: int, rounding=decimal.ROUND_DOWN):
+        """n-th root, computed exactly on the scaled integer value and then rounded down (ROUND_DOWN, the default,
+        like `sqrt()` always did) or up (ROUND_UP). Prefer this to `x ** D(1 / n)`, which uses an inexact exponent.
+        """
+        if self._value < 0:
+            raise decimal.InvalidOperation(f"{n}-th root of negative number")
+        scaled = int(self._value.scaleb(DECIMAL_PRECISION))
+        root = scaled_nth_root(scaled, n, rounding)
+        return QuantizedDecimal(decimal.Decimal(root).scaleb(-DECIMAL_PRECISION))
 
     def floor(self):
         return QuantizedDecimal(math.floor(self._value))
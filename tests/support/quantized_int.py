@@ -0,0 +1,380 @@
+# Integer-backed drop-in replacement for QuantizedDecimal.
+#
+# QuantizedDecimal stores a `decimal.Decimal` and re-quantizes it after every operation. This variant stores the raw
+# scaled value (value * 10^18) as a plain Python int instead, which makes the common operations (+, -, *, /, comparisons)
+# a handful of integer operations rather than Decimal arithmetic at 78 digits followed by a quantize.
+#
+# Rounding is identical to QuantizedDecimal (and therefore to libraries/FixedPoint.sol for non-negative values):
+# - `*`, `/`, mul_down, div_down truncate towards zero (ROUND_DOWN)
+# - mul_up, div_up round away from zero (ROUND_UP)
+# Operations that QuantizedDecimal delegates to the generic Decimal machinery (non-integer powers, operands that are
+# Decimals or strings with more than 18 decimals) fall back to Decimal and quantize the result in the same way.
+#
+# QuantizedInt is a subclass of QuantizedDecimal so that isinstance() checks keep working and so that, in mixed
+# expressions, Python always dispatches to the QuantizedInt implementation (reflected operators of a subclass take
+# precedence).
+
+from __future__ import annotations
+
+import decimal
+import math
+import sys
+from functools import lru_cache
+from typing import Any, Optional
+
+import pytest
+from _pytest.python_api import ApproxDecimal
+
+from tests.support.quantized_decimal import (
+    DecimalLike,
+    QuantizedDecimal,
+    scaled_nth_root,
+)
+
+DECIMAL_PRECISION = 18
+ONE = 10**DECIMAL_PRECISION
+
+# For hashing x / ONE like Python hashes rationals (and therefore Decimals), see `QuantizedInt.__hash__()`.
+_HASH_MODULUS = sys.hash_info.modulus
+_ONE_INV_HASH = pow(ONE, -1, _HASH_MODULUS)
+
+
+def _zero_division(a: int) -> decimal.DecimalException:
+    """The exception Decimal raises when dividing `a` by zero."""
+    if a == 0:
+        return decimal.InvalidOperation("division undefined")
+    return decimal.DivisionByZero("division by zero")
+
+
+def _div_down(a: int, b: int) -> int:
+    """a / b rounded towards zero, like decimal.ROUND_DOWN."""
+    if b == 0:
+        raise _zero_division(a)
+    return a // b if (a < 0) == (b < 0) else -(-a // b)
+
+
+def _div_up(a: int, b: int) -> int:
+    """a / b rounded away from zero, like decimal.ROUND_UP."""
+    if b == 0:
+        raise _zero_division(a)
+    return -(-a // b) if (a < 0) == (b < 0) else a // b
+
+
+def _to_raw(value: decimal.Decimal, rounding=decimal.ROUND_DOWN) -> int:
+    if not value.is_finite():
+        raise decimal.InvalidOperation(f"cannot quantize {value}")
+    return int(value.scaleb(DECIMAL_PRECISION).to_integral_value(rounding=rounding))
+
+
+@lru_cache(maxsize=4096)
+def _str_to_raw(value: str) -> int:
+    # Strings are almost exclusively literals in the reference models, so parsing them once is enough.
+    return _to_raw(decimal.Decimal(value))
+
+
+def _scaled(value: Any) -> Optional[int]:
+    """Raw scaled int for `value` if it can be represented exactly, None otherwise."""
+    if type(value) is QuantizedInt:
+        return value._int
+    if isinstance(value, QuantizedInt):
+        return value._int
+    if isinstance(value, int):
+        return value * ONE
+    if isinstance(value, QuantizedDecimal):
+        return _to_raw(value.raw)
+    return None
+
+
+def _decimal(value: Any) -> decimal.Decimal:
+    if isinstance(value, QuantizedDecimal):
+        return value.raw
+    if isinstance(value, (int, str)):
+        return decimal.Decimal(value)
+    return value
+
+
+_new = object.__new__
+
+
+def _from_raw(raw: int) -> QuantizedInt:
+    result = _new(QuantizedInt)
+    result._int = raw
+    return result
+
+
+class QuantizedInt(QuantizedDecimal):
+    """Drop-in replacement for `QuantizedDecimal` backed by a scaled Python int.
+
+    Produces bit-identical results to `QuantizedDecimal` (see tests/test_quantized_int.py).
+    """
+
+    __slots__ = ("_int",)
+
+    def __init__(self, value="0", context: decimal.Context = None):
+        if type(value) is int:
+            self._int = value * ONE
+        elif isinstance(value, QuantizedInt):
+            self._int = value._int
+        elif isinstance(value, int):
+            self._int = value * ONE
+        elif isinstance(value, QuantizedDecimal):
+            self._int = _to_raw(value.raw)
+        elif isinstance(value, decimal.Decimal):
+            rounding = decimal.ROUND_DOWN
+            if context is not None:
+                rounding = context.rounding
+            self._int = _to_raw(value, rounding=rounding)
+        elif isinstance(value, str) and context is None:
+            self._int = _str_to_raw(value)
+        else:
+            rounding = decimal.ROUND_DOWN
+            if isinstance(value, float):
+                rounding = decimal.ROUND_HALF_DOWN
+            self._int = _to_raw(
+                decimal.Decimal(value, context=context), rounding=rounding
+            )
+
+    @staticmethod
+    def from_raw(raw: int) -> QuantizedInt:
+        """Build directly from the scaled integer representation (value * 10^18)."""
+        return _from_raw(raw)
+
+    @property
+    def raw(self):
+        return decimal.Decimal(self._int).scaleb(-DECIMAL_PRECISION)
+
+    @property
+    def _value(self):
+        # QuantizedDecimal accesses `_value` of other instances directly.
+        return self.raw
+
+    @property
+    def scaled(self) -> int:
+        return self._int
+
+    def quantize_to_lower_precision(self, rounding=decimal.ROUND_DOWN):
+        return self.raw
+
+    # The arithmetic below is written out inline for the common case of two QuantizedInt operands since these
+    # operators are the hot path of the reference models.
+
+    def __add__(self, other: DecimalLike):
+        result = _new(QuantizedInt)
+        if type(other) is QuantizedInt:
+            result._int = self._int + other._int
+            return result
+        o = _scaled(other)
+        if o is None:
+            return QuantizedInt(self.raw + _decimal(other))
+        result._int = self._int + o
+        return result
+
+    __radd__ = __add__
+
+    def __sub__(self, other: DecimalLike):
+        result = _new(QuantizedInt)
+        if type(other) is QuantizedInt:
+            result._int = self._int - other._int
+            return result
+        o = _scaled(other)
+        if o is None:
+            return QuantizedInt(self.raw - _decimal(other))
+        result._int = self._int - o
+        return result
+
+    def __rsub__(self, other: DecimalLike):
+        if type(other) is int:
+            return _from_raw(other * ONE - self._int)
+        o = _scaled(other)
+        if o is None:
+            return QuantizedInt(_decimal(other) - self.raw)
+        return _from_raw(o - self._int)
+
+    def __mul__(self, other: DecimalLike):
+        result = _new(QuantizedInt)
+        if type(other) is QuantizedInt:
+            p = self._int * other._int
+            result._int = p // ONE if p >= 0 else -(-p // ONE)
+            return result
+        if type(other) is int:
+            result._int = self._int * other
+            return result
+        o = _scaled(other)
+        if o is None:
+            return QuantizedInt(self.raw * _decimal(other))
+        result._int = _div_down(self._int * o, ONE)
+        return result
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: DecimalLike):
+        result = _new(QuantizedInt)
+        if type(other) is QuantizedInt:
+            a, b = self._int * ONE, other._int
+            if b == 0:
+                raise _zero_division(a)
+            result._int = a // b if (a < 0) == (b < 0) else -(-a // b)
+            return result
+        o = _scaled(other)
+        if o is None:
+            return QuantizedInt(self.raw / _decimal(other))
+        result._int = _div_down(self._int * ONE, o)
+        return result
+
+    def __rtruediv__(self, other: DecimalLike):
+        if type(other) is int:
+            return _from_raw(_div_down(other * ONE * ONE, self._int))
+        o = _scaled(other)
+        if o is None:
+            return QuantizedInt(_decimal(other) / self.raw)
+        return _from_raw(_div_down(o * ONE, self._int))
+
+    def __floordiv__(self, other: DecimalLike):
+        o = _scaled(other)
+        if o is None:
+            return QuantizedInt(self.raw // _decimal(other))
+        return _from_raw(_div_down(self._int, o) * ONE)
+
+    def __rfloordiv__(self, other: DecimalLike):
+        o = _scaled(other)
+        if o is None:
+            return QuantizedInt(_decimal(other) // self.raw)
+        return _from_raw(_div_down(o, self._int) * ONE)
+
+    def __pow__(self, other: DecimalLike):
+        if type(other) is int and other == 2:
+            return _from_raw(self._int * self._int // ONE)
+        if type(other) is int and other > 0:
+            return _from_raw(_div_down(self._int**other, ONE ** (other - 1)))
+        o = _scaled(other)
+        if o is None or o % ONE != 0 or o == 0 or (o < 0 and self._int == 0):
+            return QuantizedInt(self.raw ** _decimal(other))
+        n = o // ONE
+        if n > 0:
+            return _from_raw(_div_down(self._int**n, ONE ** (n - 1)))
+        return _from_raw(_div_down(ONE ** (1 - n), self._int ** (-n)))
+
+    def __eq__(self, other: Any):
+        if isinstance(other, QuantizedDecimal):
+            return self._int == _scaled(other)
+        if isinstance(other, int):
+            return self._int == other * ONE
+        return self.raw == other
+
+    def __ne__(self, other: Any):
+        return not self == other
+
+    def __le__(self, other: DecimalLike):
+        if type(other) is QuantizedInt:
+            return self._int <= other._int
+        if type(other) is int:
+            return self._int <= other * ONE
+        if isinstance(other, QuantizedDecimal):
+            return self._int <= _scaled(other)
+        if isinstance(other, ApproxDecimal):
+            return self < other.expected or self == other
+        return self <= QuantizedInt(other)
+
+    def __ge__(self, other: DecimalLike):
+        if type(other) is QuantizedInt:
+            return self._int >= other._int
+        if type(other) is int:
+            return self._int >= other * ONE
+        if isinstance(other, QuantizedDecimal):
+            return self._int >= _scaled(other)
+        if isinstance(other, ApproxDecimal):
+            return self > other.expected or self == other
+        return self >= QuantizedInt(other)
+
+    def __lt__(self, other):
+        if type(other) is QuantizedInt:
+            return self._int < other._int
+        if type(other) is int:
+            return self._int < other * ONE
+        return not self >= other
+
+    def __gt__(self, other):
+        if type(other) is QuantizedInt:
+            return self._int > other._int
+        if type(other) is int:
+            return self._int > other * ONE
+        return not self <= other
+
+    def __hash__(self):
+        # hash(self.raw), i.e., the hash of the rational number self._int / ONE, without building a Decimal.
+        h = abs(self._int) % _HASH_MODULUS * _ONE_INV_HASH % _HASH_MODULUS
+        if self._int < 0:
+            h = -h
+        return -2 if h == -1 else h
+
+    def __neg__(self):
+        return _from_raw(-self._int)
+
+    def __abs__(self):
+        return _from_raw(abs(self._int))
+
+    def __int__(self):
+        return _div_down(self._int, ONE)
+
+    def __float__(self):
+        return self._int / ONE
+
+    def is_zero(self):
+        return self._int == 0
+
+    def sqrt(self, rounding=decimal.ROUND_DOWN):
+        """For consistency with Decimal"""
+        if self._int < 0:
+            raise decimal.InvalidOperation("square root of negative number")
+        if rounding == decimal.ROUND_DOWN:
+            return _from_raw(math.isqrt(self._int * ONE))
+        return _from_raw(scaled_nth_root(self._int, 2, rounding))
+
+    def nth_root(self, n: int, rounding=decimal.ROUND_DOWN):
+        if self._int < 0:
+            raise decimal.InvalidOperation(f"{n}-th root of negative number")
+        return _from_raw(scaled_nth_root(self._int, n, rounding))
+
+    def floor(self):
+        return _from_raw(self._int // ONE * ONE)
+
+    def mul_up(self, other: DecimalLike):
+        o = _scaled(other)
+        if o is None:
+            context = decimal.getcontext().copy()
+            context.rounding = decimal.ROUND_UP
+            return QuantizedInt(self.raw * _decimal(other), context=context)
+        return _from_raw(_div_up(self._int * o, ONE))
+
+    def div_up(self, other: DecimalLike):
+        o = _scaled(other)
+        if o is None:
+            context = decimal.getcontext().copy()
+            context.rounding = decimal.ROUND_UP
+            return QuantizedInt(self.raw / _decimal(other), context=context)
+        return _from_raw(_div_up(self._int * ONE, o))
+
+    def mul_down(self, other: DecimalLike):
+        return self * other
+
+    def div_down(self, other: DecimalLike):
+        return self / other
+
+    @staticmethod
+    def _get_value(value: DecimalLike) -> decimal.Decimal:
+        return _decimal(value)
+
+    def __repr__(self):
+        return repr(self.raw)
+
+    def __str__(self):
+        return str(self.raw)
+
+    def __format__(self, format_spec: str):
+        if format_spec.endswith("e"):
+            return format(float(self), format_spec)
+        else:
+            return format(self.raw, format_spec)
+
+    def approxed(self, **kwargs):
+        return pytest.approx(self.raw, **kwargs)
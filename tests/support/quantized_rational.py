@@ -0,0 +1,303 @@
+# Exact rational variant of QuantizedDecimal.
+#
+# QuantizedDecimal (and QuantizedInt) round every intermediate result to 18 decimals, which is what the contracts do
+# but means that long expressions in the reference models accumulate rounding errors. The tolerances in dfuzzy.py
+# exist mostly because of this. QuantizedRational instead stores an exact `fractions.Fraction` and performs +, -, *,
+# / and integer powers exactly. Rounding is deferred to a single final quantize (ROUND_DOWN to 18 decimals) whenever a
+# value leaves the rational domain: `.raw`, str(), formatting, approxed() and conversion to QuantizedDecimal.
+#
+# Where an exact result is not rational, we approximate it far below the quantization step:
+# - Roots (sqrt(), nth_root(), `** (1/n)`) are computed to WORKING_DECIMALS decimals using integer Newton iteration.
+# - Other non-integer powers are computed with Decimal at POW_PRECISION significant digits.
+# Once such approximations enter a computation, denominators grow with every multiplication, and in iterated
+# computations (e.g., long redemption paths in pamm.py) they'd grow exponentially. We therefore round results whose
+# denominator exceeds 10^WORKING_DECIMALS to WORKING_DECIMALS decimals. Results with small denominators (in particular,
+# everything computed from decimal inputs using +, -, * and / a moderate number of times) remain exact.
+# Floats are quantized like QuantizedDecimal does it (ROUND_HALF_DOWN to 18 decimals) since they're approximations
+# anyway (e.g., `D(1/3)`). All other inputs (ints, strings, Decimals) are taken exactly.
+#
+# Rounding-direction variants (mul_up, div_up, ...) are the same as the plain operators since nothing is rounded.
+# Consequently, this backend does *not* reproduce the rounding of the contracts. Use it for properties of the
+# mathematical model, not for bit-exact comparisons against Solidity.
+#
+# Like QuantizedInt, this is a subclass of QuantizedDecimal so that isinstance() checks keep working and so that
+# Python dispatches to the QuantizedRational implementation in mixed expressions.
+
+from __future__ import annotations
+
+import decimal
+import math
+from fractions import Fraction
+from typing import Any, Optional
+
+import pytest
+from _pytest.python_api import ApproxDecimal
+
+from tests.support.quantized_decimal import (
+    DecimalLike,
+    QuantizedDecimal,
+    integer_nth_root,
+)
+
+DECIMAL_PRECISION = 18
+QUANTIZED_EXP = decimal.Decimal(1).scaleb(-DECIMAL_PRECISION)
+WORKING_DECIMALS = 60
+POW_PRECISION = 80
+
+_WORKING_SCALE = 10**WORKING_DECIMALS
+
+
+def _to_fraction(value: Any) -> Optional[Fraction]:
+    """Exact Fraction for `value`, None if it's not a number we know."""
+    if isinstance(value, QuantizedRational):
+        return value._frac
+    if isinstance(value, (int, Fraction)):
+        return Fraction(value)
+    if isinstance(value, QuantizedDecimal):
+        return Fraction(value.raw)
+    if isinstance(value, decimal.Decimal):
+        if not value.is_finite():
+            raise decimal.InvalidOperation(f"cannot convert {value} to a fraction")
+        return Fraction(value)
+    if isinstance(value, str):
+        return Fraction(decimal.Decimal(value))
+    if isinstance(value, float):
+        quantized = decimal.Decimal(value).quantize(
+            QUANTIZED_EXP, rounding=decimal.ROUND_HALF_DOWN
+        )
+        return Fraction(quantized)
+    return None
+
+
+def _fraction(value: Any) -> Fraction:
+    f = _to_fraction(value)
+    if f is None:
+        raise TypeError(f"unsupported operand type: {type(value).__name__}")
+    return f
+
+
+def _to_decimal(f: Fraction, rounding=decimal.ROUND_DOWN) -> decimal.Decimal:
+    """`f` quantized to DECIMAL_PRECISION decimals, rounding towards zero (ROUND_DOWN) or away from it (ROUND_UP)."""
+    scaled = abs(f.numerator) * 10**DECIMAL_PRECISION
+    q, r = divmod(scaled, f.denominator)
+    if rounding == decimal.ROUND_UP and r != 0:
+        q += 1
+    return decimal.Decimal(-q if f < 0 else q).scaleb(-DECIMAL_PRECISION)
+
+
+def _root(f: Fraction, n: int, rounding=decimal.ROUND_DOWN) -> Fraction:
+    """n-th root of f, rounded to WORKING_DECIMALS decimals in the direction `rounding`."""
+    if f < 0:
+        raise decimal.InvalidOperation(f"{n}-th root of negative number")
+    a, r = divmod(f.numerator * _WORKING_SCALE**n, f.denominator)
+    root = integer_nth_root(a, n)
+    if rounding == decimal.ROUND_UP and (r != 0 or root**n != a):
+        root += 1
+    return Fraction(root, _WORKING_SCALE)
+
+
+def _pow(base: Fraction, exponent: Fraction) -> Fraction:
+    if exponent.denominator == 1:
+        if base == 0 and exponent < 0:
+            raise decimal.DivisionByZero("division by zero")
+        return base**exponent.numerator
+    if exponent.numerator == 1:
+        return _root(base, exponent.denominator)
+    with decimal.localcontext() as ctx:
+        ctx.prec = POW_PRECISION
+        base_dec = decimal.Decimal(base.numerator) / base.denominator
+        exponent_dec = decimal.Decimal(exponent.numerator) / exponent.denominator
+        return Fraction(base_dec**exponent_dec)
+
+
+_new = object.__new__
+
+
+def _from_fraction(f: Fraction) -> QuantizedRational:
+    if f.denominator > _WORKING_SCALE:
+        f = Fraction(round(f * _WORKING_SCALE), _WORKING_SCALE)
+    result = _new(QuantizedRational)
+    result._frac = f
+    return result
+
+
+class QuantizedRational(QuantizedDecimal):
+    """Drop-in replacement for `QuantizedDecimal` that computes exactly and quantizes only on output."""
+
+    __slots__ = ("_frac",)
+
+    def __init__(self, value="0", context: decimal.Context = None):
+        if isinstance(value, decimal.Decimal) and context is not None:
+            # Explicit rounding requested: quantize like QuantizedDecimal.
+            self._frac = Fraction(
+                value.quantize(QUANTIZED_EXP, rounding=context.rounding)
+            )
+        else:
+            self._frac = _fraction(value)
+
+    @staticmethod
+    def from_fraction(value: Fraction) -> QuantizedRational:
+        return _from_fraction(value)
+
+    @property
+    def exact(self) -> Fraction:
+        """The exact (unquantized) value."""
+        return self._frac
+
+    @property
+    def raw(self):
+        return _to_decimal(self._frac)
+
+    @property
+    def _value(self):
+        # QuantizedDecimal accesses `_value` of other instances directly.
+        return self.raw
+
+    def quantize(self, rounding=decimal.ROUND_DOWN) -> QuantizedRational:
+        """Round to DECIMAL_PRECISION decimals, i.e., to the value a contract would store."""
+        return _from_fraction(Fraction(_to_decimal(self._frac, rounding)))
+
+    def quantize_to_lower_precision(self, rounding=decimal.ROUND_DOWN):
+        return _to_decimal(self._frac, rounding)
+
+    def __add__(self, other: DecimalLike):
+        return _from_fraction(self._frac + _fraction(other))
+
+    __radd__ = __add__
+
+    def __sub__(self, other: DecimalLike):
+        return _from_fraction(self._frac - _fraction(other))
+
+    def __rsub__(self, other: DecimalLike):
+        return _from_fraction(_fraction(other) - self._frac)
+
+    def __mul__(self, other: DecimalLike):
+        return _from_fraction(self._frac * _fraction(other))
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other: DecimalLike):
+        o = _fraction(other)
+        if o == 0:
+            raise _zero_division(self._frac)
+        return _from_fraction(self._frac / o)
+
+    def __rtruediv__(self, other: DecimalLike):
+        o = _fraction(other)
+        if self._frac == 0:
+            raise _zero_division(o)
+        return _from_fraction(o / self._frac)
+
+    def __floordiv__(self, other: DecimalLike):
+        # Decimal's // truncates towards zero (unlike Fraction's).
+        return _from_fraction(Fraction(int((self / other)._frac)))
+
+    def __rfloordiv__(self, other: DecimalLike):
+        return _from_fraction(Fraction(int((other / self)._frac)))
+
+    def __pow__(self, other: DecimalLike):
+        return _from_fraction(_pow(self._frac, _fraction(other)))
+
+    def __rpow__(self, other: DecimalLike):
+        return _from_fraction(_pow(_fraction(other), self._frac))
+
+    def __eq__(self, other: Any):
+        if isinstance(other, ApproxDecimal):
+            return other == self.raw
+        o = _to_fraction(other)
+        if o is None:
+            return NotImplemented
+        return self._frac == o
+
+    def __ne__(self, other: Any):
+        return not self == other
+
+    def __le__(self, other: DecimalLike):
+        if isinstance(other, ApproxDecimal):
+            return self < other.expected or self == other
+        return self._frac <= _fraction(other)
+
+    def __ge__(self, other: DecimalLike):
+        if isinstance(other, ApproxDecimal):
+            return self > other.expected or self == other
+        return self._frac >= _fraction(other)
+
+    def __lt__(self, other):
+        if isinstance(other, ApproxDecimal):
+            return not self >= other
+        return self._frac < _fraction(other)
+
+    def __gt__(self, other):
+        if isinstance(other, ApproxDecimal):
+            return not self <= other
+        return self._frac > _fraction(other)
+
+    def __hash__(self):
+        return hash(self._frac)
+
+    def __neg__(self):
+        return _from_fraction(-self._frac)
+
+    def __abs__(self):
+        return _from_fraction(abs(self._frac))
+
+    def __int__(self):
+        return int(self._frac)
+
+    def __float__(self):
+        return float(self._frac)
+
+    def is_zero(self):
+        return self._frac == 0
+
+    def sqrt(self, rounding=decimal.ROUND_DOWN):
+        """For consistency with Decimal"""
+        return _from_fraction(_root(self._frac, 2, rounding))
+
+    def nth_root(self, n: int, rounding=decimal.ROUND_DOWN):
+        return _from_fraction(_root(self._frac, n, rounding))
+
+    def floor(self):
+        return _from_fraction(Fraction(math.floor(self._frac)))
+
+    def mul_up(self, other: DecimalLike):
+        return self * other
+
+    def div_up(self, other: DecimalLike):
+        return self / other
+
+    def mul_down(self, other: DecimalLike):
+        return self * other
+
+    def div_down(self, other: DecimalLike):
+        return self / other
+
+    @staticmethod
+    def _get_value(value: DecimalLike) -> decimal.Decimal:
+        if isinstance(value, QuantizedDecimal):
+            return value.raw
+        if isinstance(value, (int, str)):
+            return decimal.Decimal(value)
+        return value
+
+    def __repr__(self):
+        return repr(self.raw)
+
+    def __str__(self):
+        return str(self.raw)
+
+    def __format__(self, format_spec: str):
+        if format_spec.endswith("e"):
+            return format(float(self), format_spec)
+        else:
+            return format(self.raw, format_spec)
+
+    def approxed(self, **kwargs):
+        return pytest.approx(self.raw, **kwargs)
+
+
+def _zero_division(a: Fraction) -> decimal.DecimalException:
+    """The exception Decimal raises when dividing `a` by zero."""
+    if a == 0:
+        return decimal.InvalidOperation("division undefined")
+    return decimal.DivisionByZero("division by zero")
@@ -0,0 +1,119 @@
+import json
+import sys
+
+from fractions import Fraction
+
+from tests.support.eclp import derived_params_cache, mimpl
+from tests.support.eclp.derived_params_cache import DerivedParamsCache
+from tests.support.quantized_decimal import QuantizedDecimal as D
+from tests.support.quantized_int import QuantizedInt
+from tests.support.quantized_rational import QuantizedRational
+
+
+def test_cache_hits_and_misses():
+    cache = DerivedParamsCache()
+    calls = []
+
+    def compute():
+        calls.append(None)
+        return (D("0.1"), D("0.2")), D(3)
+
+    assert cache.get("ns", (D(1), D(2)), compute, D) == ((D("0.1"), D("0.2")), D(3))
+    assert cache.get("ns", (D(1), D(2)), compute, D) == ((D("0.1"), D("0.2")), D(3))
+    cache.get("other_ns", (D(1), D(2)), compute, D)
+    assert len(calls) == 2
+    assert (cache.hits, cache.misses) == (1, 2)
+
+
+def test_save_and_load(tmp_path):
+    path = tmp_path / "cache.json"
+    value = ((D("0.123456789012345678"), D("-0.5")), (D(1), D(0)))
+    cache = DerivedParamsCache(path)
+    cache.get("ns", (D(1),), lambda: value, D)
+    cache.save()
+
+    loaded = DerivedParamsCache(path)
+    assert loaded.get("ns", (D(1),), lambda: None, D) == value
+    assert loaded.hits == 1
+
+    # Saving merges with what's already on disk.
+    loaded.get("ns", (D(2),), lambda: D(2), D)
+    loaded.save()
+    (entries,) = json.loads(path.read_text()).values()
+    assert set(entries) == {"1.000000000000000000", "2.000000000000000000"}
+
+
+def test_save_and_load_exact(tmp_path):
+    path = tmp_path / "cache.json"
+    value = QuantizedRational.from_fraction(Fraction(1, 3))
+    params = (QuantizedRational.from_fraction(Fraction(2, 3)),)
+    cache = DerivedParamsCache(path)
+    cache.get("ns", params, lambda: value, QuantizedRational)
+    cache.save()
+
+    loaded = DerivedParamsCache(path)
+    assert loaded.get("ns", params, lambda: None, QuantizedRational).exact == Fraction(
+        1, 3
+    )
+    # Equal when quantized, but not the same params.
+    other_params = (QuantizedRational(params[0].raw),)
+    assert loaded.get("ns", other_params, lambda: None, QuantizedRational) is None
+
+
+def test_number_types_are_separate(tmp_path):
+    path = tmp_path / "cache.json"
+    cache = DerivedParamsCache(path)
+    cache.get("ns", (D(1),), lambda: D(1), D)
+    cache.save()
+
+    loaded = DerivedParamsCache(path)
+    loaded.get("ns", (QuantizedInt(1),), lambda: QuantizedInt(2), QuantizedInt)
+    assert (loaded.hits, loaded.misses) == (0, 1)
+
+
+def test_source_fingerprint(tmp_path, monkeypatch):
+    monkeypatch.setattr(derived_params_cache, "REPOSITORY_ROOT", tmp_path)
+    monkeypatch.setattr(derived_params_cache, "_fingerprints", {})
+    monkeypatch.syspath_prepend(str(tmp_path))
+    (tmp_path / "fingerprint_formulas.py").write_text(
+        "from fingerprint_numbers import sqrt\n"
+    )
+    numbers = tmp_path / "fingerprint_numbers.py"
+    numbers.write_text("def sqrt(x):\n    return x**0.5\n")
+    try:
+        import fingerprint_formulas
+
+        fingerprint = derived_params_cache.source_fingerprint(fingerprint_formulas)
+        assert (
+            derived_params_cache.source_fingerprint(fingerprint_formulas) == fingerprint
+        )
+
+        # A change to a module used by the formulas changes the fingerprint.
+        numbers.write_text("def sqrt(x):\n    return x ** (1 / 2)\n")
+        monkeypatch.setattr(derived_params_cache, "_fingerprints", {})
+        assert (
+            derived_params_cache.source_fingerprint(fingerprint_formulas) != fingerprint
+        )
+    finally:
+        sys.modules.pop("fingerprint_formulas", None)
+        sys.modules.pop("fingerprint_numbers", None)
+
+
+def test_corrupt_file(tmp_path):
+    path = tmp_path / "cache.json"
+    path.write_text("{")
+    cache = DerivedParamsCache(path)
+    assert cache.get("ns", (D(1),), lambda: D(1), D) == D(1)
+    assert cache.misses == 1
+
+
+def test_mimpl_params(tmp_path, monkeypatch):
+    cache = DerivedParamsCache(tmp_path / "cache.json")
+    monkeypatch.setattr(mimpl, "DERIVED_PARAMS_CACHE", cache)
+    params = mimpl.Params(D("0.97"), D("1.02"), D("0.7"), D("0.7"), D(5))
+    assert params.tau_alpha == params.tau(params.alpha)
+    assert params.tau_beta == params.tau(params.beta)
+
+    same_params = mimpl.Params(D("0.97"), D("1.02"), D("0.7"), D("0.7"), D(5))
+    assert same_params.tau_alpha == params.tau_alpha
+    assert (cache.hits, cache.misses) == (1, 1)
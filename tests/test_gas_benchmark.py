@@ -0,0 +1,63 @@
+import pytest
+
+from scripts.profiling.gas_benchmark import (
+    compare_results,
+    find_regressions,
+    fit_scaling,
+    format_changes,
+    load_results,
+    save_results,
+    summarize,
+)
+from scripts.profiling.profiling_utils import CallStats
+
+
+def _results(mean_gas):
+    return {"Arrays.sort": {"n=5": {"Arrays.sort": {"mean_gas": mean_gas}}}}
+
+
+def test_summarize(tmp_path):
+    stats = CallStats({"internal_gas": g, "total_gas": g} for g in [100, 200, 600])
+    summary = summarize(stats)
+    assert summary["count"] == 3
+    assert summary["mean_gas"] == 300
+    assert summary["median_gas"] == 200
+    assert (summary["min_gas"], summary["max_gas"]) == (100, 600)
+
+    path = str(tmp_path / "results.json")
+    save_results({"b": {"c": {"f": summary}}}, path)
+    assert load_results(path) == {"b": {"c": {"f": summary}}}
+
+
+@pytest.mark.parametrize(
+    "baseline,current,regressed",
+    [(1000, 1000, False), (1000, 1010, False), (1000, 1011, True), (0, 1, True)],
+)
+def test_find_regressions(baseline, current, regressed):
+    changes = compare_results(_results(current), _results(baseline))
+    assert len(changes) == 1
+    assert bool(find_regressions(changes, threshold=0.01)) == regressed
+
+
+def test_compare_skips_missing_baseline():
+    results = _results(1000)
+    results["Arrays.dedup"] = {"n=5": {"Arrays.dedup": {"mean_gas": 10}}}
+    changes = compare_results(results, _results(900))
+    assert [c.benchmark for c in changes] == ["Arrays.sort"]
+    assert "900 -> 1000 (+11.11%)" in format_changes(changes)
+    assert format_changes(changes, threshold=0.2) == ""
+
+
+def test_fit_scaling():
+    ns = [1, 2, 4, 8, 16]
+    fit = fit_scaling(ns, [50_000 + 3_000 * n + 40 * n**2 for n in ns])
+    assert fit.constant == pytest.approx(50_000)
+    assert fit.linear == pytest.approx(3_000)
+    assert fit.quadratic == pytest.approx(40)
+    assert fit.superlinear_share(16) == pytest.approx(
+        40 * 256 / (50_000 + 48_000 + 40 * 256)
+    )
+
+    linear = fit_scaling([1, 2], [10, 20])
+    assert linear.quadratic == 0
+    assert linear(3) == pytest.approx(30)
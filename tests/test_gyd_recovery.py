@@ -3,6 +3,7 @@ import pytest
 from brownie.test.managers.runner import RevertContextManager as reverts
 from brownie import chain, interface  # type: ignore
 
+from scripts.profiling.profiling_utils import get_call_gas
 from tests.support.types import (
     MintAsset,
     PersistedVaultMetadata,
@@ -185,6 +186,13 @@ def test_full_burn(
     assert start_bal == end_bal
 
 
+@pytest.mark.usefixtures("gyd_alice")
+def test_check_and_run_shares_reserve_state(alice, gyd_recovery):
+    # The stewardship incentives checkpoint reuses the reserve state computed by checkAndRun().
+    tx = gyd_recovery.checkAndRun({"from": alice})
+    assert len(get_call_gas(tx)["ReserveManager.getReserveState"]) == 1
+
+
 @pytest.mark.usefixtures("gyd_alice")
 def test_partial_burn(
     alice, gyd_recovery, gyd_token, mock_price_oracle, dai, dai_vault, admin
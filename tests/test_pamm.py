@@ -1,4 +1,5 @@
 import math
+from bisect import bisect_left
 from decimal import Decimal as D
 from typing import Tuple
 
@@ -6,7 +7,7 @@ import pytest
 from brownie.exceptions import VirtualMachineError
 from brownie.network.state import Chain
 from brownie.test import given
-from hypothesis import strategies as st
+from hypothesis import example, strategies as st
 from hypothesis.control import assume
 
 import tests.support.pamm as pypamm
@@ -157,6 +158,117 @@ def test_compute_derived_params(pamm, alpha_min):
     assert xlThresholdIIIHL == scale(pyparams.xl_threshold_III_HL).approxed(abs=1)
 
 
+def test_params_cache():
+    pypamm.clear_params_cache()
+    params = pypamm.Params(QD("0.7"), QD("0.2"), QD("0.5"))
+    assert pypamm.params_cache_info().misses == 1
+
+    params2 = pypamm.Params(QD("0.7"), QD("0.2"), QD("0.5"))
+    assert pypamm.params_cache_info().hits == 1
+    for name in pypamm._DERIVED_PARAMS:
+        assert getattr(params2, name) == getattr(params, name)
+
+    pypamm.Params(QD("0.7"), QD("0.2"), QD("0.6"))
+    assert pypamm.params_cache_info().misses == 2
+
+    # Same values as the uncached derivation. (The region index has no value semantics, it's checked in
+    # test_region_index.)
+    uncached = pypamm._derive_params.__wrapped__(QD("0.7"), QD("0.2"), QD("0.5"))
+    for name in pypamm._DERIVED_PARAMS:
+        if name != "region_index":
+            assert getattr(params, name) == uncached[name]
+
+
+@given(
+    alpha_bar=st.sampled_from(["0.3", "0.6", "1"]),
+    x=st.decimals(min_value="0", max_value="0.5", places=6),
+    ba=st.decimals(min_value="0.62", max_value="1.1", places=6),
+    amounts=st.lists(
+        st.decimals(min_value="0", max_value="0.02", places=6), max_size=25
+    ),
+)
+@example(
+    alpha_bar="0.3",
+    x=D("0.005166"),
+    ba=D("0.62"),
+    amounts=[
+        D(a)
+        for a in "0.006277 0.015703 0.000001 0.000716 0.002481 0.014502 0.002389 "
+        "0.000959 0.014501 0.000001 0.0063 0.000009 0.008326".split()
+    ],
+)
+def test_pamm_simulator(alpha_bar, x, ba, amounts):
+    params = pypamm.Params(QD(alpha_bar), QD("0.3"), QD("0.6"))
+    x, ba = QD(x), QD(ba)
+    b = pypamm.compute_reserve(x, ba, QD(1), params)
+
+    pamm = pypamm.Pamm(params)
+    pamm.update_state(x, b, 1 - x)
+    simulator = pypamm.PammSimulator(params)
+    simulator.update_state(x, b, 1 - x)
+
+    amounts = [QD(a) for a in amounts]
+    expected = [pamm.redeem(a) for a in amounts]
+    results = list(simulator.redeem_stream(amounts))
+
+    # `Pamm` reconstructs the anchor from the rounded state on every step, so its anchor (and thus its results)
+    # drifts by up to one reconstruction error per step, while the simulator keeps the anchor fixed.
+    for i, (result, expected_result) in enumerate(zip(results, expected)):
+        assert result == expected_result.approxed(
+            abs=(i + 1) * pypamm.SIMULATOR_STEP_ERROR
+        )
+    # At most one reconstruction per region i, ii, iii
+    assert simulator.anchor_computations <= 3
+
+
+@given(
+    alpha_bar=st.decimals(min_value="0.05", max_value="3", places=4),
+    xu_bar=st.decimals(min_value="0.01", max_value="0.99", places=4),
+    theta_bar=st.decimals(min_value="0.05", max_value="0.99", places=4),
+    scaled_reserve=st.decimals(min_value="0", max_value="1", places=8),
+    scaled_redemption=st.decimals(min_value="0", max_value="1", places=8),
+)
+def test_region_index(alpha_bar, xu_bar, theta_bar, scaled_reserve, scaled_redemption):
+    params = pypamm.Params(QD(alpha_bar), QD(xu_bar), QD(theta_bar))
+    scaled_reserve, scaled_redemption = QD(scaled_reserve), QD(scaled_redemption)
+    expected = pypamm.Pamm(params)._compute_normalized_case_by_checks(
+        scaled_reserve, scaled_redemption
+    )
+    assert params.region_index.lookup(scaled_reserve, scaled_redemption) == expected
+
+
+@given(
+    alpha_bar=st.decimals(min_value="0.05", max_value="3", places=4),
+    xu_bar=st.decimals(min_value="0.01", max_value="0.99", places=4),
+    theta_bar=st.decimals(min_value="0.05", max_value="0.99", places=4),
+    scaled_redemption=st.decimals(min_value="0", max_value="1", places=8),
+)
+@example(
+    alpha_bar=D("0.657"),
+    xu_bar=D("0.6707"),
+    theta_bar=D("0.457"),
+    scaled_redemption=D("1"),
+)
+def test_region_index_on_boundaries(alpha_bar, xu_bar, theta_bar, scaled_redemption):
+    # Reserves on and next to the boundary curves, where the lookup has to fall back from float to D.
+    params = pypamm.Params(QD(alpha_bar), QD(xu_bar), QD(theta_bar))
+    index = params.region_index
+    scaled_redemption = QD(scaled_redemption)
+    pamm = pypamm.Pamm(params)
+    pieces = index.pieces[bisect_left(index.breakpoints, scaled_redemption)]
+    for piece in pieces:
+        boundary = index._evaluate(piece, scaled_redemption)
+        for scaled_reserve in [
+            boundary - QD("1E-18"),
+            boundary,
+            boundary + QD("1E-18"),
+        ]:
+            expected = pamm._compute_normalized_case_by_checks(
+                scaled_reserve, scaled_redemption
+            )
+            assert index.lookup(scaled_reserve, scaled_redemption) == expected
+
+
 @pytest.mark.parametrize(
     "args",
     [
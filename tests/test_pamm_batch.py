@@ -0,0 +1,117 @@
+import hypothesis.strategies as st
+import pytest
+from brownie.test import given
+
+import tests.support.pamm as pypamm
+import tests.support.pamm_batch as pamm_batch
+from tests.support.quantized_backend import IS_EXACT
+from tests.support.quantized_decimal import QuantizedDecimal as QD
+
+# The batched model rounds every step to 18 decimals, so it only matches the scalar model on a rounding backend.
+pytestmark = pytest.mark.skipif(
+    IS_EXACT, reason="needs a rounding QUANTIZED_DECIMAL_BACKEND"
+)
+
+# (x, ba, ya), alpha_bar
+POINTS = [
+    (("0.8", "0.9", "1"), "1"),
+    (("0.1", "0.75", "1"), "1"),
+    (("0.2", "0.75", "1"), "1"),
+    (("0.4", "0.85", "1"), "0.5"),
+    (("0.7", "0.8499", "1"), "0.5"),
+    (("0.7", "0.85", "1"), "0.3"),
+    (("0.2", "0.65", "1"), "0.3"),
+    (("0.2", "0.5", "1"), "0.3"),
+    (("0.2", "1.1", "1"), "0.3"),
+    (("1.2", "3.7", "4"), "0.6"),
+]
+
+
+def decimals(min_value, max_value):
+    return st.decimals(min_value=min_value, max_value=max_value, places=6)
+
+
+def _params(alpha_bar):
+    return pypamm.Params(QD(alpha_bar), QD("0.3"), QD("0.6"))
+
+
+@pytest.mark.parametrize("alpha_bar", ["1", "0.5", "0.3"])
+def test_evaluate(alpha_bar):
+    params = _params(alpha_bar)
+    points = [tuple(QD(a) for a in args) for args, _ in POINTS]
+    xs, bas, yas = zip(*points)
+
+    result = pamm_batch.evaluate(xs, bas, yas, params)
+
+    for i, (x, ba, ya) in enumerate(points):
+        assert result.reserves[i] == pamm_batch.scaled(
+            pypamm.compute_reserve(x, ba, ya, params)
+        )
+        assert result.prices[i] == pamm_batch.scaled(
+            pypamm.compute_price(x, ba, ya, params)
+        )
+        region = pypamm.Region.from_pieces(
+            *pypamm.compute_region_ext(x, ba, ya, params)
+        )
+        assert result.regions[i] == region.value
+
+
+def test_params_column():
+    # One Params per point; the points of each alpha_bar in POINTS are evaluated as one batch.
+    params = [_params(alpha_bar) for _, alpha_bar in POINTS]
+    points = [tuple(QD(a) for a in args) for args, _ in POINTS]
+    xs, bas, yas = zip(*points)
+
+    result = pamm_batch.evaluate(xs, bas, yas, params)
+
+    for i, ((x, ba, ya), p) in enumerate(zip(points, params)):
+        expected = pamm_batch.evaluate([x], [ba], [ya], p)
+        assert tuple(column[i] for column in result) == tuple(
+            column[0] for column in expected
+        )
+
+    amounts = [QD("0.01")] * len(points)
+    redeem_amounts = pamm_batch.compute_redeem_amount(params, xs, bas, yas, amounts)
+    for i, ((x, ba, ya), p) in enumerate(zip(points, params)):
+        assert (
+            redeem_amounts[i]
+            == pamm_batch.compute_redeem_amount(p, [x], [ba], [ya], [QD("0.01")])[0]
+        )
+
+    with pytest.raises(ValueError):
+        pamm_batch.evaluate(xs, bas, yas, params[:-1])
+
+
+def test_broadcast_scalar_ya():
+    params = _params("0.5")
+    xs = [QD("0.1"), QD("0.5"), QD("0.9")]
+    result = pamm_batch.evaluate(xs, [QD("0.8")] * 3, [QD(1)], params)
+    assert list(pamm_batch.from_scaled_array(result.reserves)) == [
+        pypamm.compute_reserve(x, QD("0.8"), QD(1), params) for x in xs
+    ]
+
+
+@given(
+    points=st.lists(
+        st.tuples(
+            decimals("0", "0.9"), decimals("0.62", "0.99"), decimals("0", "0.05")
+        ),
+        min_size=1,
+        max_size=20,
+    ),
+    alpha_bar=st.sampled_from(["0.3", "0.6", "1"]),
+)
+def test_compute_redeem_amount(points, alpha_bar):
+    params = _params(alpha_bar)
+    states, expected = [], []
+    for x, ba, amount in points:
+        x, ba, amount = QD(x), QD(ba), QD(amount)
+        reserve = pypamm.compute_reserve(x, ba, QD(1), params)
+        pamm = pypamm.Pamm(params)
+        pamm.update_state(x, reserve, 1 - x)
+        states.append((x, reserve, 1 - x, amount))
+        expected.append(pamm_batch.scaled(pamm.compute_redeem_amount(amount)))
+
+    result = pamm_batch.compute_redeem_amount(params, *zip(*states))
+
+    assert list(result) == expected
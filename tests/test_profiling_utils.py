@@ -0,0 +1,161 @@
+import json
+import os
+
+import statistics
+
+import hypothesis.strategies as st
+import pytest
+from brownie.test import given
+
+from scripts.profiling.profiling_utils import (
+    CallStats,
+    QuantileSketch,
+    comput_gas_stats,
+    folded_stacks,
+    get_call_gas,
+    get_call_tree,
+    make_name_resolver,
+)
+
+CALL_TRACE_PATH = os.path.join(os.path.dirname(__file__), "data", "call_trace.json")
+
+
+class Tx:
+    def __init__(self, trace):
+        self.trace = trace
+
+
+def _step(depth, jump_depth, fn, op, gas_cost, stack=None):
+    step = {
+        "depth": depth,
+        "jumpDepth": jump_depth,
+        "fn": fn,
+        "op": op,
+        "gasCost": gas_cost,
+    }
+    if stack is not None:
+        step["stack"] = stack
+    return step
+
+
+NESTED_CALLS_TRACE = [
+    _step(0, 0, "A.f", "ADD", 3),
+    _step(0, 0, "A.f", "JUMP", 8),
+    _step(0, 1, "A._g", "ADD", 5),
+    _step(0, 1, "A._g", "CALL", 1000),
+    _step(1, 0, "B.h", "SSTORE", 5000, ["0x1", "0x0", "0x2"]),
+    _step(1, 0, "B.h", "RETURN", 0),
+    _step(0, 1, "A._g", "ADD", 2),
+    _step(0, 0, "A.f", "JUMPDEST", 1),
+]
+
+
+def test_nested_calls():
+    calls = get_call_gas(Tx(NESTED_CALLS_TRACE))
+    # The keys are swapped with respect to their names, see get_call_gas().
+    assert calls["A.f"] == [{"total_gas": 12, "internal_gas": -8981}]
+    assert calls["A._g"] == [{"total_gas": 7, "internal_gas": -8993}]
+    assert calls["B.h"] == [{"total_gas": -9000, "internal_gas": -9000}]
+
+
+def test_call_tree():
+    tree = get_call_tree(Tx(NESTED_CALLS_TRACE))
+    assert [
+        (path, node.internal_gas, node.total_gas) for path, node in tree.walk()
+    ] == [
+        (("A.f",), 12, -8981),
+        (("A.f", "A._g"), 7, -8993),
+        (("A.f", "A._g", "B.h"), -9000, -9000),
+    ]
+    # The refund makes the internal gas of B.h negative, which is counted as zero.
+    assert folded_stacks(tree) == ["A.f 12", "A.f;A._g 7", "A.f;A._g;B.h 0"]
+
+
+def test_name_resolver():
+    trace = [
+        _step(0, 0, "A.f", "CALL", 700),
+        _step(1, 0, "<UnknownContract>.0xa9059cbb", "RETURN", 3),
+        _step(0, 0, "A.f", "CALL", 700),
+        _step(1, 0, "<UnknownContract>.0x12345678", "RETURN", 3),
+    ]
+    trace[1]["address"] = trace[3]["address"] = "0xAbC"
+    resolve_name = make_name_resolver({"0xabc": "Token"}, {"0xA9059CBB": "transfer"})
+    tree = get_call_tree(Tx(trace), resolve_name)
+    assert [node.fn for _, node in tree.walk()] == [
+        "A.f",
+        "Token.transfer",
+        "Token.0x12345678",
+    ]
+
+
+def test_recorded_trace():
+    """`calls` in the fixture were computed with the previous implementation, based on `_get_trace_gas()`."""
+    with open(CALL_TRACE_PATH) as f:
+        recorded = json.load(f)
+    assert get_call_gas(Tx(recorded["trace"])) == recorded["calls"]
+
+    stats = comput_gas_stats(Tx(recorded["trace"]))
+    assert stats.keys() == recorded["calls"].keys()
+    for fn, calls in recorded["calls"].items():
+        assert stats[fn].count == len(calls)
+        assert stats[fn].max_total_gas == max(c["total_gas"] for c in calls)
+
+
+def _format_with_values(gases, values):
+    """Output of `CallStats.format_with_values(values, minmax=True)` when it kept all calls in a list."""
+    result = f"mean gas: {round(statistics.mean(gases), 3)}\n"
+    result += f"median gas: {round(statistics.median(gases), 3)}\n"
+    std = statistics.stdev(gases) if len(gases) > 1 else 0
+    result += f"std gas: {round(std, 3)}\n"
+    result += f"min gas: {min(gases)} ({values[gases.index(min(gases))]})\n"
+    result += f"max gas: {max(gases)} ({values[gases.index(max(gases))]})\n"
+    return result
+
+
+@given(gases=st.lists(st.integers(min_value=1, max_value=10**7), min_size=1))
+def test_call_stats_format(gases):
+    stats = CallStats({"internal_gas": gas, "total_gas": 2 * gas} for gas in gases)
+    values = [f"input {i}" for i in range(len(gases))]
+    assert stats.format_with_values(values, minmax=True) == _format_with_values(
+        gases, values
+    )
+    assert stats.mean_total_gas == statistics.mean(2 * gas for gas in gases)
+
+
+@given(
+    gases=st.lists(st.integers(min_value=-(10**5), max_value=10**7), min_size=1),
+    split=st.integers(min_value=0),
+)
+def test_call_stats_merge(gases, split):
+    split %= len(gases) + 1
+    calls = [{"internal_gas": gas, "total_gas": gas} for gas in gases]
+    stats = CallStats(calls[:split], exact_limit=8)
+    stats.merge(CallStats(calls[split:], exact_limit=8))
+    expected = CallStats(calls)
+    assert stats.count == len(gases)
+    assert stats.mean_internal_gas == expected.mean_internal_gas
+    assert stats.std_internal_gas == pytest.approx(expected.std_internal_gas)
+    assert stats.internal_gas.argmin == gases.index(min(gases))
+    assert stats.internal_gas.argmax == gases.index(max(gases))
+    if len(gases) <= 8:
+        assert stats.median_internal_gas == statistics.median(gases)
+
+
+def test_call_stats_sketch():
+    gases = [(i * 7919) % 100_000 + 21_000 for i in range(50_000)]
+    stats = CallStats({"internal_gas": gas, "total_gas": gas} for gas in gases)
+    assert not stats.internal_gas.is_exact
+    assert stats.std_internal_gas == pytest.approx(statistics.stdev(gases))
+    gases.sort()
+    for q, value in [(0.5, stats.median_internal_gas), (0.95, stats.p95_internal_gas)]:
+        assert value == pytest.approx(gases[int(q * (len(gases) - 1))], rel=0.01)
+    assert stats.p99_internal_gas == pytest.approx(gases[49_499], rel=0.01)
+
+
+def test_quantile_sketch_relative_error():
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    values = [-50, 0, 3, 17, 1_000, 123_456]
+    for value in values:
+        sketch.add(value)
+    for i, value in enumerate(values):
+        assert sketch.quantile(i / (len(values) - 1)) == pytest.approx(value, rel=0.01)
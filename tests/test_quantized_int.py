@@ -0,0 +1,162 @@
+import decimal
+import operator
+
+import hypothesis.strategies as st
+import pytest
+from brownie.test import given
+
+import tests.support.pamm as pypamm
+from tests.support.quantized_backend import IS_EXACT
+from tests.support.quantized_decimal import QuantizedDecimal as QD
+from tests.support.quantized_int import QuantizedInt as QI
+
+GOLDEN_VALUES = [
+    "0",
+    "1",
+    "-1",
+    "2",
+    "3",
+    "0.3",
+    "0.5",
+    "0.6",
+    "1E-18",
+    "-1E-18",
+    "0.333333333333333333",
+    "0.999999999999999999",
+    "1.000000000000000001",
+    "123456789.123456789123456789",
+    "-0.000000000000000007",
+    "1000000000",
+]
+
+BINARY_OPERATIONS = {
+    "add": operator.add,
+    "sub": operator.sub,
+    "mul": operator.mul,
+    "truediv": operator.truediv,
+    "floordiv": operator.floordiv,
+    "mul_up": lambda a, b: a.mul_up(b),
+    "div_up": lambda a, b: a.div_up(b),
+    "le": operator.le,
+    "lt": operator.lt,
+    "eq": operator.eq,
+}
+
+UNARY_OPERATIONS = {
+    "neg": operator.neg,
+    "abs": abs,
+    "floor": lambda a: a.floor(),
+    "sqrt": lambda a: abs(a).sqrt(),
+    "sqrt_up": lambda a: abs(a).sqrt(decimal.ROUND_UP),
+    "cbrt": lambda a: abs(a).cbrt(),
+    "root_5_up": lambda a: abs(a).nth_root(5, decimal.ROUND_UP),
+    "square": lambda a: a**2,
+    "cube": lambda a: a ** QD(3),
+    "inverse_square": lambda a: a ** QD(-2),
+    "int": int,
+    "float": float,
+    "hash": hash,
+}
+
+decimals = st.decimals(
+    min_value="-1e9", max_value="1e9", places=18, allow_nan=False, allow_infinity=False
+)
+
+
+def _normalize(value):
+    if isinstance(value, QD):
+        return value.raw
+    return value
+
+
+def _assert_same_result(op, *args):
+    try:
+        expected = _normalize(op(*[QD(a) for a in args]))
+    except ArithmeticError as ex:
+        with pytest.raises(type(ex)):
+            op(*[QI(a) for a in args])
+        return
+    actual = _normalize(op(*[QI(a) for a in args]))
+    assert actual == expected
+    assert type(actual) == type(expected)
+
+
+@pytest.mark.parametrize("name", BINARY_OPERATIONS)
+def test_golden_binary_operations(name):
+    op = BINARY_OPERATIONS[name]
+    for a in GOLDEN_VALUES:
+        for b in GOLDEN_VALUES:
+            _assert_same_result(op, a, b)
+
+
+@pytest.mark.parametrize("name", UNARY_OPERATIONS)
+def test_golden_unary_operations(name):
+    op = UNARY_OPERATIONS[name]
+    for a in GOLDEN_VALUES:
+        _assert_same_result(op, a)
+
+
+@pytest.mark.parametrize("value", [0, 1, "0.1", "1.23", 0.1, 1 / 3])
+def test_construction(value):
+    assert QI(value).raw == QD(value).raw
+
+
+def test_mixed_operands():
+    assert (QI("0.3") * QD("0.7")).raw == (QD("0.3") * QD("0.7")).raw
+    assert (QD("0.3") * QI("0.7")).raw == (QD("0.3") * QD("0.7")).raw
+    assert isinstance(QD("0.3") - QI("0.7"), QI)
+    assert QD("0.3") < QI("0.7")
+    assert (QI("0.3") * 7).raw == (QD("0.3") * 7).raw
+    assert (2 / QI("0.3")).raw == (2 / QD("0.3")).raw
+
+
+@given(
+    a=st.decimals(min_value="0", max_value="1e12", places=18),
+    n=st.integers(min_value=2, max_value=5),
+)
+def test_nth_root(a, n):
+    x = QD(a)
+    ulp = QD("1E-18")
+    down = x.nth_root(n).raw
+    up = x.nth_root(n, decimal.ROUND_UP).raw
+    assert down**n <= x.raw < (down + ulp.raw) ** n
+    assert x.raw <= up**n
+    assert up == down or (up - ulp.raw) ** n < x.raw
+    assert QI(a).nth_root(n).raw == down
+
+
+def test_nth_root_matches_power():
+    # The exact root differs from the power with an inexact exponent only in the last digits.
+    x = QD("123.456")
+    assert x.cbrt() == (x ** QD(1 / 3)).approxed(rel=QD("1E-16"))
+    assert x.sqrt() == x ** QD("0.5")
+    assert QD(8).cbrt() == 2
+    assert QD(8) ** QD(1 / 3) < 2
+    with pytest.raises(decimal.InvalidOperation):
+        QD(-1).cbrt()
+
+
+@given(a=decimals, b=decimals)
+def test_binary_operations(a, b):
+    for op in BINARY_OPERATIONS.values():
+        _assert_same_result(op, a, b)
+
+
+# pamm.py computes its constants with the configured backend, which must round like the two classes compared here.
+@pytest.mark.skipif(IS_EXACT, reason="needs a rounding QUANTIZED_DECIMAL_BACKEND")
+@given(
+    x=st.decimals(min_value="0.001", max_value="0.9", places=6),
+    ba=st.decimals(min_value="0.61", max_value="0.999", places=6),
+    alpha_bar=st.sampled_from(["0.3", "0.6", "1"]),
+)
+def test_pamm_reference_model(x, ba, alpha_bar):
+    def run(cls):
+        params = pypamm.Params(cls(alpha_bar), cls("0.3"), cls("0.6"))
+        reserve = pypamm.compute_reserve(cls(x), cls(ba), cls(1), params)
+        price = pypamm.compute_price(cls(x), cls(ba), cls(1), params)
+        pamm = pypamm.Pamm(params)
+        pamm.update_state(cls(x), reserve, cls(1) - cls(x))
+        anchor = pamm.compute_anchor_reserve_value()
+        return reserve.raw, price.raw, anchor.raw if anchor is not None else None
+
+    assert run(QI) == run(QD)
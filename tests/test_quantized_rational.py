@@ -0,0 +1,123 @@
+import decimal
+import operator
+from fractions import Fraction
+
+import hypothesis.strategies as st
+import pytest
+from brownie.test import given
+from hypothesis import example
+
+import tests.support.pamm as pypamm
+from tests.support.quantized_decimal import QuantizedDecimal as QD
+from tests.support.quantized_rational import QuantizedRational as QR
+
+GOLDEN_VALUES = [
+    "0",
+    "1",
+    "-1",
+    "3",
+    "0.3",
+    "0.6",
+    "1E-18",
+    "-0.000000000000000007",
+    "0.333333333333333333",
+    "1.000000000000000001",
+    "123456789.123456789123456789",
+]
+
+# Operations where a single QuantizedDecimal operation is exact up to the final rounding, so QuantizedRational gives
+# the same result after quantizing.
+SINGLE_OPERATIONS = {
+    "add": operator.add,
+    "sub": operator.sub,
+    "mul": operator.mul,
+    "truediv": operator.truediv,
+    "floordiv": operator.floordiv,
+    "le": operator.le,
+    "lt": operator.lt,
+    "eq": operator.eq,
+}
+
+
+def _normalize(value):
+    if isinstance(value, QD):
+        return value.raw
+    return value
+
+
+@pytest.mark.parametrize("name", SINGLE_OPERATIONS)
+def test_golden_single_operations(name):
+    op = SINGLE_OPERATIONS[name]
+    for a in GOLDEN_VALUES:
+        for b in GOLDEN_VALUES:
+            try:
+                expected = _normalize(op(QD(a), QD(b)))
+            except ArithmeticError as ex:
+                with pytest.raises(type(ex)):
+                    op(QR(a), QR(b))
+                continue
+            assert _normalize(op(QR(a), QR(b))) == expected
+
+
+@pytest.mark.parametrize("value", [0, 1, "0.1", "1.23", 0.1, 1 / 3])
+def test_construction(value):
+    assert QR(value).raw == QD(value).raw
+
+
+def test_exact():
+    third = QR(1) / 3
+    assert third * 3 == 1
+    assert (QD(1) / 3) * 3 != 1
+    assert third.exact == Fraction(1, 3)
+    assert third.raw == QD(1) / 3
+    assert QR("1E-30") > 0
+    assert QR("1E-30").raw == 0
+    assert (QR(2) ** -2).exact == Fraction(1, 4)
+
+
+def test_rounding_on_output():
+    x = QR(2) / 3
+    assert str(x) == "0.666666666666666666"
+    assert x.quantize(decimal.ROUND_UP).raw == decimal.Decimal("0.666666666666666667")
+    assert QD(x) == QD("0.666666666666666666")
+    assert (-x).raw == decimal.Decimal("-0.666666666666666666")
+
+
+def test_sqrt_and_powers():
+    assert QR(4).sqrt() == 2
+    assert QR("0.25") ** QR("0.5") == QR("0.5")
+    assert QR(2).sqrt().raw == QD(2).sqrt().raw
+    assert (QR(2) ** (QR(1) / 3)).raw == decimal.Decimal("1.259921049894873164")
+    with pytest.raises(decimal.InvalidOperation):
+        QR(-1).sqrt()
+
+
+def test_mixed_operands():
+    assert isinstance(QD("0.3") - QR("0.7"), QR)
+    assert QD("0.3") < QR("0.7")
+    assert (2 / QR(3)).exact == Fraction(2, 3)
+    assert hash(QR("0.5")) == hash(QD("0.5"))
+
+
+@given(
+    x=st.decimals(min_value="0.001", max_value="0.9", places=6),
+    ba=st.decimals(min_value="0.61", max_value="0.999", places=6),
+    alpha_bar=st.sampled_from(["0.3", "0.6", "1"]),
+)
+@example(x=decimal.Decimal("0.747006"), ba=decimal.Decimal("0.749707"), alpha_bar="0.3")
+def test_pamm_reference_model(x, ba, alpha_bar):
+    def run(cls):
+        params = pypamm.Params(cls(alpha_bar), cls("0.3"), cls("0.6"))
+        reserve = pypamm.compute_reserve(cls(x), cls(ba), cls(1), params)
+        pamm = pypamm.Pamm(params)
+        pamm.update_state(cls(x), reserve, cls(1) - cls(x))
+        anchor = pamm.compute_anchor_reserve_value()
+        return reserve, anchor
+
+    reserve_qd, anchor_qd = run(QD)
+    reserve_qr, anchor_qr = run(QR)
+    # The difference is the rounding error accumulated by QuantizedDecimal, which reaches 1.6e-15 for the example
+    # above.
+    assert reserve_qr == reserve_qd.approxed(abs=QD("1E-14"))
+    if anchor_qd is not None and anchor_qr is not None:
+        assert anchor_qr == anchor_qd.approxed(abs=QD("1E-14"))
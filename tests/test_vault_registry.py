@@ -39,6 +39,17 @@ def test_set_vaults(admin, make_vault_config, vault_registry):
     assert vault_registry.listVaults() == [v.vault_address for v in vaults]
 
 
+def test_list_vaults_with_metadata(admin, make_vault_config, vault_registry):
+    vaults = [make_vault_config(w) for w in ["0.3", "0.2", "0.5"]]
+    vault_registry.setVaults(vaults, {"from": admin})
+    addresses, metadata = vault_registry.listVaultsWithMetadata()
+    assert addresses == vault_registry.listVaults()
+    assert metadata == [vault_registry.getVaultMetadata(a) for a in addresses]
+    assert [m[1] for m in metadata] == [
+        v.metadata.weight_at_calibration for v in vaults
+    ]
+
+
 def test_set_vaults_schedule(admin, make_vault_config, vault_registry, chain):
     vaults = [make_vault_config(w) for w in ["0.3", "0.2", "0.5"]]
 